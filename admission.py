@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+Kabul Kontrolü ve Hız Sınırlama
+===============================
+Transkript ayrıştırma ve eşleştirme CPU yoğundur. Uygulama bunları oturumun
+iş parçacığında çalıştırır; sınır olmadan tek bir kullanıcı art arda büyük
+PDF'ler yükleyerek işlemciyi tekeline alabilir. Kayıt haftasında herkesin
+gecikmesi bu yüzden öngörülemez olur.
+
+Bu modül analiz hattının önüne bir kabul katmanı koyar:
+
+- Küresel eşzamanlılık sınırı: aynı anda en fazla MAX_CONCURRENT analiz
+  çalışır. Fazlası gelme sırasıyla (FIFO) bekler ve beklerken sıradaki yerini
+  öğrenir.
+- Sıra sınırı: MAX_QUEUE analiz bekliyorsa yenisi beklemeden reddedilir.
+  MAX_WAIT saniyeden uzun bekleyen de sıradan çıkarılıp reddedilir.
+- İstemci başına jeton kovası: her oturum için dakikada RATE_PER_MINUTE analiz
+  (anlık en fazla RATE_BURST), her IP için IP_RATE_PER_MINUTE. Kova boşsa
+  istek hemen reddedilir ve ne kadar sonra tekrar denenebileceği bildirilir.
+- Toplu analiz: dosya sayısı kadar jeton ayrı 'toplu_*' kovalarından alınır
+  (batch_keys; dakikada BATCH_FILES_PER_MINUTE, tek seferde en fazla
+  BATCH_FILES_BURST PDF). Her PDF havuza girmeden önce ayrıca bir analiz yeri
+  alır; toplu analiz böylece eşzamanlılık sınırını aşamaz.
+- Boyut sınırı: MAX_UPLOAD_BYTES'ı aşan PDF ayrıştırılmadan reddedilir.
+
+Sıra bekleme süreleri (p50/p95) ile nedene göre kabul ve ret sayıları
+metrik olarak tutulur. API'nin JobGate'i de aynı jeton kovasını ve
+metrikleri kullanır.
+
+Kullanım:
+    kabul = AdmissionController()      # süreç başına bir tane (uygulamada cache_resource)
+    with kabul.slot((('oturum', 'ab12'), ('ip', '10.0.0.5')), boyut, on_wait=goster):
+        ...  # ayrıştırma + eşleştirme
+
+    kabul.charge(batch_keys(anahtarlar), pdf_sayisi)    # toplu analiz
+    kabul.acquire(())                                  # PDF başına yer (jeton alınmaz)
+"""
+
+import os
+import math
+import time
+import threading
+from collections import Counter, OrderedDict, deque
+
+from stats import percentile
+
+MAX_CONCURRENT = int(os.environ.get('MTS_ADMISSION_MAX_CONCURRENT', max(1, os.cpu_count() or 1)))
+MAX_QUEUE = int(os.environ.get('MTS_ADMISSION_MAX_QUEUE', MAX_CONCURRENT * 4))
+MAX_WAIT = float(os.environ.get('MTS_ADMISSION_MAX_WAIT', '30'))
+# İstemci başına analiz hızı (dakikada) ve anlık en fazla analiz; 0 ise sınırsız.
+# Bir IP'nin arkasında (kampüs NAT'ı) birçok öğrenci olabileceğinden IP sınırı geniştir.
+RATE_PER_MINUTE = float(os.environ.get('MTS_RATE_PER_MINUTE', '10'))
+RATE_BURST = float(os.environ.get('MTS_RATE_BURST', '5'))
+IP_RATE_PER_MINUTE = float(os.environ.get('MTS_RATE_PER_MINUTE_IP', '60'))
+IP_RATE_BURST = float(os.environ.get('MTS_RATE_BURST_IP', '20'))
+# Toplu analizde istemci başına dakikada PDF ve tek seferde en fazla PDF
+BATCH_FILES_PER_MINUTE = float(os.environ.get('MTS_BATCH_FILES_PER_MINUTE', '60'))
+BATCH_FILES_BURST = float(os.environ.get('MTS_BATCH_FILES_BURST', '300'))
+DEFAULT_LIMITS = {
+    'oturum': (RATE_PER_MINUTE, RATE_BURST),
+    'ip': (IP_RATE_PER_MINUTE, IP_RATE_BURST),
+    'toplu_oturum': (BATCH_FILES_PER_MINUTE, BATCH_FILES_BURST),
+    'toplu_ip': (BATCH_FILES_PER_MINUTE, BATCH_FILES_BURST),
+}
+MAX_UPLOAD_BYTES = int(float(os.environ.get('MTS_API_MAX_UPLOAD_MB', '10')) * 1024 * 1024)
+# Jeton kovası tutulan en fazla istemci (en uzun süre görülmeyen atılır)
+MAX_CLIENTS = 10000
+# Metriklerde tutulan son bekleme süresi sayısı
+WAIT_SAMPLES = 1000
+
+
+class Rejected(Exception):
+    """Analiz kabul edilmedi.
+
+    Attributes:
+        reason: 'boyut', 'hiz', 'sira_dolu' veya 'zaman_asimi'
+        retry_after: Tekrar denemeden önce beklenecek saniye (bilinmiyorsa 0)
+    """
+
+    def __init__(self, reason: str, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+        self.retry_after = retry_after
+
+
+# ===== JETON KOVASI =====
+
+class TokenBucket:
+    """Saniyede `rate` jeton dolan, en fazla `capacity` jeton tutan kova."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float, cost: float = 1.0) -> float:
+        """Jeton almadan, `cost` jeton için beklenecek süre (0: hemen alınabilir; kapasiteyi aşıyorsa sonsuz)."""
+        if cost > self.capacity:
+            return math.inf
+        self._refill(now)
+        return 0.0 if self.tokens >= cost else (cost - self.tokens) / self.rate
+
+    def take(self, cost: float = 1.0):
+        self.tokens -= cost
+
+
+class RateLimiter:
+    """Anahtar başına jeton kovaları; iş parçacığı güvenlidir.
+
+    Anahtarlar (tür, değer) çiftleridir, örn. ('oturum', 'ab12') veya ('ip', '10.0.0.5').
+    Her türün hızı limits sözlüğünden okunur; sözlükte olmayan veya hızı 0
+    olan tür sınırlanmaz.
+
+    Parameters:
+        limits: Tür -> (dakikadaki istek, anlık en fazla istek)
+        max_clients: Tutulan en fazla kova (en uzun süre görülmeyen atılır)
+    """
+
+    def __init__(self, limits: dict = None, max_clients: int = MAX_CLIENTS):
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, keys, cost: float = 1.0, now: float = None) -> float:
+        """Tüm anahtarların kovasında jeton varsa hepsinden alır ve 0 döner.
+
+        Biri bile boşsa hiçbirinden jeton alınmaz; en uzun bekleme süresi döner.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            buckets = []
+            for key in keys:
+                per_minute, burst = self.limits.get(key[0], (0, 0))
+                if per_minute <= 0:
+                    continue
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(per_minute / 60.0, max(1.0, burst), now)
+                    if len(self._buckets) > self.max_clients:
+                        self._buckets.popitem(last=False)
+                else:
+                    self._buckets.move_to_end(key)
+                buckets.append(bucket)
+            wait = max((bucket.wait_time(now, cost) for bucket in buckets), default=0.0)
+            if wait == 0.0:
+                for bucket in buckets:
+                    bucket.take(cost)
+            return wait
+
+
+def batch_keys(keys) -> tuple:
+    """İstemci anahtarlarının toplu analiz kovaları ('oturum' -> 'toplu_oturum')."""
+    return tuple((f'toplu_{kind}', value) for kind, value in keys)
+
+
+# ===== METRİKLER =====
+
+class AdmissionMetrics:
+    """Kabul/ret sayıları ve sıra bekleme süreleri; iş parçacığı güvenlidir."""
+
+    def __init__(self, samples: int = WAIT_SAMPLES):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=samples)
+        self.admitted = 0
+        self.rejected = Counter()
+
+    def admit(self, waited: float):
+        with self._lock:
+            self.admitted += 1
+            self._waits.append(waited)
+
+    def reject(self, reason: str):
+        with self._lock:
+            self.rejected[reason] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = list(self._waits)
+            rejected = dict(self.rejected)
+            admitted = self.admitted
+        return {
+            'kabul': admitted,
+            'ret': sum(rejected.values()),
+            'ret_nedenleri': rejected,
+            'sira_bekleme_ms': {
+                'p50': round(percentile(waits, 50) * 1000, 1),
+                'p95': round(percentile(waits, 95) * 1000, 1),
+                'en_fazla': round(max(waits, default=0.0) * 1000, 1),
+            },
+        }
+
+
+# ===== KABUL DENETİMİ (İŞ PARÇACIKLARI) =====
+
+class _Ticket:
+    __slots__ = ('granted',)
+
+    def __init__(self):
+        self.granted = False
+
+
+class AdmissionController:
+    """İş parçacığı tabanlı kabul denetimi (Streamlit oturumları için).
+
+    Parameters:
+        max_concurrent: Aynı anda çalışan en fazla analiz
+        max_queue: Sırada bekleyebilecek en fazla analiz
+        max_wait: Sırada en uzun bekleme (saniye)
+        limiter: İstemci başına RateLimiter
+        max_bytes: Kabul edilen en büyük PDF
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT, max_queue: int = MAX_QUEUE,
+                 max_wait: float = MAX_WAIT, limiter: RateLimiter = None, max_bytes: int = MAX_UPLOAD_BYTES):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.max_bytes = max_bytes
+        self.metrics = AdmissionMetrics()
+        self.running = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+
+    def _reject(self, reason: str, message: str, retry_after: float = 0.0):
+        self.metrics.reject(reason)
+        raise Rejected(reason, message, retry_after)
+
+    def _grant(self):
+        """Boş yer oldukça sıranın başındakilere izin verir (kilit tutulurken çağrılır)."""
+        while self._queue and self.running < self.max_concurrent:
+            ticket = self._queue.popleft()
+            ticket.granted = True
+            self.running += 1
+        self._cond.notify_all()
+
+    def check_size(self, size: int):
+        """Boyut sınırını aşan PDF'i (ayrıştırmadan, özetlemeden) reddeder."""
+        if size > self.max_bytes:
+            self._reject('boyut', f'Dosya boyutu sınırı aşıldı ({self.max_bytes // (1024 * 1024)} MB).')
+
+    def charge(self, keys, cost: float = 1.0):
+        """Yer ayırmadan istemci kovalarından `cost` jeton alır; yetmiyorsa Rejected fırlatır."""
+        retry_after = self.limiter.check(keys, cost)
+        if retry_after == math.inf:
+            self._reject('hiz', f'Tek seferde izin verilenden fazla analiz istendi ({cost:g}).')
+        if retry_after:
+            self._reject('hiz', f'Çok sık analiz isteği; {retry_after:.0f} sn sonra tekrar deneyin.', retry_after)
+
+    def acquire(self, keys, size: int = 0, on_wait=None):
+        """Analiz için yer ayırır; reddedilirse Rejected fırlatır.
+
+        Parameters:
+            keys: İstemci anahtarları (örn. (('oturum', '..'), ('ip', '..'))); boşsa jeton alınmaz
+            size: PDF boyutu (bayt)
+            on_wait: Beklerken çağrılır: on_wait(sira, beklenen_sn); sira 1'den başlar
+        """
+        self.check_size(size)
+        started = time.monotonic()
+        ticket = _Ticket()
+        with self._cond:
+            # Sıra denetimi ve sıraya girme aynı kritik bölgededir; aksi halde
+            # aynı anda gelen istekler sırayı max_queue'nun üstüne çıkarabilir
+            if len(self._queue) >= self.max_queue:
+                self._reject('sira_dolu', 'Sunucu meşgul, lütfen biraz sonra tekrar deneyin.', 2.0)
+            self.charge(keys)
+            self._queue.append(ticket)
+            self._grant()
+            try:
+                while not ticket.granted:
+                    waited = time.monotonic() - started
+                    if waited >= self.max_wait:
+                        self._reject('zaman_asimi', 'Sırada beklerken zaman aşımı; lütfen tekrar deneyin.', 2.0)
+                    if on_wait is not None:
+                        position = self._queue.index(ticket) + 1
+                        self._cond.release()
+                        try:
+                            on_wait(position, waited)
+                        finally:
+                            self._cond.acquire()
+                        if ticket.granted:
+                            break
+                    self._cond.wait(min(0.5, self.max_wait - waited))
+            except BaseException:
+                # Ret, zaman aşımı veya oturumun yeniden çalıştırılması (Streamlit
+                # betiği durdurur): yer sızmaması için bilet geri alınır
+                if ticket.granted:
+                    self.running -= 1
+                    self._grant()
+                else:
+                    self._queue.remove(ticket)
+                raise
+        self.metrics.admit(time.monotonic() - started)
+
+    def release(self):
+        with self._cond:
+            self.running -= 1
+            self._grant()
+
+    def slot(self, keys, size: int = 0, on_wait=None) -> '_Slot':
+        """acquire/release bağlam yöneticisi."""
+        return _Slot(self, keys, size, on_wait)
+
+    def stats(self) -> dict:
+        with self._cond:
+            current = {'calisan': self.running, 'bekleyen': len(self._queue)}
+        return {**current, **self.metrics.snapshot()}
+
+
+class _Slot:
+    __slots__ = ('controller', 'args')
+
+    def __init__(self, controller, keys, size, on_wait):
+        self.controller = controller
+        self.args = (keys, size, on_wait)
+
+    def __enter__(self):
+        self.controller.acquire(*self.args)
+        return self
+
+    def __exit__(self, *exc):
+        self.controller.release()
+        return False
@@ -0,0 +1,557 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP API Servisi
+================
+Transkript ayrıştırma, müfredat eşleştirme ve özet üretimini diğer üniversite
+sistemlerinin (danışman portalı, öğrenci işleri araçları) programatik olarak
+çağırabilmesi için asenkron bir ASGI servisi olarak sunar.
+
+CPU yoğun aşamalar (pdfplumber, rapidfuzz) bir süreç havuzunda çalıştırılır.
+Aynı anda çalışan iş sayısı sınırlıdır; kuyruk dolduğunda istekler hemen
+503 ile geri çevrilir (backpressure). Kiracı başına istek hızı bir jeton
+kovasıyla sınırlıdır (429 + Retry-After). Yükleme boyutu da sınırlandırılmıştır.
+Sıra bekleme süreleri ve retler /health çıktısında raporlanır.
+
+Kullanım:
+    uvicorn api:app --host 0.0.0.0 --port 8000
+    python api.py
+
+Uç noktalar:
+    GET  /health                      Servis ve kuyruk durumu
+    GET  /mufredatlar                 Kullanılabilir bölümler ve müfredatlar
+    POST /parse                       PDF -> transkript dersleri + AGNO
+    POST /match?mufredat=2022         JSON transkript -> results + summary
+    POST /analyze?mufredat=2022       PDF -> transkript + results + summary
+                                      (?bolum=makine; verilmezse varsayılan bölüm)
+    POST /reports                     JSON öğrenci listesi -> raporların ZIP akışı
+"""
+
+import os
+import io
+import json
+import math
+import time
+import sqlite3
+import hmac
+import hashlib
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor, BrokenExecutor
+from contextlib import asynccontextmanager
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from pdf_parser import parse_attempts
+from matcher import compute_match_state, classify_matches, generate_summary
+from equivalences import Equivalences, get_table
+from cohort_reports import iter_cohort_zip
+from slow_runs import get_recorder
+from curricula import Curriculum, default_rules, get_registry
+from curriculum_pack import attach_worker, publish_default
+from admission import RateLimiter, AdmissionMetrics
+from exporters import to_builtin
+
+
+# ===== YAPILANDIRMA =====
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Ortam değişkenleriyle ayarlanabilir sınırlar
+WORKERS = int(os.environ.get('MTS_API_WORKERS', os.cpu_count() or 1))
+MAX_CONCURRENT = int(os.environ.get('MTS_API_MAX_CONCURRENT', WORKERS))
+MAX_QUEUE = int(os.environ.get('MTS_API_MAX_QUEUE', WORKERS * 4))
+MAX_PER_TENANT = int(os.environ.get('MTS_API_MAX_PER_TENANT', max(1, MAX_CONCURRENT)))
+MAX_UPLOAD_BYTES = int(float(os.environ.get('MTS_API_MAX_UPLOAD_MB', '10')) * 1024 * 1024)
+JOB_TIMEOUT = float(os.environ.get('MTS_API_JOB_TIMEOUT', '60'))
+MAX_COHORT = int(os.environ.get('MTS_API_MAX_COHORT', '1000'))
+# Kiracı başına istek hızı (dakikada) ve anlık en fazla istek; 0 ise sınırsız
+RATE_PER_MINUTE = float(os.environ.get('MTS_API_RATE_PER_MINUTE', '120'))
+RATE_BURST = float(os.environ.get('MTS_API_RATE_BURST', '30'))
+# IP başına istek hızı; kiracı başlığından bağımsız olarak her istekte uygulanır
+IP_RATE_PER_MINUTE = float(os.environ.get('MTS_API_RATE_PER_MINUTE_IP', RATE_PER_MINUTE))
+IP_RATE_BURST = float(os.environ.get('MTS_API_RATE_BURST_IP', RATE_BURST))
+
+
+def parse_tenants(value: str) -> dict:
+    """'portal=anahtar,ogrenci_isleri' biçimini {'portal': 'anahtar', 'ogrenci_isleri': None} sözlüğüne çevirir."""
+    tenants = {}
+    for entry in value.split(','):
+        name, _, key = entry.strip().partition('=')
+        if name:
+            tenants[name] = key or None
+    return tenants
+
+
+# X-Tenant-ID başlığıyla tanınan kiracılar (anahtarlılar X-Tenant-Key ile doğrulanır)
+TENANTS = parse_tenants(os.environ.get('MTS_API_TENANTS', ''))
+
+TRANSKRIPT_COLUMNS = ['Ders_Kodu', 'Ders_Adi', 'AKTS', 'Harf_Notu', 'Basarisiz', 'Donem']
+
+logger = logging.getLogger('api')
+
+
+def list_mufredatlar(bolum: str = None) -> dict:
+    """Bölümün müfredatlarını yıl -> dosya yolu olarak döndürür.
+    Örn: {'2022': '.../mufredatlar/makine/mufredat_2022.xlsx'}
+    """
+    try:
+        department = get_registry().department(bolum)
+    except KeyError:
+        return {}
+    return {str(yil): department.curricula[yil].path for yil in department.years()}
+
+
+# ===== SÜREÇ HAVUZU İŞLERİ =====
+# Bu fonksiyonlar işçi süreçlerde çalışır; pickle edilebilmeleri için modül
+# seviyesinde tanımlıdırlar ve yalnızca sade Python veri tipleri döndürürler.
+# Her iş profillenir; bütçeyi aşan işlerin profili yavaş çalışma dizinine yazılır.
+
+def load_curriculum(filepath: str) -> Curriculum:
+    """Dosya yolundaki müfredatı işçi sürecin kaydından bulur (tablo her süreçte bir kez yüklenir)."""
+    curriculum = get_registry().find(filepath)
+    if curriculum is None:
+        raise ValueError(f'Kayıtlı olmayan müfredat: {filepath}')
+    return curriculum
+
+
+def match_with_equivalences(curriculum: Curriculum, transkript_df: pd.DataFrame, ogrenci: str) -> list:
+    """Eşdeğerlik tablosunu kullanarak eşleştirir ve yüksek skorlu bulanık eşleşmeleri tabloya bildirir.
+
+    Tablo (SQLite dosyası) erişilemezse eşleştirme tablosuz yapılır.
+    """
+    try:
+        table = get_table()
+        equivalences = table.snapshot()
+    except sqlite3.Error:
+        table, equivalences = None, Equivalences()
+    state = compute_match_state(curriculum.frame(), transkript_df, equivalences=equivalences,
+                                rules=curriculum.rules)
+    results = classify_matches(state)
+    if table is not None:
+        try:
+            table.observe(state, results, ogrenci)
+        except sqlite3.Error:
+            pass
+    return results
+
+
+def parse_job(pdf_bytes: bytes) -> dict:
+    """PDF baytlarını ayrıştırır.
+
+    PDF'te AGNO yoksa denemelerden hesaplanan AGNO döner; son denemeler
+    tekrar alınan dersin önceki notunu içermediğinden /match bunu kendisi
+    hesaplayamaz (analyze_job ile aynı AGNO).
+    """
+    with get_recorder().profile('api_parse', hashlib.sha256(pdf_bytes).hexdigest()):
+        attempts, parsed_agno = parse_attempts(io.BytesIO(pdf_bytes), rules=default_rules())
+        transkript_df = attempts.latest_frame()
+    return {
+        'transkript': to_builtin(transkript_df.to_dict(orient='records')),
+        'agno': float(parsed_agno or attempts.agno()),
+    }
+
+
+def match_job(transkript: list, agno: float, mufredat_path: str) -> dict:
+    """Hazır transkript kayıtlarını müfredatla eşleştirir ve özet üretir."""
+    transkript_df = pd.DataFrame(transkript, columns=TRANSKRIPT_COLUMNS)
+    curriculum = load_curriculum(mufredat_path)
+    ogrenci = hashlib.sha256(json.dumps(transkript, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    with get_recorder().profile('api_match', ogrenci, mufredat=os.path.basename(mufredat_path)):
+        results = match_with_equivalences(curriculum, transkript_df, ogrenci)
+        summary = generate_summary(results, transkript_df, agno)
+    return {
+        'results': to_builtin(results),
+        'summary': to_builtin(summary),
+    }
+
+
+def analyze_job(pdf_bytes: bytes, mufredat_path: str, with_student_id: bool = False) -> dict:
+    """Ayrıştırma + eşleştirme + özet (tek işçi çağrısında).
+
+    with_student_id verilirse başlıktaki öğrenci numarası aynı ayrıştırmada
+    okunup 'ogrenci_no' anahtarıyla eklenir (toplu analiz).
+    """
+    pdf_hash = hashlib.sha256(pdf_bytes).hexdigest()
+    curriculum = load_curriculum(mufredat_path)
+    header = {} if with_student_id else None
+    with get_recorder().profile('api_analyze', pdf_hash, mufredat=os.path.basename(mufredat_path)):
+        attempts, parsed_agno = parse_attempts(io.BytesIO(pdf_bytes), rules=curriculum.rules, header=header)
+        transkript_df = attempts.latest_frame()
+        results = match_with_equivalences(curriculum, transkript_df, pdf_hash)
+        summary = generate_summary(results, transkript_df, parsed_agno, attempts)
+    data = {
+        'transkript': to_builtin(transkript_df.to_dict(orient='records')),
+        'agno': float(parsed_agno),
+        'results': to_builtin(results),
+        'summary': to_builtin(summary),
+    }
+    if header is not None:
+        data['ogrenci_no'] = header['ogrenci_no']
+    return data
+
+
+# ===== KABUL KONTROLÜ (BACKPRESSURE) =====
+
+class ApiError(Exception):
+    """HTTP durum koduyla birlikte istemciye döndürülecek hata."""
+
+    def __init__(self, status_code: int, message: str, headers: dict = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.headers = headers or {}
+
+
+class JobGate:
+    """Süreç havuzuna giden işleri sınırlar.
+
+    - En fazla MAX_CONCURRENT iş aynı anda çalışır.
+    - En fazla MAX_QUEUE iş sırada bekleyebilir; fazlası hemen reddedilir.
+    - Her kiracı en fazla MAX_PER_TENANT iş bekletebilir/çalıştırabilir,
+      böylece tek bir sistem tüm kapasiteyi tüketemez.
+    - Her kiracının istek hızı bir jeton kovasıyla sınırlıdır (RATE_PER_MINUTE,
+      anlık en fazla RATE_BURST); istemci IP'si ayrıca kendi kovasından
+      (IP_RATE_PER_MINUTE) harcar. Kova boşsa 429 ve Retry-After döner.
+
+    İstemci (kiracı, IP) çiftidir (client_of); tanınmayan kiracılar IP'leriyle sayılır.
+
+    Sıra bekleme süreleri ve nedene göre retler admission.AdmissionMetrics'te tutulur.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, max_per_tenant: int, limiter: RateLimiter = None):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_queue = max_queue
+        self.max_per_tenant = max_per_tenant
+        self.waiting = 0
+        self.running = 0
+        self.per_tenant = {}
+        self.rejected = 0
+        self.completed = 0
+        self.limiter = limiter if limiter is not None else RateLimiter({
+            'kiraci': (RATE_PER_MINUTE, RATE_BURST),
+            'ip': (IP_RATE_PER_MINUTE, IP_RATE_BURST),
+        })
+        self.metrics = AdmissionMetrics()
+
+    def reject(self, reason: str):
+        """Ret sayaçlarını artırır (boyut retleri işleyicilerden de sayılır)."""
+        self.rejected += 1
+        self.metrics.reject(reason)
+
+    async def enter(self, client: tuple):
+        """Kabul kontrollerini yapar ve bir iş slotu alır.
+
+        Reddedilirse ApiError fırlatılır. Dönüşten sonra slot ve kiracı sayacı
+        çağıranındır: run() slotu işin bitiş geri çağrısında, akış yanıtları
+        (GatedStream) yanıt bittiğinde leave() ile bırakır.
+        """
+        tenant, ip = client
+        if self.waiting >= self.max_queue:
+            self.reject('sira_dolu')
+            raise ApiError(503, 'Sunucu meşgul, lütfen daha sonra tekrar deneyin.', {'Retry-After': '2'})
+        if self.per_tenant.get(tenant, 0) >= self.max_per_tenant:
+            self.reject('kiraci')
+            raise ApiError(429, f"'{tenant}' için eşzamanlı istek sınırı aşıldı.", {'Retry-After': '1'})
+        retry_after = self.limiter.check((('kiraci', tenant), ('ip', ip)))
+        if retry_after:
+            self.reject('hiz')
+            raise ApiError(429, f"'{tenant}' için istek hızı sınırı aşıldı.",
+                           {'Retry-After': str(math.ceil(retry_after))})
+
+        self.per_tenant[tenant] = self.per_tenant.get(tenant, 0) + 1
+        try:
+            self.waiting += 1
+            started = time.monotonic()
+            try:
+                await self.semaphore.acquire()
+            finally:
+                self.waiting -= 1
+        except BaseException:
+            self._leave_tenant(tenant)
+            raise
+        self.running += 1
+        self.metrics.admit(time.monotonic() - started)
+
+    def leave(self, client: tuple):
+        """enter() ile alınan slotu ve kiracı sayacını bırakır."""
+        self._release(None)
+        self._leave_tenant(client[0])
+
+    async def run(self, client: tuple, pool, fn, *args):
+        await self.enter(client)
+        holding = True  # slot bu çağrıda mı (True) yoksa işin bitiş geri çağrısında mı boşalacak
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(pool, fn, *args)
+            # Slot, zaman aşımında değil işçi işi gerçekten bitirdiğinde boşalır;
+            # böylece zaman aşımına uğrayan işler havuzu aşırı yükleyemez.
+            future.add_done_callback(self._release)
+            holding = False
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), JOB_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise ApiError(504, 'Analiz zaman aşımına uğradı.')
+        except BrokenExecutor:
+            logger.exception('Süreç havuzu kullanılamıyor')
+            raise ApiError(503, 'Analiz işçileri kullanılamıyor, lütfen daha sonra tekrar deneyin.')
+        except (ApiError, asyncio.CancelledError):
+            raise
+        except Exception as e:  # işçideki ayrıştırma/eşleştirme hatası (örn. bozuk PDF)
+            logger.warning('%s işi başarısız: %s: %s', getattr(fn, '__name__', fn), type(e).__name__, e)
+            raise ApiError(422, f'Gönderilen veri işlenemedi ({type(e).__name__}).')
+        finally:
+            if holding:
+                self._free_slot()
+            self._leave_tenant(client[0])
+
+    def _leave_tenant(self, tenant: str):
+        self.per_tenant[tenant] -= 1
+        if self.per_tenant[tenant] == 0:
+            del self.per_tenant[tenant]
+
+    def _free_slot(self):
+        self.running -= 1
+        self.semaphore.release()
+
+    def _release(self, _future):
+        self._free_slot()
+        self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            'running': self.running,
+            'waiting': self.waiting,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            # /health kimlik doğrulamasız; kiracı kimlikleri ve IP'ler yerine yalnızca sayı
+            'tenants': len(self.per_tenant),
+            **self.metrics.snapshot(),
+        }
+
+
+class GatedStream(StreamingResponse):
+    """JobGate slotunu yanıt bitene (veya istemci bağlantıyı kesene) kadar tutan akış yanıtı.
+
+    Slot önceden gate.enter() ile alınmış olmalıdır; yanıt hangi yolla biterse
+    bitsin gate.leave() çağrılır ve parça üreteci kapatılır (bekleyen işler iptal edilir).
+    """
+
+    def __init__(self, gate: JobGate, client: tuple, chunks, **kwargs):
+        super().__init__(chunks, **kwargs)
+        self.gate = gate
+        self.client = client
+        self.chunks = chunks
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                self.chunks.close()
+            except ValueError:  # üreteç hâlâ bir iş parçacığında çalışıyor; çöp toplayıcı kapatır
+                pass
+            self.gate.leave(self.client)
+
+
+# ===== HTTP İŞLEYİCİLERİ =====
+
+def _too_large() -> ApiError:
+    return ApiError(413, f'Dosya boyutu sınırı aşıldı ({MAX_UPLOAD_BYTES / (1024 * 1024):g} MB).')
+
+
+async def read_body(request: Request) -> bytes:
+    """Ham istek gövdesini okur; boyut sınırını (MAX_UPLOAD_BYTES) akış sırasında uygular."""
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise _too_large()
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            raise _too_large()
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+async def read_json(request: Request):
+    """İstekten JSON gövdesini okur (yüklemelerle aynı boyut sınırıyla)."""
+    body = await read_body(request)
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise ApiError(400, 'Geçersiz JSON gövdesi.')
+
+
+async def read_pdf(request: Request) -> bytes:
+    """İstekten PDF baytlarını okur; boyut sınırını akış sırasında uygular.
+
+    Ham gövde (Content-Type: application/pdf) veya multipart 'file' alanı kabul edilir.
+    """
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith('multipart/form-data'):
+        content_length = request.headers.get('content-length')
+        if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+            raise _too_large()
+        form = await request.form(max_files=1, max_part_size=MAX_UPLOAD_BYTES)
+        upload = form.get('file')
+        if upload is None or not hasattr(upload, 'read'):
+            raise ApiError(400, "Multipart istekte 'file' alanı bulunamadı.")
+        pdf_bytes = await upload.read()
+        if len(pdf_bytes) > MAX_UPLOAD_BYTES:
+            raise _too_large()
+    else:
+        pdf_bytes = await read_body(request)
+
+    if not pdf_bytes.startswith(b'%PDF'):
+        raise ApiError(415, 'Gönderilen dosya bir PDF değil.')
+    return pdf_bytes
+
+
+def resolve_mufredat(request: Request) -> str:
+    """?mufredat=2022 (ve isteğe bağlı ?bolum=makine) parametrelerinden müfredat dosya yolunu bulur."""
+    bolum = request.query_params.get('bolum') or None
+    if bolum is not None and bolum not in get_registry().departments:
+        raise ApiError(400, f"Geçersiz bölüm: '{bolum}'. Seçenekler: {', '.join(get_registry().departments)}")
+    options = list_mufredatlar(bolum)
+    yil = request.query_params.get('mufredat', '')
+    if yil not in options:
+        raise ApiError(400, f"Geçersiz müfredat: '{yil}'. Seçenekler: {', '.join(options)}")
+    return options[yil]
+
+
+def client_of(request: Request) -> tuple:
+    """İsteği gönderen (kiracı, IP) çiftini belirler.
+
+    X-Tenant-ID başlığı yalnızca MTS_API_TENANTS'ta tanımlı bir kiracıyı
+    gösteriyorsa dikkate alınır; kiracının anahtarı varsa X-Tenant-Key ile
+    eşleşmelidir (aksi halde 401). Tanınmayan başlık yok sayılır ve istemci
+    IP'siyle tanınır; böylece her istekte farklı bir başlık göndermek yeni bir
+    jeton kovası açmaz.
+    """
+    ip = request.client.host if request.client else 'anonim'
+    tenant = request.headers.get('x-tenant-id')
+    if tenant not in TENANTS:
+        return ip, ip
+    key = TENANTS[tenant]
+    if key is not None and not hmac.compare_digest(request.headers.get('x-tenant-key', '').encode(), key.encode()):
+        raise ApiError(401, f"'{tenant}' kiracısı için geçersiz anahtar.")
+    return tenant, ip
+
+
+async def health(request: Request):
+    return JSONResponse({'status': 'ok', 'workers': WORKERS, 'jobs': request.app.state.gate.stats()})
+
+
+async def mufredatlar(request: Request):
+    registry = get_registry()
+    return JSONResponse({
+        'mufredatlar': list(list_mufredatlar()),
+        'bolumler': {
+            slug: {'ad': department.name, 'mufredatlar': [str(yil) for yil in department.years()]}
+            for slug, department in registry.departments.items()
+        },
+    })
+
+
+async def parse(request: Request):
+    pdf_bytes = await read_pdf(request)
+    state = request.app.state
+    data = await state.gate.run(client_of(request), state.pool, parse_job, pdf_bytes)
+    return JSONResponse(data)
+
+
+async def match(request: Request):
+    mufredat_path = resolve_mufredat(request)
+    payload = await read_json(request)
+    transkript = payload.get('transkript') if isinstance(payload, dict) else None
+    if not isinstance(transkript, list):
+        raise ApiError(400, "JSON gövdesinde 'transkript' listesi bulunmalı.")
+    if not all(isinstance(ders, dict) for ders in transkript):
+        raise ApiError(400, "'transkript' listesindeki her ders bir nesne olmalı.")
+    try:
+        agno = float(payload.get('agno', 0.0) or 0.0)
+    except (TypeError, ValueError):
+        raise ApiError(400, "'agno' bir sayı olmalı.")
+    if not 0.0 <= agno <= 4.0:  # NaN ve sonsuz da reddedilir
+        raise ApiError(400, "'agno' 0 ile 4 arasında olmalı.")
+    state = request.app.state
+    data = await state.gate.run(client_of(request), state.pool, match_job, transkript, agno, mufredat_path)
+    return JSONResponse(data)
+
+
+async def analyze(request: Request):
+    mufredat_path = resolve_mufredat(request)
+    pdf_bytes = await read_pdf(request)
+    state = request.app.state
+    data = await state.gate.run(client_of(request), state.pool, analyze_job, pdf_bytes, mufredat_path)
+    return JSONResponse(data)
+
+
+async def reports(request: Request):
+    """Öğrenci listesi için raporları üretir ve ZIP olarak akış halinde döndürür.
+
+    Gövde: {'ogrenciler': [{'ad', 'results', 'summary', 'mufredat'}, ...]}
+    (boyutu MAX_UPLOAD_BYTES ile sınırlı). İstek diğer işler gibi JobGate'ten
+    geçer ve yanıt bitene kadar tek bir slot tutar; raporlar uygulamanın süreç
+    havuzunda birer birer üretilip parça parça gönderilir.
+    """
+    payload = await read_json(request)
+    ogrenciler = payload.get('ogrenciler') if isinstance(payload, dict) else None
+    if not isinstance(ogrenciler, list) or not ogrenciler:
+        raise ApiError(400, "JSON gövdesinde boş olmayan 'ogrenciler' listesi bulunmalı.")
+    if len(ogrenciler) > MAX_COHORT:
+        raise ApiError(413, f'Tek istekte en fazla {MAX_COHORT} rapor üretilebilir.')
+    for ogrenci in ogrenciler:
+        if not isinstance(ogrenci, dict) or not {'ad', 'results', 'summary'} <= ogrenci.keys():
+            raise ApiError(400, "Her öğrenci kaydında 'ad', 'results' ve 'summary' alanları bulunmalı.")
+
+    state = request.app.state
+    client = client_of(request)
+    await state.gate.enter(client)
+    # Tek slot, havuzda aynı anda tek rapor demektir
+    chunks = iter_cohort_zip(ogrenciler, state.pool, max_in_flight=1)
+    return GatedStream(state.gate, client, chunks, media_type='application/zip', headers={
+        'Content-Disposition': 'attachment; filename="mezuniyet_raporlari.zip"',
+    })
+
+
+async def api_error_handler(request: Request, exc: ApiError):
+    if exc.status_code == 413:
+        request.app.state.gate.reject('boyut')
+    return JSONResponse({'error': exc.message}, status_code=exc.status_code, headers=exc.headers)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # İşçiler müfredatları ve eşdeğerlikleri paylaşımlı paketten bağlar
+    app.state.pool = ProcessPoolExecutor(max_workers=WORKERS, initializer=attach_worker,
+                                         initargs=(publish_default(),))
+    app.state.gate = JobGate(MAX_CONCURRENT, MAX_QUEUE, MAX_PER_TENANT)
+    try:
+        yield
+    finally:
+        app.state.pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health, methods=['GET']),
+        Route('/mufredatlar', mufredatlar, methods=['GET']),
+        Route('/parse', parse, methods=['POST']),
+        Route('/match', match, methods=['POST']),
+        Route('/analyze', analyze, methods=['POST']),
+        Route('/reports', reports, methods=['POST']),
+    ],
+    exception_handlers={ApiError: api_error_handler},
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.environ.get('MTS_API_HOST', '127.0.0.1'), port=int(os.environ.get('MTS_API_PORT', '8000')))
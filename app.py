@@ -10,12 +10,36 @@ Kullanım:
 """
 
 import os
+import html
+import hmac
+import time
+import uuid
+import sqlite3
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 import streamlit as st
 import pandas as pd
 
-from pdf_parser import parse_transcript
-from matcher import match_courses, generate_summary
+from pdf_parser import parse_attempts, extract_student_id
+from matcher import compute_match_state, classify_matches, generate_summary, normalize_code, is_elective_slot, DEFAULT_THRESHOLD
 from report import generate_report
+from exporters import export_student, MIME_TYPES
+from memory_accounting import account_session, summarize_by_type
+from result_cache import ResultCache, cache_key, pdf_digest
+from equivalences import EquivalenceTable, Equivalences
+from pipeline import StagedPipeline
+from slow_runs import get_recorder
+from prewarm import Prewarm
+from curriculum_pack import attach_worker, publish_default
+from admission import AdmissionController, Rejected, batch_keys
+from curricula import Curriculum, CurriculumRegistry
+from planner import WhatIfPlanner, GRADE_OPTIONS
+from student_history import StudentHistory
+from transcript_delta import diff_transcripts, describe_changes, rematch
+from batch_analysis import (
+    BATCH_WORKERS, MAX_FILES, count_uploads, iter_uploads, iter_batch, status_row, cohort_item, cohort_summary,
+    export_items, reports_zip,
+)
 
 # ===== SAYFA YAPILANDIRMASI =====
 st.set_page_config(
@@ -149,6 +173,17 @@ st.markdown("""
         font-size: 0.95rem;
     }
 
+    /* Dönem ders listesi: müfredat / transkript sütunları tek HTML bloğunda */
+    .course-grid {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        column-gap: 1rem;
+    }
+    .course-grid-head {
+        font-weight: 600;
+        margin: 0.3rem 0;
+    }
+
     /* Sidebar stili */
     section[data-testid="stSidebar"] {
         background: linear-gradient(180deg, #1e3a5f 0%, #15293e 100%);
@@ -228,6 +263,9 @@ st.markdown("""
             font-size: 1rem;
             text-align: center;
         }
+        .course-grid {
+            grid-template-columns: 1fr;
+        }
         .course-success, .course-fail, .course-missing, .course-suspect, .course-ongoing {
             font-size: 0.9rem;
             padding: 0.8rem;
@@ -245,10 +283,164 @@ st.markdown("""
 
 # ===== YARDIMCI FONKSİYONLAR =====
 
-@st.cache_data
-def load_mufredat(filepath: str) -> pd.DataFrame:
-    """Müfredat Excel dosyasını yükler ve önbelleğe alır."""
-    return pd.read_excel(filepath)
+def memory_accounting_enabled() -> bool:
+    """Bellek muhasebesi modu: MTS_MEMORY_ACCOUNTING=1 ortam değişkeni veya ?bellek=1"""
+    return os.environ.get('MTS_MEMORY_ACCOUNTING') == '1' or st.query_params.get('bellek') == '1'
+
+
+def show_memory_accounting(objects: dict):
+    """Oturumun tuttuğu nesnelerin bellek dökümünü gösterir."""
+    session_objects = dict(objects)
+    for key in st.session_state.keys():
+        session_objects[f'session_state[{key!r}]'] = st.session_state[key]
+
+    accounting_df = account_session(session_objects)
+    st.markdown("---")
+    with st.expander("🧮 Oturum Bellek Kullanımı", expanded=False):
+        st.caption(f"Toplam ~{accounting_df['Bayt'].sum() / 1024:.1f} KB (paylaşımlı önbellek nesneleri dahil)")
+        st.dataframe(accounting_df, use_container_width=True, hide_index=True)
+        st.markdown("**Tür bazında**")
+        st.dataframe(summarize_by_type(accounting_df), use_container_width=True, hide_index=True)
+
+
+def profile_admin_enabled() -> bool:
+    """Yönetici görünümü (profiller, kabul metrikleri) açık mı?
+
+    MTS_PROFILE_ADMIN=1 ile tüm oturumlarda açılır. MTS_ADMIN_TOKEN tanımlıysa
+    adresine ?profil=<anahtar> ekleyen oturumda da açılır; anahtarsız bir sorgu
+    parametresi yetmez.
+    """
+    if os.environ.get('MTS_PROFILE_ADMIN') == '1':
+        return True
+    token = os.environ.get('MTS_ADMIN_TOKEN', '')
+    given = st.query_params.get('profil', '')
+    return bool(token) and hmac.compare_digest(given.encode('utf-8'), token.encode('utf-8'))
+
+
+def show_slow_run_captures():
+    """Bütçeyi aşan son analiz çalışmalarını listeler ve profillerini indirtir."""
+    recorder = get_recorder()
+    captures = recorder.captures()
+    with st.expander("🐢 Yavaş Çalışma Profilleri", expanded=False):
+        st.caption(f"Bütçe: {recorder.budget_ms:.0f} ms • Mod: {recorder.mode} • Dizin: `{recorder.directory}`")
+        st.caption(f"🔥 {get_prewarm().status()}")
+        if not captures:
+            st.info("Bütçeyi aşan çalışma kaydedilmedi.")
+            return
+        st.dataframe(
+            pd.DataFrame(captures, columns=['zaman', 'etiket', 'sure_ms', 'girdi_ozeti', 'mufredat', 'hata']),
+            use_container_width=True, hide_index=True,
+        )
+        secilen = st.selectbox(
+            "Profil",
+            options=range(len(captures)),
+            format_func=lambda i: f"{captures[i]['zaman']} • {captures[i]['sure_ms']:.0f} ms • {captures[i]['girdi_ozeti']}",
+        )
+        info = captures[secilen]
+        st.download_button(
+            label="⬇️ Profili İndir",
+            data=partial(recorder.read_profile, info),
+            file_name=info['profil'],
+            mime="application/json" if info['profil'].endswith('.json') else "application/octet-stream",
+            on_click="ignore",
+            use_container_width=True,
+        )
+        st.caption("speedscope JSON dosyaları https://www.speedscope.app ile, .prof dosyaları `python -m pstats` veya snakeviz ile açılır.")
+
+
+def show_admission_metrics():
+    """Kabul denetiminin anlık durumu: çalışan/bekleyen analizler, sıra bekleme süreleri, retler."""
+    admission = get_admission()
+    stats = admission.stats()
+    with st.expander("🚦 Kabul Denetimi", expanded=False):
+        st.caption(f"En fazla {admission.max_concurrent} eşzamanlı analiz • Sıra sınırı: {admission.max_queue} "
+                   f"• En uzun bekleme: {admission.max_wait:.0f} sn")
+        cols = st.columns(3)
+        cols[0].metric("Çalışan / Bekleyen", f"{stats['calisan']} / {stats['bekleyen']}")
+        cols[1].metric("Sıra Bekleme p95", f"{stats['sira_bekleme_ms']['p95']:.0f} ms",
+                       help=f"p50: {stats['sira_bekleme_ms']['p50']:.0f} ms • en fazla: {stats['sira_bekleme_ms']['en_fazla']:.0f} ms")
+        cols[2].metric("Kabul / Ret", f"{stats['kabul']} / {stats['ret']}")
+        if stats['ret_nedenleri']:
+            st.caption("Ret nedenleri: " + ", ".join(f"{k}: {v}" for k, v in stats['ret_nedenleri'].items()))
+
+
+@st.cache_resource
+def get_registry() -> CurriculumRegistry:
+    """Tüm oturumlarca paylaşılan müfredat kaydı; müfredatlar ilk seçildiklerinde yüklenir."""
+    return CurriculumRegistry()
+
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Tüm oturumlarca paylaşılan analiz sonuç önbelleği."""
+    return ResultCache(
+        max_entries=int(os.environ.get('MTS_RESULT_CACHE_SIZE', '256')),
+        directory=os.environ.get('MTS_RESULT_CACHE_DIR') or None,
+    )
+
+
+@st.cache_resource
+def get_equivalence_table() -> EquivalenceTable:
+    """Tüm oturumlarca paylaşılan ders eşdeğerlik tablosu (MTS_EQUIVALENCE_DB)."""
+    return EquivalenceTable()
+
+
+def open_equivalence_table():
+    """Eşdeğerlik tablosu; veritabanı açılamıyorsa None (analiz tablosuz sürer, sonraki çalıştırmada tekrar denenir)."""
+    try:
+        return get_equivalence_table()
+    except sqlite3.Error:
+        return None
+
+
+@st.cache_resource
+def get_student_history() -> StudentHistory:
+    """Tüm oturumlarca paylaşılan öğrenci yükleme geçmişi (MTS_HISTORY_DB)."""
+    return StudentHistory()
+
+
+@st.cache_resource
+def get_admission() -> AdmissionController:
+    """Tüm oturumlarca paylaşılan kabul denetimi: eşzamanlı analiz sınırı, sıra ve hız sınırları."""
+    return AdmissionController()
+
+
+def client_keys() -> tuple:
+    """Hız sınırlamasında kullanılan istemci anahtarları (oturum ve varsa IP)."""
+    oturum = st.session_state.setdefault('kabul:oturum', uuid.uuid4().hex)
+    ip = st.context.ip_address
+    return (('oturum', oturum),) + ((('ip', ip),) if ip else ())
+
+
+def show_rejection(error: Rejected):
+    """Kabul edilmeyen analiz için kullanıcıya kısa açıklama."""
+    st.warning(f"⏳ {error.message}")
+    if error.retry_after:
+        st.caption(f"Yaklaşık {max(1, round(error.retry_after))} sn sonra tekrar deneyebilirsiniz.")
+    st.button("🔄 Tekrar dene")
+
+
+def queue_notice(placeholder):
+    """Sırada beklerken yeri gösteren on_wait geri çağrısı."""
+    def on_wait(position: int, waited: float):
+        placeholder.info(f"⏳ Yoğunluk nedeniyle sıradasınız: {position}. sıra ({waited:.0f} sn)")
+    return on_wait
+
+
+@st.cache_resource
+def get_prewarm() -> Prewarm:
+    """Sunucu süreci başına bir kez başlatılan arka plan ısınması (MTS_PREWARM)."""
+    return Prewarm(get_registry(), open_equivalence_table()).start()
+
+
+@st.cache_resource
+def get_batch_pool() -> ProcessPoolExecutor:
+    """Toplu analiz ve toplu rapor üretimi için tüm oturumlarca paylaşılan süreç havuzu.
+
+    İşçiler müfredatları ve eşdeğerlikleri paylaşımlı paketten bağlar (curriculum_pack).
+    """
+    return ProcessPoolExecutor(max_workers=BATCH_WORKERS, initializer=attach_worker,
+                               initargs=(publish_default(get_registry(), open_equivalence_table()),))
 
 
 def get_donem_adi(donem_no: int) -> str:
@@ -269,6 +461,527 @@ def get_css_class(durum: str) -> str:
     }
     return mapping.get(durum, 'course-missing')
 
+def load_analysis(uploaded_file, curriculum: Curriculum, equivalences, pdf_hash: str, analysis_key: str,
+                  previous=None, history_version: str = '', client: tuple = ()):
+    """Eşikten bağımsız analiz (ayrıştırma + skor matrisi); paylaşımlı önbellekte yoksa hesaplanır.
+
+    Öğrencinin aynı sürümle (müfredat, kod, eşdeğerlik revizyonu) kaydedilmiş
+    önceki yüklemesi varsa yalnızca değişen transkript satırları yeniden
+    eşleştirilir; artımlı sonuç tam eşleştirmeyle aynı olmazsa tam eşleştirme
+    yapılır. Hesaplama profillenir; bütçeyi aşarsa profil yavaş çalışma
+    dizinine yazılır.
+
+    Önbellekte olmayan analiz kabul denetiminden geçer (get_admission): yer
+    yoksa sırada beklenir ve sıra gösterilir; hız veya sıra sınırı aşılırsa
+    Rejected fırlatılır.
+
+    Returns:
+        dict veya None: transkript_df, parsed_agno, attempts, match_state (ders çıkarılamazsa None)
+    """
+    result_cache = get_result_cache()
+    analysis = result_cache.get(analysis_key)
+    if analysis is not None:
+        return analysis
+
+    notice = st.empty()
+    with get_admission().slot(client, uploaded_file.size, on_wait=queue_notice(notice)), \
+            get_recorder().profile('analiz', pdf_hash, mufredat=curriculum.key):
+        notice.empty()
+        # ===== TRANSKRİPT İŞLEME =====
+        with st.spinner("📊 Transkript analiz ediliyor..."):
+            attempts, parsed_agno = parse_attempts(uploaded_file, rules=curriculum.rules)
+            transkript_df = attempts.latest_frame()
+        if transkript_df.empty:
+            return None
+
+        # ===== EŞLEŞTİRME =====
+        with st.spinner("🔍 Dersler eşleştiriliyor..."):
+            match_state = None
+            if previous is not None and previous.match_state is not None and previous.surum == history_version:
+                previous.match_state.rules = curriculum.rules
+                delta = diff_transcripts(previous.transkript_df, transkript_df)
+                match_state = rematch(previous.match_state, previous.transkript_df, transkript_df, delta,
+                                      curriculum.frame(), equivalences)
+            if match_state is None:
+                match_state = compute_match_state(curriculum.frame(), transkript_df, equivalences=equivalences,
+                                                  rules=curriculum.rules)
+
+    analysis = {
+        'transkript_df': transkript_df,
+        'parsed_agno': parsed_agno,
+        'attempts': attempts,
+        'match_state': match_state,
+    }
+    result_cache.put(analysis_key, analysis)
+    return analysis
+
+
+def load_results(analysis: dict, threshold: int, pdf_hash: str, equivalence_table, result_key: str,
+                 mufredat: str = '', ogrenci_no: str = '') -> dict:
+    """Verilen eşikle sınıflandırılmış sonuçlar ve özet; paylaşımlı önbellekte yoksa hesaplanır.
+
+    Önbellek kaydında PDF özeti, müfredat etiketi ve öğrenci numarası da
+    tutulur (cohort_reports --cache-dir bunlarla öğrenci başına tek rapor
+    üretir). Oturuma yalnızca dört alan döner; önbellek kaydına sonradan
+    eklenen rapor baytları oturumda tutulmaz.
+    """
+    result_cache = get_result_cache()
+    cached = result_cache.get(result_key)
+    if cached is None:
+        results = classify_matches(analysis['match_state'], threshold)
+        summary = generate_summary(results, analysis['transkript_df'], analysis['parsed_agno'],
+                                   analysis.get('attempts'))
+
+        # Yüksek skorlu bulanık eşleşmeler eşdeğerlik tablosuna aday olarak yazılır;
+        # tablo erişilemezse analiz etkilenmez
+        if equivalence_table is not None:
+            try:
+                equivalence_table.observe(analysis['match_state'], results, pdf_hash)
+            except sqlite3.Error:
+                pass
+
+        cached = {
+            'transkript_df': analysis['transkript_df'],
+            'parsed_agno': analysis['parsed_agno'],
+            'results': results,
+            'summary': summary,
+            'pdf_hash': pdf_hash,
+            'mufredat': mufredat,
+            'ogrenci_no': ogrenci_no,
+        }
+        result_cache.put(result_key, cached)
+    return {k: cached[k] for k in ('transkript_df', 'parsed_agno', 'results', 'summary')}
+
+
+def load_changes(history: StudentHistory, ogrenci: str, curriculum: Curriculum, pdf_hash: str,
+                 history_version: str, analysis: dict, entry: dict, previous) -> dict:
+    """Yüklemeyi öğrenci geçmişine yazar ve önceki yüklemeye göre değişenleri döndürür.
+
+    Returns:
+        dict veya None: zaman, pdf_hash, dersler (describe_changes), ozet
+        (önceki yüklemenin özeti); önceki yükleme yoksa None
+    """
+    try:
+        history.record(ogrenci, curriculum.key, pdf_hash, history_version, entry['transkript_df'],
+                       entry['parsed_agno'], analysis['match_state'], entry['summary'])
+    except sqlite3.Error:
+        pass  # geçmiş yazılamazsa analiz etkilenmez
+    if previous is None:
+        return None
+    delta = diff_transcripts(previous.transkript_df, entry['transkript_df'])
+    return {
+        'zaman': previous.zaman,
+        'pdf_hash': previous.pdf_hash,
+        'dersler': describe_changes(previous.transkript_df, entry['transkript_df'], delta),
+        'ozet': previous.summary,
+    }
+
+
+def show_term_gpa(summary: dict, attempts):
+    """Dönem başına ANO/AGNO, PDF'teki AGNO'nun doğrulaması ve tekrar alınan dersler."""
+    donemler = summary.get('donem_ortalamalari')
+    if not donemler:
+        return
+    dogrulama = summary['agno_dogrulama']
+    with st.expander("📈 Dönem Ortalamaları ve Tekrar Alınan Dersler", expanded=dogrulama['tutarli'] is False):
+        if dogrulama['tutarli'] is False:
+            st.warning(f"PDF'teki AGNO ({dogrulama['pdf']:.2f}) derslerden hesaplanandan "
+                       f"({dogrulama['hesaplanan']:.2f}) farklı; transkript eksik okunmuş olabilir.")
+        elif dogrulama['tutarli']:
+            st.caption(f"✅ PDF'teki AGNO derslerden hesaplananla tutarlı ({dogrulama['hesaplanan']:.2f}).")
+        gpa_df = pd.DataFrame(donemler).rename(columns={'Donem': 'Dönem'})
+        st.dataframe(gpa_df, use_container_width=True, hide_index=True)
+        if gpa_df['AGNO'].notna().sum() > 1:
+            st.line_chart(gpa_df.set_index('Dönem')[['ANO', 'AGNO']])
+        retakes = attempts.retakes() if attempts is not None else None
+        if retakes is not None and not retakes.empty:
+            st.markdown("**Tekrar alınan dersler** (AGNO'da her dersin son notu sayılır)")
+            st.dataframe(retakes[['Ders_Kodu', 'Ders_Adi', 'Donem', 'AKTS', 'Harf_Notu']].rename(columns={
+                'Ders_Kodu': 'Ders Kodu', 'Ders_Adi': 'Ders Adı', 'Donem': 'Dönem', 'Harf_Notu': 'Not',
+            }), use_container_width=True, hide_index=True)
+
+
+def show_changes(changes: dict, summary: dict):
+    """Önceki yüklemeye göre özet farkları ve eklenen/notu değişen/çıkarılan dersler."""
+    onceki = changes['ozet']
+    st.markdown("### 🔄 Son Yüklemeden Bu Yana")
+    st.caption(f"Önceki yükleme: {time.strftime('%d.%m.%Y %H:%M', time.localtime(changes['zaman']))}")
+
+    def eksik_basarisiz(ozet):
+        return ozet['eksik_ders_sayisi'] + ozet['basarisiz_ders_sayisi']
+
+    cols = st.columns(4)
+    with cols[0]:
+        st.metric("🎯 Başarılı AKTS", int(summary['basarili_akts']),
+                  delta=int(summary['basarili_akts'] - onceki['basarili_akts']))
+    with cols[1]:
+        st.metric("📈 AGNO", summary['agno'], delta=round(summary['agno'] - onceki['agno'], 2))
+    with cols[2]:
+        st.metric("❌ Eksik/Başarısız", eksik_basarisiz(summary),
+                  delta=eksik_basarisiz(summary) - eksik_basarisiz(onceki), delta_color="inverse")
+    with cols[3]:
+        st.metric("🌐 İngilizce Oranı", f"%{summary['ingilizce_oran']}",
+                  delta=round(summary['ingilizce_oran'] - onceki['ingilizce_oran'], 1))
+    if onceki['mezuniyet_durumu'] != summary['mezuniyet_durumu']:
+        st.caption(f"Mezuniyet durumu: {onceki['mezuniyet_durumu']} → **{summary['mezuniyet_durumu']}**")
+
+    if changes['dersler']:
+        changes_df = pd.DataFrame(changes['dersler']).rename(columns={
+            'Ders_Kodu': 'Ders Kodu', 'Ders_Adi': 'Ders Adı', 'Degisiklik': 'Değişiklik',
+            'Onceki': 'Önceki', 'Yeni': 'Yeni',
+        })
+        st.dataframe(changes_df, use_container_width=True, hide_index=True)
+    else:
+        st.info("Transkriptte ders değişikliği yok.")
+
+
+def run_batch(files: list, curriculum: Curriculum, mufredat_adi: str, client: tuple = ()) -> dict:
+    """Yüklenen PDF/ZIP dosyalarını havuzda analiz eder; durum tablosu tamamlandıkça güncellenir.
+
+    Kabul denetimi PDF başınadır: istemcinin toplu analiz kovalarından dosya
+    sayısı kadar jeton alınır (reddedilirse Rejected) ve her PDF havuza
+    girmeden önce tek analizlerle aynı sıradan bir analiz yeri alır (PDF
+    başına boyut sınırı iter_uploads'ta uygulanır).
+
+    Returns:
+        dict: rows (durum tablosu satırları), items (dışa aktarma kayıtları), failed
+    """
+    admission = get_admission()
+    total = count_uploads(files)
+    admission.charge(batch_keys(client), min(total, MAX_FILES))  # MAX_FILES'tan sonrası işlenmez
+    progress = st.progress(0.0, text=f"0 / {total} transkript işlendi")
+    table = st.empty()
+    rows, items, failed = [], [], 0
+    last_draw = 0.0
+    for name, data, error in iter_batch(iter_uploads(files), get_batch_pool(), curriculum.path,
+                                        admission=admission):
+        rows.append(status_row(name, data, error))
+        if data is None:
+            failed += 1
+        else:
+            items.append(cohort_item(name, data, mufredat_adi))
+        # Tablo en fazla saniyede dört kez yeniden çizilir
+        if time.monotonic() - last_draw >= 0.25 or len(rows) == total:
+            table.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+            progress.progress(min(len(rows) / max(total, 1), 1.0), text=f"{len(rows)} / {total} transkript işlendi")
+            last_draw = time.monotonic()
+    progress.empty()
+    table.empty()
+    return {'rows': rows, 'items': items, 'failed': failed}
+
+
+def show_batch(batch: dict, mufredat_adi: str):
+    """Toplu analizin durum tablosu, grup özeti ve toplu dışa aktarma butonları."""
+    rows, items = batch['rows'], batch['items']
+    st.markdown("### 🗂️ Öğrenci Durumları")
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+    ozet = cohort_summary(items, batch['failed'])
+    st.markdown("### 📊 Grup Özeti")
+    cols = st.columns(4)
+    metric_data = [
+        ("👥 Analiz Edilen", f"{ozet['ogrenci']}", "#007bff"),
+        ("🎓 Mezuniyet Koşulu Sağlanan", f"{ozet['mezun_olabilir']}", "#28a745"),
+        ("📈 Ortalama AGNO", f"{ozet['ortalama_agno']}", "#007bff"),
+        ("⚠️ Hatalı Dosya", f"{ozet['hatali']}", "#dc3545"),
+    ]
+    for col, (label, value, color) in zip(cols, metric_data):
+        with col:
+            st.markdown(f"""
+            <div class="metric-card">
+                <p class="value" style="color: {color};">{value}</p>
+                <p class="label">{label}</p>
+            </div>
+            """, unsafe_allow_html=True)
+    if ozet['ingilizce_yetersiz']:
+        st.caption(f"İngilizce ders oranı %30'un altında olan öğrenci: **{ozet['ingilizce_yetersiz']}**")
+    for durum, n in ozet['durumlar'].items():
+        st.markdown(f"- {durum}: **{n}** öğrenci")
+    if ozet['sik_dersler']:
+        st.markdown("#### En Sık Eksik / Başarısız Dersler")
+        sik_df = pd.DataFrame(ozet['sik_dersler']).rename(columns={
+            'Ders_Kodu': 'Ders Kodu', 'Ders_Adi': 'Ders Adı', 'Ogrenci': 'Öğrenci Sayısı',
+        })
+        st.dataframe(sik_df, use_container_width=True, hide_index=True)
+
+    if not items:
+        return
+    st.markdown("---")
+    st.markdown("### 📥 Toplu İndirme")
+    stem = f"grup_{mufredat_adi.replace(' ', '_')}"
+    export_labels = {'xlsx': '📊 Excel', 'csv': '📑 CSV', 'jsonl': '🧾 JSON'}
+    cols = st.columns(len(export_labels) + 1)
+    with cols[0]:
+        st.download_button(
+            label="📦 PDF Raporları (ZIP)",
+            data=partial(reports_zip, items, get_batch_pool()),
+            file_name=f"mezuniyet_raporlari_{stem}.zip",
+            mime="application/zip",
+            on_click="ignore",
+            use_container_width=True,
+        )
+    for col, (fmt, label) in zip(cols[1:], export_labels.items()):
+        with col:
+            st.download_button(
+                label=label,
+                data=partial(export_items, items, fmt),
+                file_name=f"mezuniyet_sonuclari_{stem}.{fmt}",
+                mime=MIME_TYPES[fmt],
+                on_click="ignore",
+                use_container_width=True,
+            )
+
+
+def course_row_html(r) -> str:
+    """Bir müfredat satırının (müfredat dersi + transkript durumu) iki hücresini üretir."""
+    css_class = get_css_class(r['Durum'])
+    tur_badge = "🔴" if r['Tur'] == 'Zorunlu' else "🟡"
+    en_badge = ' <span style="background:#1565c0; color:white; padding:0.1rem 0.3rem; border-radius:3px; font-size:0.7rem; font-weight:600;">EN</span>' if r.get('Ingilizce', False) else ''
+    left = (
+        f'<div class="{css_class}">{tur_badge} <strong>{html.escape(str(r["Mufredat_Kodu"]))}</strong> — '
+        f'{html.escape(str(r["Mufredat_Adi"]))}{en_badge}'
+        f'<span style="float:right; font-weight:600;">{int(r["Mufredat_AKTS"])} AKTS</span></div>'
+    )
+
+    if r['Durum'] == 'Eksik':
+        right = f'<div class="{css_class}">{r["Ikon"]} <em>Ders transkriptte bulunamadı</em></div>'
+    elif r['Durum'] == 'Devam Ediyor':
+        tr_info = f"{html.escape(str(r['Transkript_Kodu']))} — {html.escape(str(r['Transkript_Adi']))}" if r['Transkript_Adi'] else ""
+        right = f'<div class="{css_class}">{r["Ikon"]} {tr_info}<span style="float:right;">[Devam Ediyor]</span></div>'
+    else:
+        skor_text = f" (Skor: {r['Eslesme_Skoru']})" if r['Eslesme_Skoru'] < 100 else ""
+        right = (
+            f'<div class="{css_class}">{r["Ikon"]} <strong>{html.escape(str(r["Transkript_Kodu"]))}</strong> — '
+            f'{html.escape(str(r["Transkript_Adi"]))}'
+            f'<span style="float:right; font-weight:600;">[{r["Transkript_Notu"]}]{skor_text}</span></div>'
+        )
+    return left + right
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def render_semester_blocks(results_digest: str, _results: list, donemler: tuple) -> list:
+    """Sonuç görünümünü dönem başına tek HTML bloğu olarak üretir.
+
+    Sonuçlar tek geçişte dönemlere ayrılır; her dönem (başlık + iki sütunlu
+    ders listesi) tek bir st.markdown çağrısıyla gösterilir. Çıktı sonuç
+    özetine (results_digest, örn. sonuç önbelleği anahtarı) göre önbelleklenir;
+    _results alt çizgiyle başladığı için Streamlit tarafından hash'lenmez.
+    """
+    by_donem = {}
+    for r in _results:
+        by_donem.setdefault(r['Donem'], []).append(r)
+
+    blocks = []
+    for donem_no in donemler:
+        donem_results = by_donem.get(donem_no)
+        if not donem_results:
+            continue
+        rows = ''.join(course_row_html(r) for r in donem_results)
+        blocks.append(
+            f'<div class="semester-header">📖 {get_donem_adi(donem_no)}</div>'
+            f'<div class="course-grid">'
+            f'<div class="course-grid-head">📚 Müfredat Dersi</div>'
+            f'<div class="course-grid-head">📝 Transkript Durumu</div>'
+            f'{rows}</div>'
+        )
+    return blocks
+
+
+@st.fragment
+def show_planner(results: list, transkript_df: pd.DataFrame, parsed_agno: float, summary: dict, result_key: str,
+                 attempts=None):
+    """Varsayımsal notlarla mezuniyet senaryosu; fragment olduğundan düzenlemeler yalnızca bu bölümü çalıştırır.
+
+    Planlayıcı ve tablo oturumda son sonuç anahtarıyla saklanır; her düzenlemede
+    yalnızca değişen satırlar planlayıcıya uygulanır (özet artımlı güncellenir).
+    """
+    st.markdown("---")
+    st.markdown("### 🧭 Ne Olur? Mezuniyet Planlayıcı")
+
+    editor_key = f'planlayici_tablo:{result_key}'
+    plan = st.session_state.get('planlayici')
+    if plan is None or plan['result_key'] != result_key:
+        rows = [i for i, r in enumerate(results) if r['Durum'] != 'Başarılı']
+        plan = st.session_state['planlayici'] = {
+            'result_key': result_key,
+            'planner': WhatIfPlanner(results, transkript_df, parsed_agno, summary, attempts),
+            'rows': rows,
+            'positions': {idx: pos for pos, idx in enumerate(rows)},
+            'table': pd.DataFrame({
+                'Ders': [f"{results[i]['Mufredat_Kodu']} — {results[i]['Mufredat_Adi']}" for i in rows],
+                'Durum': [results[i]['Durum'] for i in rows],
+                'AKTS': [int(results[i]['Mufredat_AKTS']) for i in rows],
+                'Varsayımsal Not': pd.Series([None] * len(rows), dtype=object),
+                'İngilizce': [bool(results[i].get('Ingilizce', False)) for i in rows],
+            }),
+        }
+    planner = plan['planner']
+
+    with st.expander("Planlayıcıyı Aç", expanded=bool(planner.planned)):
+        if not plan['rows']:
+            st.success("Tüm dersler başarılı; planlanacak ders yok. ✅")
+            return
+        st.caption("Eksik, başarısız veya devam eden derslere varsayımsal not verin; İngilizce şubesinden "
+                   "alınacak dersleri işaretleyin. Özet yalnızca değişen satırlarla güncellenir.")
+
+        # Düzenleme deltası (edited_rows) başlangıç tablosuna göre birikimlidir
+        edited = st.session_state.get(editor_key, {}).get('edited_rows', {})
+        for pos, change in edited.items():
+            idx = plan['rows'][int(pos)]
+            grade = change.get('Varsayımsal Not')
+            ingilizce = change.get('İngilizce', bool(results[idx].get('Ingilizce', False)))
+            # Satır yalnızca not boş ve İngilizce işareti gerçek değerindeyken sıfırlanır
+            if planner.planned.get(idx) == (grade or None, ingilizce):
+                continue
+            if grade:
+                planner.set_grade(idx, grade, ingilizce)
+            else:
+                planner.set_english(idx, ingilizce)
+        for idx in list(planner.planned):
+            if plan['positions'][idx] not in edited:
+                planner.reset(idx)
+
+        st.data_editor(
+            plan['table'],
+            key=editor_key,
+            hide_index=True,
+            use_container_width=True,
+            disabled=['Ders', 'Durum', 'AKTS'],
+            column_config={
+                'Varsayımsal Not': st.column_config.SelectboxColumn(options=list(GRADE_OPTIONS)),
+                'İngilizce': st.column_config.CheckboxColumn(),
+            },
+        )
+
+        senaryo = planner.summary()
+        cols = st.columns(4)
+        cols[0].metric("🎯 Başarılı AKTS", f"{int(senaryo['basarili_akts'])} / {int(senaryo['toplam_mufredat_akts'])}",
+                       delta=int(senaryo['basarili_akts'] - summary['basarili_akts']) or None)
+        cols[1].metric("📈 AGNO", f"{senaryo['agno']}",
+                       delta=round(senaryo['agno'] - summary['agno'], 2) or None)
+        cols[2].metric("❌ Eksik/Başarısız", senaryo['eksik_ders_sayisi'] + senaryo['basarisiz_ders_sayisi'],
+                       delta=(senaryo['eksik_ders_sayisi'] + senaryo['basarisiz_ders_sayisi']
+                              - summary['eksik_ders_sayisi'] - summary['basarisiz_ders_sayisi']) or None,
+                       delta_color="inverse")
+        cols[3].metric("🇬🇧 İngilizce Oranı", f"%{senaryo['ingilizce_oran']}",
+                       delta=round(senaryo['ingilizce_oran'] - summary['ingilizce_oran'], 1) or None)
+
+        if "Sağlanıyor" in senaryo['mezuniyet_durumu']:
+            st.success(f"**Senaryo: {senaryo['mezuniyet_durumu']}**")
+        elif "Devam" in senaryo['mezuniyet_durumu']:
+            st.info(f"**Senaryo: {senaryo['mezuniyet_durumu']}**")
+        else:
+            st.error(f"**Senaryo: {senaryo['mezuniyet_durumu']}**")
+
+        if planner.planned and st.button("↺ Senaryoyu Sıfırla", key=f'planlayici_sifirla:{result_key}'):
+            planner.clear()
+            st.session_state.pop(editor_key, None)
+            st.rerun(scope="fragment")
+
+
+@st.fragment
+def show_report_download(results: list, summary: dict, mufredat: str, changes: dict, result_key: str):
+    """PDF rapor indirme; rapor istenince üretilir, baytlar oturumda tutulmaz.
+
+    Rapor ilk istendiğinde bu fragment içinde üretilir; hata olursa kullanıcıya
+    gösterilir. Baytlar paylaşılan önbellekte saklanır ve indirme butonuna
+    onları önbellekten okuyan bir çağrılabilir verilir (indirme anında çalışır).
+    """
+    result_cache = get_result_cache()
+    # Değişiklik bölümü öğrencinin önceki yüklemesine bağlı; etikete o da girer
+    report_label = f"{mufredat}|{changes['pdf_hash'] if changes else ''}"
+
+    def build_report() -> bytes:
+        entry = result_cache.get(result_key) or {}
+        if entry.get('report_label') == report_label and 'report' in entry:
+            return entry['report']
+        pdf_bytes = generate_report(results, summary, mufredat,
+                                    degisiklikler=changes['dersler'] if changes else None)
+        result_cache.update(result_key, report=pdf_bytes, report_label=report_label)
+        return pdf_bytes
+
+    entry = result_cache.get(result_key) or {}
+    if entry.get('report_label') != report_label or 'report' not in entry:
+        if not st.button("📄 Sonuç Raporunu Hazırla", key=f'rapor_hazirla:{result_key}', use_container_width=True):
+            return
+        try:
+            with st.spinner("📄 Rapor hazırlanıyor..."):
+                build_report()
+        except Exception as e:
+            st.error(f"PDF oluşturulurken hata: {e}")
+            st.info("Rapor oluşturulamadı, lütfen tekrar deneyin.")
+            return
+
+    st.download_button(
+        label="📄 Sonuç Raporunu PDF Olarak İndir",
+        data=build_report,
+        file_name=f"mezuniyet_raporu_{mufredat.replace(' ', '_')}.pdf",
+        mime="application/pdf",
+        on_click="ignore",
+        use_container_width=True,
+    )
+
+
+@st.fragment
+def show_feedback_form(results: list, equivalence_table):
+    """Geri bildirim formu; ayrı bir fragment olduğundan gönderimi yalnızca bu bölümü yeniden çalıştırır."""
+    st.markdown("---")
+    st.markdown("### 🐛 Hata Bildir / Geri Bildirim")
+    st.info("Eşleşmeyen, yanlış eşleşen bir ders fark ettiyseniz veya sistemle ilgili bir öneriniz varsa form üzerinden bize iletebilirsiniz.")
+
+    # Kodu farklı olan eşleşmeler (önek/E eki varyasyonu, eşdeğerlik tablosu veya
+    # bulanık) formda seçilebilir; reddedilen çift PASS 2 ve PASS 3'te kullanılmaz
+    eslesme_secenekleri = {
+        f"{r['Mufredat_Kodu']} ↔ {r['Transkript_Kodu']} ({r['Transkript_Adi']})": r
+        for r in results
+        if equivalence_table is not None
+        and r.get('_tr_idx') is not None and not is_elective_slot(r['Mufredat_Kodu'])
+        and normalize_code(r['Mufredat_Kodu']) != normalize_code(r['Transkript_Kodu'])
+    }
+
+    with st.expander("Geri Bildirim Formunu Aç", expanded=False):
+        with st.form("feedback_form"):
+            fb_type = st.selectbox("Bildirim Türü", ["Yanlış Eşleşme", "Eksik Ders", "Yeni Özellik Önerisi", "Diğer Durumlar"])
+            fb_pair = st.selectbox(
+                "İlgili eşleşme (Yanlış Eşleşme için - İsteğe bağlı)",
+                ["—"] + list(eslesme_secenekleri),
+                help="Seçilen eşleşme yanlış olarak kaydedilir ve sonraki analizlerde kullanılmaz.",
+            )
+            fb_desc = st.text_area("Detaylı Açıklama (Örn: MMB104 dersi yanlış eşleşti, x olması gerekiyordu)")
+            fb_email = st.text_input("E-posta Adresiniz (Geri dönüş yapılmasını istiyorsanız - İsteğe bağlı)")
+            
+            submit_btn = st.form_submit_button("Gönder")
+            if submit_btn:
+                pair_saved = False
+                if fb_type == "Yanlış Eşleşme" and fb_pair in eslesme_secenekleri:
+                    r = eslesme_secenekleri[fb_pair]
+                    try:
+                        equivalence_table.reject(r['Mufredat_Kodu'], r['Transkript_Kodu'], r['Transkript_Adi'])
+                        pair_saved = True
+                        st.success(f"{fb_pair} eşleşmesi yanlış olarak kaydedildi; sonraki analizlerde kullanılmayacak.")
+                    except sqlite3.Error:
+                        st.warning("Eşleşme kaydedilemedi; lütfen bildirimi e-posta ile de iletin.")
+                if fb_desc.strip():
+                    # Geliştiricinin e-posta adresi
+                    dev_email = "bariskirli@trakya.edu.tr"  # Trakya Üniversitesi e-posta adresi
+                    
+                    # E-posta konu ve içeriği oluşturma
+                    subject = f"Mezuniyet Sistemi Bildirimi: {fb_type}"
+                    body = f"Bildirim Türü: {fb_type}%0D%0A"
+                    body += f"Kullanıcı E-postası: {fb_email if fb_email else 'Belirtilmedi'}%0D%0A"
+                    if fb_pair in eslesme_secenekleri:
+                        body += f"İlgili Eşleşme: {fb_pair}%0D%0A"
+                    body += "%0D%0A"
+                    body += f"Açıklama:%0D%0A{fb_desc.replace(chr(10), '%0D%0A')}"
+                    
+                    mailto_link = f"mailto:{dev_email}?subject={subject}&body={body}"
+                    
+                    st.success("Bildiriminiz için teşekkürler! Sistemin arka planı (veritabanı) henüz bağlı olmadığı için lütfen aşağıdaki linke tıklayarak bildirimi e-posta ile gönderin:")
+                    st.markdown(f'<a href="{mailto_link}" target="_blank" style="display: inline-block; padding: 0.5em 1em; color: white; background-color: #007bff; border-radius: 5px; text-decoration: none;">E-posta Göndermek İçin Tıklayın ✉️</a>', unsafe_allow_html=True)
+                elif not pair_saved:
+                    st.error("Lütfen formu göndermeden önce detaylı açıklama girin.")
+
+
 def show_footer():
     """Tüm sayfalarda ortaktır: Geliştirici bilgisini daha belirgin gösterir."""
     st.markdown("---")
@@ -306,19 +1019,28 @@ def main():
         st.markdown("## 📋 Ayarlar")
         st.markdown("---")
 
-        # Müfredat seçimi
+        # Müfredat seçimi (bölümler ve yıllar mufredatlar/ dizininden keşfedilir)
         st.markdown("### 📚 Müfredat Seçimi")
-        mufredat_options = {
-            "2018-2019 Müfredatı": "mufredatlar/mufredat_2018.xlsx",
-            "2022-2023 Müfredatı": "mufredatlar/mufredat_2022.xlsx",
-            "2024-2025 Müfredatı": "mufredatlar/mufredat_2024.xlsx",
-            "2025-2026 Müfredatı": "mufredatlar/mufredat_2025.xlsx",
-        }
-
+        registry = get_registry()
+        if not registry.departments:
+            st.error(f"⚠️ Müfredat bulunamadı: `{registry.root}`")
+            return
+        department = registry.department()
+        if len(registry.departments) > 1:
+            slugs = list(registry.departments)
+            selected_bolum = st.selectbox(
+                "Bölümü seçin:",
+                options=slugs,
+                index=slugs.index(department.slug),
+                format_func=lambda slug: registry.departments[slug].name,
+            )
+            department = registry.department(selected_bolum)
+
+        mufredat_options = {department.curricula[yil].label: department.curricula[yil] for yil in department.years()}
         selected_mufredat = st.selectbox(
             "Müfredat yılını seçin:",
             options=list(mufredat_options.keys()),
-            index=1,  # Varsayılan: 2022
+            index=list(mufredat_options.values()).index(department.default_curriculum()),
             help="Öğrencinin kayıtlı olduğu müfredat yılını seçin."
         )
 
@@ -326,11 +1048,27 @@ def main():
 
         # PDF yükleme
         st.markdown("### 📄 Transkript Yükleme")
-        uploaded_file = st.file_uploader(
-            "Transkript PDF dosyanızı yükleyin",
-            type=['pdf'],
-            help="Trakya Üniversitesi OBS'den aldığınız öğrenci not belgesini (transkript) yükleyin."
+        toplu = st.radio(
+            "Yükleme türü",
+            options=[False, True],
+            format_func=lambda v: "Toplu (çoklu PDF / ZIP)" if v else "Tek transkript",
+            horizontal=True,
+            help="Toplu modda bir danışmanlık grubunun transkriptleri (PDF'ler veya ZIP arşivi) birlikte analiz edilir.",
         )
+        uploaded_file, uploaded_files = None, []
+        if toplu:
+            uploaded_files = st.file_uploader(
+                "Transkript PDF'lerini veya ZIP arşivini yükleyin",
+                type=['pdf', 'zip'],
+                accept_multiple_files=True,
+                help="ZIP içindeki PDF'ler (alt klasörler dahil) tek tek açılıp analiz edilir.",
+            )
+        else:
+            uploaded_file = st.file_uploader(
+                "Transkript PDF dosyanızı yükleyin",
+                type=['pdf'],
+                help="Trakya Üniversitesi OBS'den aldığınız öğrenci not belgesini (transkript) yükleyin."
+            )
         st.markdown("---")
 
         # Eşleşme eşiği ayarı
@@ -339,22 +1077,44 @@ def main():
             "Bulanık eşleşme eşiği",
             min_value=50,
             max_value=100,
-            value=80,
+            value=DEFAULT_THRESHOLD,
             step=5,
-            help="Eşleşme skoru bu değerin üzerindeyse ders eşleşmiş sayılır.",
+            help="Eşleşme skoru bu değerin üzerindeyse ders eşleşmiş sayılır; "
+                 "altındaki yakın eşleşmeler 'Şüpheli Eşleşme' olarak gösterilir.",
         )
 
         st.markdown("---")
 
+        if profile_admin_enabled():
+            show_slow_run_captures()
+            show_admission_metrics()
+
     # ===== ANA İÇERİK =====
-    mufredat_path = mufredat_options[selected_mufredat]
+    curriculum = mufredat_options[selected_mufredat]
+    mufredat_path = curriculum.path
 
     # Müfredat dosyası kontrolü
     if not os.path.exists(mufredat_path):
         st.error(f"⚠️ Müfredat dosyası bulunamadı: `{mufredat_path}`")
         return
 
-    mufredat_df = load_mufredat(mufredat_path)
+    mufredat_df = curriculum.frame()
+
+    # ===== TOPLU ANALİZ =====
+    # Sonuçlar oturumda dosya kimlikleri ve müfredatla saklanır; indirme
+    # butonları veya eşik değişikliği analizi yeniden çalıştırmaz
+    if uploaded_files:
+        batch_inputs = (tuple(getattr(f, 'file_id', None) or (f.name, f.size) for f in uploaded_files), mufredat_path)
+        try:
+            batch = StagedPipeline(st.session_state).stage('toplu', batch_inputs, lambda: run_batch(
+                uploaded_files, curriculum, selected_mufredat, client_keys(),
+            ))
+        except Rejected as e:
+            show_rejection(e)
+            return
+        show_batch(batch, selected_mufredat)
+        show_footer()
+        return
 
     # Dosya yüklenmemişse bilgi göster
     if uploaded_file is None:
@@ -374,20 +1134,79 @@ def main():
                 st.caption(f"Dönem Toplam AKTS: **{int(toplam_akts)}**")
 
         show_footer()
+        # Karşılama sayfası gönderildikten sonra soğuk yollar arka planda ısıtılır;
+        # ilk gerçek transkript ayrıştırma/eşleştirme/rapor maliyetini ödemez
+        get_prewarm()
         return
 
-    # ===== TRANSKRİPT İŞLEME =====
-    with st.spinner("📊 Transkript analiz ediliyor..."):
-        transkript_df, parsed_agno = parse_transcript(uploaded_file)
+    # ===== AŞAMALI HAT + ÖNBELLEK =====
+    # Aşamalar oturumda girdileriyle saklanır ve yalnızca girdileri değişince
+    # yeniden hesaplanır (PDF yeniden özetlenmez, önbelleğe bakılmaz). Ayrıştırma
+    # ve skor matrisi eşikten bağımsızdır; eşik değişince yalnızca sınıflandırma
+    # ve özet yenilenir. Eşdeğerlik tablosu değiştiğinde (yeni onay/ret)
+    # revizyonu değişir ve analiz yenilenir.
+    # Boyut sınırını aşan PDF özetlenmeden ve ayrıştırılmadan reddedilir
+    try:
+        get_admission().check_size(uploaded_file.size)
+    except Rejected as e:
+        st.error(f"❌ {e.message}")
+        return
 
-    if transkript_df.empty:
+    pipeline = StagedPipeline(st.session_state)
+    # Tablo açılamıyor ya da okunamıyorsa analiz öğrenilmiş eşdeğerlikler olmadan sürer
+    equivalence_table = open_equivalence_table()
+    try:
+        equivalences = equivalence_table.snapshot() if equivalence_table is not None else Equivalences()
+    except sqlite3.Error:
+        equivalences = Equivalences()
+
+    upload_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+    pdf_hash = pipeline.stage('pdf_hash', (upload_id,), lambda: pdf_digest(uploaded_file))
+
+    # Öğrenci geçmişi: anahtar transkript başlığındaki öğrenci numarasının
+    # özetidir (elle girilen numarayla başkasının geçmişi görülemez); önceki yükleme
+    # yalnızca aynı sürümle (müfredat, kod, eşdeğerlik revizyonu) kaydedildiyse
+    # artımlı eşleştirmede kullanılır
+    history = get_student_history()
+    ogrenci_no = pipeline.stage('ogrenci_no', (pdf_hash,), lambda: extract_student_id(uploaded_file))
+    ogrenci = history.student_key(ogrenci_no)
+    history_version = cache_key('', mufredat_path, equivalences.revision)
+
+    def load_previous():
+        try:
+            return history.previous(ogrenci, curriculum.key, pdf_hash)
+        except sqlite3.Error:
+            return None
+
+    previous = pipeline.stage('onceki', (ogrenci, curriculum.key, pdf_hash), load_previous)
+
+    analysis_inputs = (pdf_hash, mufredat_path, equivalences.revision)
+    analysis_key = cache_key(*analysis_inputs)
+    try:
+        analysis = pipeline.stage('analysis', analysis_inputs, lambda: load_analysis(
+            uploaded_file, curriculum, equivalences, pdf_hash, analysis_key, previous, history_version,
+            client_keys(),
+        ))
+    except Rejected as e:
+        show_rejection(e)
+        return
+    if analysis is None:
         st.error("❌ Transkriptten ders verisi çıkarılamadı. Lütfen PDF formatını kontrol edin.")
         return
 
-    # ===== EŞLEŞTİRME =====
-    with st.spinner("🔍 Dersler eşleştiriliyor..."):
-        results = match_courses(mufredat_df, transkript_df)
-        summary = generate_summary(results, transkript_df, parsed_agno)
+    result_inputs = analysis_inputs + (threshold,)
+    result_key = cache_key(*result_inputs)
+    entry = pipeline.stage('results', result_inputs, lambda: load_results(
+        analysis, threshold, pdf_hash, equivalence_table, result_key, selected_mufredat, ogrenci_no,
+    ))
+    transkript_df = entry['transkript_df']
+    parsed_agno = entry['parsed_agno']
+    results = entry['results']
+    summary = entry['summary']
+
+    changes = pipeline.stage('gecmis', result_inputs + (ogrenci,), lambda: load_changes(
+        history, ogrenci, curriculum, pdf_hash, history_version, analysis, entry, previous,
+    ))
 
     # ===== ÖZET KARTLARI =====
     st.markdown("### 📊 Genel Durum")
@@ -419,6 +1238,13 @@ def main():
     else:
         st.error(f"**{summary['mezuniyet_durumu']}**")
 
+    # ===== SON YÜKLEMEDEN BU YANA =====
+    if changes is not None:
+        show_changes(changes, summary)
+
+    # ===== DÖNEM ORTALAMALARI =====
+    show_term_gpa(summary, analysis.get('attempts'))
+
     # ===== İNGİLİZCE DERS ORANI =====
     ing_oran = summary['ingilizce_oran']
     ing_toplam = summary['ingilizce_toplam_akts']
@@ -466,68 +1292,10 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
-    # Dönemlere göre grupla
-    donemler = sorted(mufredat_df['Donem'].unique())
-
-    for donem_no in donemler:
-        donem_results = [r for r in results if r['Donem'] == donem_no]
-        if not donem_results:
-            continue
-
-        st.markdown(f"""
-        <div class="semester-header">
-            📖 {get_donem_adi(donem_no)}
-        </div>
-        """, unsafe_allow_html=True)
-
-        # İki sütunlu layout
-        col_left, col_right = st.columns(2)
-
-        with col_left:
-            st.markdown("**📚 Müfredat Dersi**")
-
-        with col_right:
-            st.markdown("**📝 Transkript Durumu**")
-
-        for r in donem_results:
-            col_left, col_right = st.columns(2)
-            css_class = get_css_class(r['Durum'])
-
-            with col_left:
-                tur_badge = "🔴" if r['Tur'] == 'Zorunlu' else "🟡"
-                en_badge = ' <span style="background:#1565c0; color:white; padding:0.1rem 0.3rem; border-radius:3px; font-size:0.7rem; font-weight:600;">EN</span>' if r.get('Ingilizce', False) else ''
-                st.markdown(f"""
-                <div class="{css_class}">
-                    {tur_badge} <strong>{r['Mufredat_Kodu']}</strong> — {r['Mufredat_Adi']}{en_badge}
-                    <span style="float:right; font-weight:600;">{int(r['Mufredat_AKTS'])} AKTS</span>
-                </div>
-                """, unsafe_allow_html=True)
-
-            with col_right:
-                if r['Durum'] == 'Eksik':
-                    st.markdown(f"""
-                    <div class="{css_class}">
-                        {r['Ikon']} <em>Ders transkriptte bulunamadı</em>
-                    </div>
-                    """, unsafe_allow_html=True)
-                elif r['Durum'] == 'Devam Ediyor':
-                    tr_info = f"{r['Transkript_Kodu']} — {r['Transkript_Adi']}" if r['Transkript_Adi'] else ""
-                    st.markdown(f"""
-                    <div class="{css_class}">
-                        {r['Ikon']} {tr_info}
-                        <span style="float:right;">[Devam Ediyor]</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    skor_text = f" (Skor: {r['Eslesme_Skoru']})" if r['Eslesme_Skoru'] < 100 else ""
-                    st.markdown(f"""
-                    <div class="{css_class}">
-                        {r['Ikon']} <strong>{r['Transkript_Kodu']}</strong> — {r['Transkript_Adi']}
-                        <span style="float:right; font-weight:600;">
-                            [{r['Transkript_Notu']}]{skor_text}
-                        </span>
-                    </div>
-                    """, unsafe_allow_html=True)
+    # Dönemlere göre grupla; dönem başına tek HTML bloğu (sonuç özetine göre önbellekli)
+    donemler = tuple(sorted(mufredat_df['Donem'].unique()))
+    for block in render_semester_blocks(result_key, results, donemler):
+        st.markdown(block, unsafe_allow_html=True)
 
     # ===== EKSİK VE BAŞARISIZ DERSLER ÖZETİ =====
     eksik_dersler = [r for r in results if r['Durum'] == 'Eksik']
@@ -556,12 +1324,30 @@ def main():
 
         with tab3:
             if supheli_dersler:
+                st.caption("Onaylanan eşleşmeler eşdeğerlik tablosuna eklenir ve sonraki analizlerde doğrudan eşlenir; "
+                           "yanlış olarak işaretlenenler bir daha eşlenmez.")
                 for r in supheli_dersler:
-                    st.markdown(
-                        f"- **{r['Mufredat_Kodu']}** ({r['Mufredat_Adi']}) ↔ "
-                        f"**{r['Transkript_Kodu']}** ({r['Transkript_Adi']}) — "
-                        f"Skor: **{r['Eslesme_Skoru']}**"
-                    )
+                    col_text, col_ok, col_no = st.columns([6, 1, 1])
+                    with col_text:
+                        st.markdown(
+                            f"- **{r['Mufredat_Kodu']}** ({r['Mufredat_Adi']}) ↔ "
+                            f"**{r['Transkript_Kodu']}** ({r['Transkript_Adi']}) — "
+                            f"Skor: **{r['Eslesme_Skoru']}**"
+                        )
+                    if equivalence_table is None:
+                        continue  # tablo açılamadı; onay/ret kaydedilemez
+                    pair_key = f"{normalize_code(r['Mufredat_Kodu'])}_{normalize_code(r['Transkript_Kodu'])}"
+                    try:
+                        with col_ok:
+                            if st.button("✔ Onayla", key=f"esd_onay_{pair_key}"):
+                                equivalence_table.confirm(r['Mufredat_Kodu'], r['Transkript_Kodu'], r['Transkript_Adi'])
+                                st.rerun()
+                        with col_no:
+                            if st.button("✖ Yanlış", key=f"esd_ret_{pair_key}"):
+                                equivalence_table.reject(r['Mufredat_Kodu'], r['Transkript_Kodu'], r['Transkript_Adi'], kaynak='danisman')
+                                st.rerun()
+                    except sqlite3.Error:
+                        st.warning("Eşleşme eşdeğerlik tablosuna kaydedilemedi; lütfen tekrar deneyin.")
             else:
                 st.success("Şüpheli eşleşme bulunmuyor! ✅")
 
@@ -573,6 +1359,9 @@ def main():
             else:
                 st.success("Fazladan alınmış (müfredat dışı) ders bulunmuyor! ✅")
 
+    # ===== NE OLUR? PLANLAYICI =====
+    show_planner(results, transkript_df, parsed_agno, summary, result_key, analysis.get('attempts'))
+
     # ===== TRANSKRİPT HAM VERİ =====
     st.markdown("<br><br><br>", unsafe_allow_html=True)  # Araya boşluk ekledik
     st.markdown("---")
@@ -585,48 +1374,34 @@ def main():
     st.markdown("---")
     st.markdown("### 📥 Rapor İndirme")
 
-    try:
-        pdf_bytes = generate_report(results, summary, selected_mufredat)
-        st.download_button(
-            label="📄 Sonuç Raporunu PDF Olarak İndir",
-            data=pdf_bytes,
-            file_name=f"mezuniyet_raporu_{selected_mufredat.replace(' ', '_')}.pdf",
-            mime="application/pdf",
-            use_container_width=True,
-        )
-    except Exception as e:
-        st.error(f"PDF oluşturulurken hata: {e}")
-        st.info("Rapor oluşturulamadı, lütfen tekrar deneyin.")
+    show_report_download(results, summary, selected_mufredat, changes, result_key)
 
-    # ===== HATA BİLDİRİM FORMU (FEEDBACK) =====
-    st.markdown("---")
-    st.markdown("### 🐛 Hata Bildir / Geri Bildirim")
-    st.info("Eşleşmeyen, yanlış eşleşen bir ders fark ettiyseniz veya sistemle ilgili bir öneriniz varsa form üzerinden bize iletebilirsiniz.")
+    # Diğer sistemler için makine tarafından okunabilir çıktılar (PDF düzeni gerektirmez)
+    export_labels = {'jsonl': '🧾 JSON', 'csv': '📑 CSV', 'xlsx': '📊 Excel'}
+    export_cols = st.columns(len(export_labels))
+    for col, (fmt, label) in zip(export_cols, export_labels.items()):
+        with col:
+            st.download_button(
+                label=label,
+                data=partial(export_student, results, summary, fmt, mufredat=selected_mufredat),
+                file_name=f"mezuniyet_sonuclari_{selected_mufredat.replace(' ', '_')}.{fmt}",
+                mime=MIME_TYPES[fmt],
+                on_click="ignore",
+                use_container_width=True,
+            )
+
+    # ===== BELLEK MUHASEBESİ =====
+    if memory_accounting_enabled():
+        show_memory_accounting({
+            'Yüklenen dosya': uploaded_file,
+            'Transkript DataFrame': transkript_df,
+            'Eşleştirme sonuçları': results,
+            'Özet': summary,
+            'Müfredat (paylaşımlı önbellek)': mufredat_df,
+        })
 
-    with st.expander("Geri Bildirim Formunu Aç", expanded=False):
-        with st.form("feedback_form"):
-            fb_type = st.selectbox("Bildirim Türü", ["Yanlış Eşleşme", "Eksik Ders", "Yeni Özellik Önerisi", "Diğer Durumlar"])
-            fb_desc = st.text_area("Detaylı Açıklama (Örn: MMB104 dersi yanlış eşleşti, x olması gerekiyordu)")
-            fb_email = st.text_input("E-posta Adresiniz (Geri dönüş yapılmasını istiyorsanız - İsteğe bağlı)")
-            
-            submit_btn = st.form_submit_button("Gönder")
-            if submit_btn:
-                if fb_desc.strip():
-                    # Geliştiricinin e-posta adresi
-                    dev_email = "bariskirli@trakya.edu.tr"  # Trakya Üniversitesi e-posta adresi
-                    
-                    # E-posta konu ve içeriği oluşturma
-                    subject = f"Mezuniyet Sistemi Bildirimi: {fb_type}"
-                    body = f"Bildirim Türü: {fb_type}%0D%0A"
-                    body += f"Kullanıcı E-postası: {fb_email if fb_email else 'Belirtilmedi'}%0D%0A%0D%0A"
-                    body += f"Açıklama:%0D%0A{fb_desc.replace(chr(10), '%0D%0A')}"
-                    
-                    mailto_link = f"mailto:{dev_email}?subject={subject}&body={body}"
-                    
-                    st.success("Bildiriminiz için teşekkürler! Sistemin arka planı (veritabanı) henüz bağlı olmadığı için lütfen aşağıdaki linke tıklayarak bildirimi e-posta ile gönderin:")
-                    st.markdown(f'<a href="{mailto_link}" target="_blank" style="display: inline-block; padding: 0.5em 1em; color: white; background-color: #007bff; border-radius: 5px; text-decoration: none;">E-posta Göndermek İçin Tıklayın ✉️</a>', unsafe_allow_html=True)
-                else:
-                    st.error("Lütfen formu göndermeden önce detaylı açıklama girin.")
+    # ===== HATA BİLDİRİM FORMU (FEEDBACK) =====
+    show_feedback_form(results, equivalence_table)
 
     # ===== FOOTER =====
     show_footer()
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Ders Deneme Geçmişi
+===================
+Transkriptteki her ders satırı bir denemedir; tekrar alınan (veya kodu
+değişmiş: MAK224 -> MMB224) dersin önceki denemeleri de burada tutulur.
+Eşleştirme yalnızca her dersin son denemesini kullanır (latest_frame);
+dönem ortalamaları (ANO) ve dönem sonu AGNO'ları ise tüm denemelerden
+vektörel olarak hesaplanır.
+
+Günlük sütunsaldır (tek DataFrame): ders kodu ve adı paylaşılan (intern)
+metinler, not ve dönem kategorik, dönem sırası küçük tamsayıdır. Son
+denemelerin satır konumları ayrıştırmada bir kez bulunur; ders başına son
+deneme sözlükten O(1) okunur.
+
+AGNO kuralı: her dersin o döneme kadarki son *notlandırılmış* denemesi
+sayılır. Tekrar alınan ders devam ederken önceki notu ortalamada kalır;
+katsayısı olmayan notlar (BL, MU, EX, Devam Ediyor) ortalamaya girmez.
+
+Kullanım:
+    log, parsed_agno = parse_attempts(dosya, rules=curriculum.rules)
+    transkript_df = log.latest_frame()
+    log.term_gpa()           # dönem başına ANO / AGNO tablosu
+    log.verify_agno(parsed_agno)
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from matcher import GRADE_POINTS
+
+TRANSCRIPT_COLUMNS = ['Ders_Kodu', 'Ders_Adi', 'AKTS', 'Harf_Notu', 'Basarisiz', 'Donem']
+
+# PDF'teki AGNO iki basamağa yuvarlanmıştır; bu kadarlık fark tutarlı sayılır
+AGNO_TOLERANCE = 0.01
+
+# '2022-2023 Güz' -> (2022, 0); yaz okulu bahardan, muafiyet güzden önce sayılır
+TERM_PATTERN = re.compile(r'(20\d{2})\s*[-–]\s*20\d{2}\s*(\S*)')
+SEASON_ORDER = {'muaf': -1, 'güz': 0, 'guz': 0, 'bahar': 1, 'yaz': 2}
+
+
+def term_sort_key(donem: str) -> tuple:
+    """Dönem etiketinin kronolojik sıralama anahtarı; tanınmayan etiketler sona."""
+    match = TERM_PATTERN.search(str(donem))
+    if not match:
+        return (9999, 9)
+    return (int(match.group(1)), SEASON_ORDER.get(match.group(2).lower(), 3))
+
+
+class AttemptLog:
+    """Bir transkriptin tüm ders denemeleri.
+
+    Attributes:
+        frame: Denemeler (PDF sırasıyla); TRANSCRIPT_COLUMNS + Base_Kodu, Donem_Sira
+        terms: Dönem etiketleri, kronolojik (Donem_Sira bu listenin konumudur)
+        latest_rows: Her dersin son denemesinin satır konumu (PDF sırasıyla)
+        latest: Baz kod -> son denemenin satır konumu
+    """
+
+    __slots__ = ('frame', 'terms', 'latest_rows', 'latest', '_gpa')
+
+    def __init__(self, courses: list, rules):
+        frame = pd.DataFrame(courses, columns=TRANSCRIPT_COLUMNS)
+        frame['AKTS'] = frame['AKTS'].astype(float)
+        frame['Basarisiz'] = frame['Basarisiz'].astype(bool)
+        # Aynı ders farklı kodla tekrar alınmış olabilir (MAK224 -> MMB224);
+        # bölümün eşdeğer önekleri tek biçime indirilerek baz kod üretilir
+        frame['Base_Kodu'] = frame['Ders_Kodu'].map(lambda code: rules.base_code(str(code)))
+
+        # Harf notu ve dönem az sayıda farklı değer alır; kategorik tutulur
+        terms = sorted(frame['Donem'].unique(), key=term_sort_key)
+        frame['Harf_Notu'] = frame['Harf_Notu'].astype('category')
+        frame['Donem'] = frame['Donem'].astype('category')
+        frame['Donem_Sira'] = pd.Categorical(frame['Donem'], categories=terms).codes.astype(np.int16)
+
+        # Son deneme: baz koduyla PDF'te en son görünen satır
+        self.latest_rows = np.flatnonzero(~frame['Base_Kodu'].duplicated(keep='last').to_numpy())
+        self.latest = dict(zip(frame['Base_Kodu'].to_numpy()[self.latest_rows].tolist(),
+                               self.latest_rows.tolist()))
+        self.frame = frame
+        self.terms = [str(t) for t in terms]
+        self._gpa = None
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    # ===== SON DENEMELER =====
+
+    def latest_frame(self) -> pd.DataFrame:
+        """Her dersin son denemesi; eşleştiricinin kullandığı transkript tablosu."""
+        df = self.frame.take(self.latest_rows)[TRANSCRIPT_COLUMNS].reset_index(drop=True)
+        df['Harf_Notu'] = df['Harf_Notu'].cat.remove_unused_categories()
+        df['Donem'] = df['Donem'].cat.remove_unused_categories()
+        return df
+
+    def latest_attempt(self, base_code: str):
+        """Dersin son denemesi (pd.Series); ders transkriptte yoksa None."""
+        row = self.latest.get(base_code)
+        return None if row is None else self.frame.iloc[row]
+
+    def retakes(self) -> pd.DataFrame:
+        """Birden fazla denemesi olan derslerin tüm denemeleri (ders ve dönem sırasıyla)."""
+        counts = self.frame.groupby('Base_Kodu', sort=False)['Base_Kodu'].transform('size')
+        repeated = self.frame[counts.to_numpy() > 1]
+        return repeated.sort_values(['Base_Kodu', 'Donem_Sira'], kind='stable')
+
+    # ===== NOT ORTALAMALARI =====
+
+    def term_gpa(self) -> pd.DataFrame:
+        """Dönem başına ANO ve dönem sonu AGNO (tüm denemelerden, döngüsüz).
+
+        Returns:
+            pd.DataFrame: Donem, AKTS (dönemde notlandırılan), ANO, AGNO
+        """
+        if self._gpa is not None:
+            return self._gpa
+        n_terms = len(self.terms)
+        points = self.frame['Harf_Notu'].astype(object).map(GRADE_POINTS).to_numpy(dtype=float, na_value=np.nan)
+        graded = ~np.isnan(points)
+        akts = self.frame['AKTS'].to_numpy()[graded]
+        weighted = points[graded] * akts
+        term = self.frame['Donem_Sira'].to_numpy()[graded].astype(np.intp)
+
+        # ANO: dönemde notlandırılan tüm denemeler
+        term_credits = np.bincount(term, weights=akts, minlength=n_terms)
+        term_points = np.bincount(term, weights=weighted, minlength=n_terms)
+
+        # AGNO: deneme, dersin bir sonraki notlandırılmış denemesinin dönemine
+        # kadar sayılır; başlangıçta eklenip bitişte çıkarılan katkıların
+        # kümülatif toplamı her dönem sonundaki ortalamayı verir
+        base = self.frame['Base_Kodu'].to_numpy()[graded]
+        order = np.lexsort((np.arange(len(term)), term, base))
+        same_next = np.zeros(len(order), dtype=bool)
+        same_next[:-1] = base[order][1:] == base[order][:-1]
+        ends = np.full(len(order), n_terms, dtype=np.intp)
+        ends[:-1][same_next[:-1]] = term[order][1:][same_next[:-1]]
+        end = np.empty_like(ends)
+        end[order] = ends
+        cum_credits = np.cumsum(np.bincount(term, weights=akts, minlength=n_terms + 1)
+                                - np.bincount(end, weights=akts, minlength=n_terms + 1))[:n_terms]
+        cum_points = np.cumsum(np.bincount(term, weights=weighted, minlength=n_terms + 1)
+                               - np.bincount(end, weights=weighted, minlength=n_terms + 1))[:n_terms]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ano = np.where(term_credits > 0, term_points / term_credits, np.nan)
+            agno = np.where(cum_credits > 1e-9, cum_points / cum_credits, np.nan)
+        self._gpa = pd.DataFrame({
+            'Donem': self.terms,
+            'AKTS': term_credits,
+            'ANO': np.round(ano, 2),
+            'AGNO': np.round(agno, 2),
+        })
+        return self._gpa
+
+    def counted_rows(self) -> dict:
+        """Baz kod -> AGNO'da sayılan denemenin satır konumu.
+
+        Sayılan, dersin (dönem, PDF sırasıyla) son notlandırılmış denemesidir;
+        tekrar alınan dersin önceki notu yeni deneme notlanana kadar geçerlidir.
+        Notlandırılmış denemesi olmayan ders sözlükte yer almaz.
+        """
+        points = self.frame['Harf_Notu'].astype(object).map(GRADE_POINTS).to_numpy(dtype=float, na_value=np.nan)
+        rows = np.flatnonzero(~np.isnan(points))
+        rows = rows[np.lexsort((rows, self.frame['Donem_Sira'].to_numpy()[rows]))]
+        return dict(zip(self.frame['Base_Kodu'].to_numpy()[rows].tolist(), rows.tolist()))
+
+    def agno(self) -> float:
+        """Son dönem sonundaki AGNO; notlandırılmış ders yoksa 0.
+
+        term_gpa()'nın son satırıyla aynı kuraldır, ancak kümülatif ekleme/çıkarma
+        yerine sayılan denemelerden doğrudan toplanır (yuvarlama sınırında
+        planlayıcıyla aynı sonucu verir).
+        """
+        rows = list(self.counted_rows().values())
+        akts = self.frame['AKTS'].to_numpy()[rows]
+        points = self.frame['Harf_Notu'].astype(object).to_numpy()[rows]
+        credits = akts.sum()
+        if credits <= 0:
+            return 0.0
+        return round(float(sum(GRADE_POINTS[g] * a for g, a in zip(points, akts)) / credits), 2)
+
+    def verify_agno(self, parsed_agno: float, tolerance: float = AGNO_TOLERANCE) -> dict:
+        """PDF'teki AGNO'yu denemelerden hesaplananla karşılaştırır.
+
+        Returns:
+            dict: hesaplanan, pdf, fark, tutarli (PDF'te AGNO yoksa None)
+        """
+        hesaplanan = self.agno()
+        if not parsed_agno:
+            return {'hesaplanan': hesaplanan, 'pdf': 0.0, 'fark': 0.0, 'tutarli': None}
+        fark = round(parsed_agno - hesaplanan, 2)
+        return {'hesaplanan': hesaplanan, 'pdf': float(parsed_agno), 'fark': fark,
+                'tutarli': abs(fark) <= tolerance + 1e-9}
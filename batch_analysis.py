@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Toplu Transkript Analizi
+========================
+Danışmanın bir danışmanlık grubunun transkriptlerini (birden fazla PDF veya
+bunları içeren ZIP arşivleri) tek seferde analiz etmesi için yardımcılar.
+
+Yüklenen dosyalar (ZIP arşivleri dahil) Streamlit tarafından zaten bütünüyle
+bellekte tutulur; burada sınırlanan, arşivden açılan PDF'lerdir. ZIP üyeleri
+sırayla açılır ve diske çıkarılmaz: açılmış PDF baytlarından aynı anda
+yalnızca havuzdaki işlerinkiler bellektedir (her biri MAX_UPLOAD_BYTES ile
+sınırlı).
+Her PDF bir süreç havuzunda ayrıştırılır, eşleştirilir ve özetlenir
+(api.analyze_job); sonuçlar tamamlandıkça (tamamlanma sırasıyla) verilir,
+böylece arayüz öğrenci başına durum tablosunu canlı doldurabilir.
+
+Kullanım:
+    for olay in iter_batch(iter_uploads(dosyalar), havuz, mufredat_path):
+        ad, veri, hata = olay
+"""
+
+import io
+import os
+import zipfile
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from admission import Rejected
+from api import analyze_job, MAX_UPLOAD_BYTES
+from exporters import export_cohort
+from cohort_reports import write_cohort_zip
+
+# Tek toplu analizde işlenecek en fazla PDF sayısı
+MAX_FILES = int(os.environ.get('MTS_BATCH_MAX_FILES', '300'))
+BATCH_WORKERS = int(os.environ.get('MTS_BATCH_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+
+
+# ===== GİRDİLER =====
+
+def _is_pdf_member(info: zipfile.ZipInfo) -> bool:
+    name = info.filename
+    base = os.path.basename(name)
+    return (not info.is_dir() and name.lower().endswith('.pdf')
+            and not name.startswith('__MACOSX/') and not base.startswith('.'))
+
+
+def count_uploads(files) -> int:
+    """İşlenecek PDF sayısı (ZIP'lerde yalnızca merkezi dizin okunur)."""
+    total = 0
+    for f in files:
+        if f.name.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(f) as zf:
+                    total += sum(1 for info in zf.infolist() if _is_pdf_member(info))
+            except zipfile.BadZipFile:
+                total += 1
+            f.seek(0)
+        else:
+            total += 1
+    return total
+
+
+def iter_uploads(files):
+    """Yüklenen dosyalardan (ad, pdf_baytları, hata) üçlüleri üretir.
+
+    ZIP arşivlerindeki PDF'ler tek tek açılır. Boyut sınırını (MAX_UPLOAD_BYTES)
+    aşan, PDF olmayan veya okunamayan girdiler hata metniyle verilir;
+    MAX_FILES'tan sonrası işlenmez.
+    """
+    count = 0
+    for f in files:
+        if f.name.lower().endswith('.zip'):
+            try:
+                zf = zipfile.ZipFile(f)
+            except zipfile.BadZipFile:
+                yield f.name, None, 'Geçersiz ZIP arşivi'
+                continue
+            with zf:
+                for info in zf.infolist():
+                    if not _is_pdf_member(info):
+                        continue
+                    count += 1
+                    if count > MAX_FILES:
+                        yield info.filename, None, f'Toplu analizde en fazla {MAX_FILES} PDF işlenebilir'
+                        return
+                    # Bildirilen boyut açmadan önce kontrol edilir (sıkıştırma bombası)
+                    if info.file_size > MAX_UPLOAD_BYTES:
+                        yield info.filename, None, 'Dosya boyutu sınırı aşıldı'
+                        continue
+                    try:
+                        with zf.open(info) as member:
+                            pdf_bytes = member.read(MAX_UPLOAD_BYTES + 1)
+                    except (zipfile.BadZipFile, RuntimeError, OSError) as e:
+                        yield info.filename, None, f'Arşivden okunamadı: {e}'
+                        continue
+                    yield info.filename, pdf_bytes, _check_pdf(pdf_bytes)
+            f.seek(0)
+        else:
+            count += 1
+            if count > MAX_FILES:
+                yield f.name, None, f'Toplu analizde en fazla {MAX_FILES} PDF işlenebilir'
+                return
+            pdf_bytes = f.getvalue()
+            yield f.name, pdf_bytes, _check_pdf(pdf_bytes)
+
+
+def _check_pdf(pdf_bytes: bytes) -> str:
+    if len(pdf_bytes) > MAX_UPLOAD_BYTES:
+        return 'Dosya boyutu sınırı aşıldı'
+    if not pdf_bytes.startswith(b'%PDF'):
+        return 'Dosya bir PDF değil'
+    return ''
+
+
+# ===== SÜREÇ HAVUZU İŞİ =====
+
+def batch_job(pdf_bytes: bytes, mufredat_path: str) -> dict:
+    """analyze_job + başlıktaki öğrenci numarası, tek ayrıştırmada (işçi süreçte çalışır).
+
+    Ham transkript satırları döndürülmez; toplu görünüm ve dışa aktarma
+    yalnızca sonuçları ve özeti kullanır.
+    """
+    data = analyze_job(pdf_bytes, mufredat_path, with_student_id=True)
+    return {
+        'ogrenci_no': data['ogrenci_no'],
+        'ders_sayisi': len(data['transkript']),
+        'results': data['results'],
+        'summary': data['summary'],
+    }
+
+
+def iter_batch(uploads, executor, mufredat_path: str, max_in_flight: int = None, admission=None):
+    """PDF'leri havuzda analiz eder; (ad, veri, hata) üçlülerini tamamlanma sırasıyla verir.
+
+    Havuzda aynı anda en fazla max_in_flight iş bulunur; uploads tembel
+    okunur, yani bir üreteç olabilir. Tüketici erken çıkarsa bekleyen işler
+    iptal edilir.
+
+    admission (admission.AdmissionController) verilirse her PDF havuza girmeden
+    önce bir analiz yeri alır ve iş bitince (veya iptal edilince) bırakır; yer
+    alamayan PDF hata olarak verilir. Jetonlar çağıran tarafından dosya
+    sayısıyla alınır (AdmissionController.charge).
+    """
+    max_in_flight = max_in_flight or 2 * BATCH_WORKERS
+    if admission is not None:
+        max_in_flight = min(max_in_flight, admission.max_concurrent)
+    uploads = iter(uploads)
+    pending = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_in_flight:
+                item = next(uploads, None)
+                if item is None:
+                    exhausted = True
+                    break
+                name, pdf_bytes, error = item
+                if error:
+                    yield name, None, error
+                    continue
+                if admission is not None:
+                    try:
+                        admission.acquire(())
+                    except Rejected as e:
+                        yield name, None, e.message
+                        continue
+                try:
+                    future = executor.submit(batch_job, pdf_bytes, mufredat_path)
+                except BaseException:
+                    if admission is not None:
+                        admission.release()
+                    raise
+                if admission is not None:
+                    # İş bitince de iptal edilince de bir kez çağrılır
+                    future.add_done_callback(lambda _: admission.release())
+                pending[future] = name
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    data = future.result()
+                except Exception as e:  # işçideki ayrıştırma/eşleştirme hatası
+                    yield name, None, f'{type(e).__name__}: {e}'
+                    continue
+                if not data['ders_sayisi']:
+                    yield name, None, 'Transkriptten ders verisi çıkarılamadı'
+                    continue
+                yield name, data, ''
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+# ===== TABLO VE KOHORT ÖZETİ =====
+
+def status_row(name: str, data: dict, error: str) -> dict:
+    """Canlı durum tablosunun bir satırı."""
+    if data is None:
+        return {'Dosya': name, 'Öğrenci No': '', 'Durum': f'⚠️ {error}', 'AGNO': None,
+                'Başarılı AKTS': None, 'Eksik': None, 'Başarısız': None, 'İngilizce %': None}
+    summary = data['summary']
+    return {
+        'Dosya': name,
+        'Öğrenci No': data['ogrenci_no'],
+        'Durum': summary['mezuniyet_durumu'],
+        'AGNO': summary['agno'],
+        'Başarılı AKTS': summary['basarili_akts'],
+        'Eksik': summary['eksik_ders_sayisi'],
+        'Başarısız': summary['basarisiz_ders_sayisi'],
+        'İngilizce %': summary['ingilizce_oran'],
+    }
+
+
+def cohort_item(name: str, data: dict, mufredat: str) -> dict:
+    """exporters / cohort_reports için öğrenci kaydı."""
+    return {
+        'ad': data['ogrenci_no'] or os.path.splitext(os.path.basename(name))[0],
+        'results': data['results'],
+        'summary': data['summary'],
+        'mufredat': mufredat,
+    }
+
+
+def cohort_summary(items: list, failed: int = 0, top: int = 10) -> dict:
+    """Grubun özeti: mezuniyet durumu dağılımı, ortalama AGNO, en sık eksik/başarısız dersler."""
+    # Durum metnindeki sayılar ('... (1 eksik, 2 başarısız)') gruplamada atılır
+    durumlar = Counter(item['summary']['mezuniyet_durumu'].split(' (')[0] for item in items)
+    dersler = Counter()
+    for item in items:
+        for r in item['results']:
+            if r['Durum'] in ('Eksik', 'Başarısız'):
+                dersler[(r['Mufredat_Kodu'], r['Mufredat_Adi'], r['Durum'])] += 1
+    agnolar = [item['summary']['agno'] for item in items if item['summary']['agno']]
+    return {
+        'ogrenci': len(items),
+        'hatali': failed,
+        'mezun_olabilir': sum(n for durum, n in durumlar.items() if 'Sağlanıyor' in durum),
+        'ingilizce_yetersiz': sum(1 for item in items if not item['summary']['ingilizce_yeterli']),
+        'ortalama_agno': round(sum(agnolar) / len(agnolar), 2) if agnolar else 0.0,
+        'durumlar': dict(durumlar.most_common()),
+        'sik_dersler': [
+            {'Ders_Kodu': kod, 'Ders_Adi': ad, 'Durum': durum, 'Ogrenci': n}
+            for (kod, ad, durum), n in dersler.most_common(top)
+        ],
+    }
+
+
+# ===== TOPLU DIŞA AKTARMA =====
+
+def export_items(items: list, fmt: str) -> bytes:
+    """Grubun sonuçlarını tek dosyada (jsonl/csv/xlsx) bayt olarak döndürür."""
+    buffer = io.BytesIO()
+    export_cohort(items, {fmt: buffer})
+    return buffer.getvalue()
+
+
+def reports_zip(items: list, executor) -> bytes:
+    """Öğrenci başına PDF raporları içeren ZIP arşivi."""
+    buffer = io.BytesIO()
+    write_cohort_zip(items, buffer, executor=executor)
+    return buffer.getvalue()
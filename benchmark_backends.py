@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+PDF Arka Uç Karşılaştırması
+===========================
+pdf_backends'teki her arka ucu aynı transkriptler üzerinde çalıştırır;
+ayrıştırma sonucunu (ders tablosu + AGNO) altın çıktılarla karşılaştırır ve
+transkript başına süreyi ölçer. Altın çıktılar pdfplumber arka ucuyla
+(mevcut referans davranış) üretilip bir JSON dosyasına dondurulabilir.
+
+pdf_backends.TEXT_BACKEND_ORDER bu aracın önerisine göre ayarlanır: yalnızca
+metin formatındaki tüm transkriptlerde altın çıktıyı birebir üreten arka
+uçlar, hızlıdan yavaşa sıralanır.
+
+Kullanım:
+    python benchmark_backends.py                                  # sentetik örneklerle
+    python benchmark_backends.py --pdf-dir transkriptler/ --save-golden altin.json
+    python benchmark_backends.py --pdf-dir transkriptler/ --golden altin.json
+"""
+
+import io
+import os
+import json
+import time
+import argparse
+
+from pdf_parser import parse_transcript
+from pdf_backends import BACKENDS, available_backends
+from sample_transcripts import generate_sample
+from curricula import get_registry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REFERENCE_BACKEND = 'pdfplumber'
+
+
+def parse_output(pdf_bytes: bytes, backend: str) -> dict:
+    """Ayrıştırma sonucunu karşılaştırılabilir (JSON uyumlu) biçime çevirir."""
+    df, agno = parse_transcript(io.BytesIO(pdf_bytes), backend=backend)
+    return {
+        'courses': df.astype(object).to_dict(orient='records'),
+        'agno': float(agno),
+    }
+
+
+def detect_format(pdf_bytes: bytes) -> str:
+    """Transkriptin formatını belirler: metin arka ucuyla ders bulunursa 'metin', yoksa 'tablo'."""
+    for backend in available_backends():
+        if backend == REFERENCE_BACKEND:
+            continue
+        if parse_output(pdf_bytes, backend)['courses']:
+            return 'metin'
+    return 'tablo'
+
+
+def sample_corpus(seeds: int) -> dict:
+    """Her müfredat ve format için sentetik transkriptler üretir."""
+    corpus = {}
+    for curriculum in get_registry():
+        for fmt in ('metin', 'tablo'):
+            for seed in range(seeds):
+                name = f'{curriculum.department.slug}_{curriculum.year}_{fmt}_{seed}.pdf'
+                corpus[name] = generate_sample(curriculum.path, fmt, seed)
+    return corpus
+
+
+def load_corpus(pdf_dir: str) -> dict:
+    corpus = {}
+    for filename in sorted(os.listdir(pdf_dir)):
+        if filename.lower().endswith('.pdf'):
+            with open(os.path.join(pdf_dir, filename), 'rb') as f:
+                corpus[filename] = f.read()
+    return corpus
+
+
+def run_benchmark(corpus: dict, golden: dict, repeat: int = 1) -> dict:
+    """Her arka ucu her transkriptte çalıştırır.
+
+    Returns:
+        dict: {format: {backend: {'ms': [...], 'ok': int, 'total': int, 'failures': [...]}}}
+    """
+    formats = {name: detect_format(pdf) for name, pdf in corpus.items()}
+    backends = ['auto'] + available_backends()
+    stats = {}
+    for name, pdf_bytes in corpus.items():
+        fmt = formats[name]
+        expected = golden.get(name)
+        if expected is None:
+            print(f'  Uyarı: {name} için altın çıktı yok, {REFERENCE_BACKEND} çıktısı kullanılıyor.')
+            expected = parse_output(pdf_bytes, REFERENCE_BACKEND)
+        for backend in backends:
+            # Tablo desteği olmayan arka uçlar eski formatı okuyamaz
+            if fmt == 'tablo' and backend != 'auto' and not BACKENDS[backend].supports_tables:
+                continue
+            entry = stats.setdefault(fmt, {}).setdefault(backend, {'ms': [], 'ok': 0, 'total': 0, 'failures': []})
+            started = time.perf_counter()
+            for _ in range(repeat):
+                output = parse_output(pdf_bytes, backend)
+            entry['ms'].append((time.perf_counter() - started) / repeat * 1000)
+            entry['total'] += 1
+            if output == expected:
+                entry['ok'] += 1
+            else:
+                entry['failures'].append(name)
+    return stats
+
+
+def recommend_order(stats: dict) -> list:
+    """Metin formatında altın çıktıyı tam üreten metin arka uçlarını hızlıdan yavaşa sıralar."""
+    candidates = []
+    for backend, entry in stats.get('metin', {}).items():
+        if backend in ('auto', REFERENCE_BACKEND) or entry['ok'] != entry['total']:
+            continue
+        candidates.append((sum(entry['ms']) / len(entry['ms']), backend))
+    return [backend for _, backend in sorted(candidates)]
+
+
+def print_report(stats: dict):
+    header = f"{'Format':<8}{'Arka uç':<12}{'Ort ms':>9}{'Maks ms':>9}{'Doğru':>9}"
+    print(header)
+    print('-' * len(header))
+    for fmt in sorted(stats):
+        for backend, entry in stats[fmt].items():
+            mean = sum(entry['ms']) / len(entry['ms'])
+            print(f"{fmt:<8}{backend:<12}{mean:>9.1f}{max(entry['ms']):>9.1f}{entry['ok']:>5}/{entry['total']:<3}")
+    print()
+    print(f"Önerilen TEXT_BACKEND_ORDER: {tuple(recommend_order(stats))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='PDF arka uçlarını doğruluk ve hız açısından karşılaştırır.')
+    parser.add_argument('--pdf-dir', help='Transkript PDF dizini (verilmezse sentetik örnekler üretilir)')
+    parser.add_argument('--seeds', type=int, default=2, help='Müfredat ve format başına sentetik örnek sayısı')
+    parser.add_argument('--golden', help='Karşılaştırılacak altın çıktı JSON dosyası')
+    parser.add_argument('--save-golden', help=f'{REFERENCE_BACKEND} çıktısını altın dosya olarak kaydet')
+    parser.add_argument('--repeat', type=int, default=1, help='Transkript başına tekrar sayısı')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.pdf_dir) if args.pdf_dir else sample_corpus(args.seeds)
+    if args.golden:
+        with open(args.golden, encoding='utf-8') as f:
+            golden = json.load(f)
+    else:
+        golden = {name: parse_output(pdf, REFERENCE_BACKEND) for name, pdf in corpus.items()}
+        if args.save_golden:
+            with open(args.save_golden, 'w', encoding='utf-8') as f:
+                json.dump(golden, f, ensure_ascii=False, indent=1)
+
+    stats = run_benchmark(corpus, golden, args.repeat)
+    print_report(stats)
+    failures = [(fmt, b, n) for fmt, by in stats.items() for b, e in by.items() for n in e['failures']]
+    for fmt, backend, name in failures[:20]:
+        print(f'  Uyuşmazlık: {backend} ({fmt}) {name}')
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Toplu Rapor Üretimi
+===================
+Bir danışmanın tüm öğrencilerinin mezuniyet raporlarını tek seferde üretir.
+
+Saklanmış (results, summary) çiftlerinden öğrenci başına bir PDF, bir süreç
+havuzunda paralel olarak üretilir ve tek bir ZIP arşivine yazılır. Arşiv
+artımlı yazılır: aynı anda en fazla `max_in_flight` rapor bellekte tutulur,
+bitmiş raporlar hemen diske (veya HTTP yanıtına) aktarılır. Böylece bellek
+kullanımı kohort büyüklüğünden bağımsızdır.
+
+Girdi kayıtları sözlüktür:
+    {'ad': 'öğrenci no / adı', 'results': [...], 'summary': {...}, 'mufredat': '2022 Müfredatı'}
+
+Kullanım:
+    python cohort_reports.py --json ogrenciler.json --out raporlar.zip
+    python cohort_reports.py --cache-dir .sonuc_onbellegi --out raporlar.zip --workers 4
+"""
+
+import os
+import re
+import json
+import pickle
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from report import generate_report
+
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def report_filename(ad: str) -> str:
+    """Öğrenci adından ZIP içindeki PDF dosya adını üretir."""
+    stem = re.sub(r'[^\w.-]+', '_', str(ad), flags=re.UNICODE).strip('._') or 'ogrenci'
+    return f'mezuniyet_raporu_{stem}.pdf'
+
+
+class ChunkSink:
+    """zipfile için yazılabilir, konumu izlenen ama geri sarılamayan hedef.
+
+    Yazılan baytlar drain() ile alınana kadar tutulur; zipfile geri
+    sarılamayan hedeflerde veri tanımlayıcıları (data descriptor) kullanır.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_rendered(items, executor, max_in_flight: int):
+    """Raporları havuzda üretir; (dosya adı, pdf baytları) çiftlerini girdi sırasıyla verir.
+
+    Havuza aynı anda en fazla max_in_flight iş gönderilir; girdi de tembel
+    okunur, yani items bir üreteç olabilir.
+    """
+    pending = deque()
+    used_names = set()
+    try:
+        for item in items:
+            name = report_filename(item['ad'])
+            if name in used_names:
+                base, ext = os.path.splitext(name)
+                n = 2
+                while f'{base}_{n}{ext}' in used_names:
+                    n += 1
+                name = f'{base}_{n}{ext}'
+            used_names.add(name)
+
+            pending.append((name, executor.submit(
+                generate_report, item['results'], item['summary'], item.get('mufredat', ''),
+            )))
+            if len(pending) >= max_in_flight:
+                name, future = pending.popleft()
+                yield name, future.result()
+
+        while pending:
+            name, future = pending.popleft()
+            yield name, future.result()
+    finally:
+        # Tüketici erken çıkarsa (örn. istemci bağlantıyı kesti) bekleyen işler iptal edilir
+        for _, future in pending:
+            future.cancel()
+
+
+def _run_with_executor(fn, executor, workers):
+    """Dışarıdan havuz verilmediyse geçici bir süreç havuzu açar."""
+    if executor is not None:
+        return fn(executor)
+    with ProcessPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as pool:
+        return fn(pool)
+
+
+def write_cohort_zip(items, target, executor=None, workers: int = None, max_in_flight: int = None) -> int:
+    """Raporları üretip ZIP arşivine yazar.
+
+    Parameters:
+        items: Öğrenci kayıtları (liste veya üreteç)
+        target: Dosya yolu veya yazılabilir dosya nesnesi
+        executor: Kullanılacak süreç havuzu (verilmezse geçici havuz açılır)
+        workers: Geçici havuzun işçi sayısı
+        max_in_flight: Aynı anda bellekte tutulacak en fazla rapor sayısı
+
+    Returns:
+        int: Arşive yazılan rapor sayısı
+    """
+    def run(pool):
+        in_flight = max_in_flight or 2 * (workers or DEFAULT_WORKERS)
+        count = 0
+        # PDF akışları zaten sıkıştırılmış; ZIP_STORED yeniden sıkıştırma maliyetinden kaçınır
+        with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_STORED) as zf:
+            for name, pdf_bytes in iter_rendered(items, pool, in_flight):
+                zf.writestr(name, pdf_bytes)
+                count += 1
+        return count
+
+    return _run_with_executor(run, executor, workers)
+
+
+def iter_cohort_zip(items, executor, max_in_flight: int = 4):
+    """ZIP arşivini parça parça üreten üreteç (HTTP akış yanıtları için).
+
+    Her rapor tamamlandığında o rapora ait ZIP baytları verilir; merkezi
+    dizin en sonda gelir.
+    """
+    sink = ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for name, pdf_bytes in iter_rendered(items, executor, max_in_flight):
+            zf.writestr(name, pdf_bytes)
+            yield sink.drain()
+    yield sink.drain()
+
+
+# ===== GİRDİ KAYNAKLARI =====
+
+def _read_cache_entry(path: str):
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(entry, dict) or 'results' not in entry or 'summary' not in entry:
+        return None
+    return entry
+
+
+def iter_cache_entries(directory: str):
+    """ResultCache disk dizinindeki analiz sonuçlarını öğrenci (PDF) başına bir kayıt olarak okur.
+
+    Aynı PDF her eşik için ayrı kayıtla saklanır; PDF özeti başına en son
+    yazılan kayıt kullanılır. Ad, transkript başlığındaki öğrenci numarasıdır;
+    numara okunamadıysa PDF özetinin başı kullanılır. Kayıtlar iki geçişte
+    okunur, böylece bellekte aynı anda tek kayıt bulunur.
+    """
+    latest = {}
+    for filename in os.listdir(directory):
+        if not filename.endswith('.pkl'):
+            continue
+        path = os.path.join(directory, filename)
+        entry = _read_cache_entry(path)
+        if entry is None:
+            continue
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        # PDF özeti olmayan eski kayıtlar kendi anahtarlarıyla ayrı sayılır
+        pdf_hash = entry.get('pdf_hash') or filename[:-len('.pkl')]
+        if pdf_hash not in latest or mtime > latest[pdf_hash][0]:
+            latest[pdf_hash] = (mtime, path)
+
+    for pdf_hash, (_, path) in sorted(latest.items(), key=lambda item: item[1][1]):
+        entry = _read_cache_entry(path)
+        if entry is None:
+            continue
+        yield {
+            'ad': entry.get('ogrenci_no') or f'ogrenci_{pdf_hash[:8]}',
+            'results': entry['results'],
+            'summary': entry['summary'],
+            'mufredat': entry.get('mufredat', ''),
+        }
+
+
+def load_json_items(path: str) -> list:
+    """JSON dosyasından öğrenci kayıtlarını okur (liste veya {'ogrenciler': [...]})."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('ogrenciler', [])
+    return data
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kohort mezuniyet raporlarını tek bir ZIP arşivinde üretir.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--json', help="Öğrenci kayıtlarını içeren JSON dosyası")
+    source.add_argument('--cache-dir', help="ResultCache disk dizini (MTS_RESULT_CACHE_DIR)")
+    parser.add_argument('--out', required=True, help='Yazılacak ZIP dosyası')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Paralel işçi süreç sayısı')
+    parser.add_argument('--in-flight', type=int, default=None, help='Aynı anda bellekte tutulacak en fazla rapor')
+    args = parser.parse_args()
+
+    items = load_json_items(args.json) if args.json else iter_cache_entries(args.cache_dir)
+    started = time.perf_counter()
+    count = write_cohort_zip(items, args.out, workers=args.workers, max_in_flight=args.in_flight)
+    print(f'{count} rapor {args.out} dosyasına yazıldı ({time.perf_counter() - started:.1f} sn).')
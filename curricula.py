@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Müfredat Kaydı
+==============
+Müfredatları bir dizin ağacından keşfeder, bölüm/yıl bazında indeksler ve
+her müfredatı ilk kullanıldığında yükler. Bölüme özgü eşleştirme kuralları
+(ders kodu önek eşdeğerlikleri, seçmeli kategori kuralları, İngilizce ders
+kodları) kodda değil, bölüm dizinindeki bolum.json dosyasında tutulur.
+
+Dizin düzeni (MTS_MUFREDAT_DIR, varsayılan: mufredatlar/):
+    mufredatlar/
+        makine/
+            bolum.json            # bölüm adı + eşleştirme kuralları
+            mufredat_2018.xlsx
+            mufredat_2022.xlsx
+        elektrik/
+            bolum.json
+            mufredat_2023.xlsx
+        mufredat_2019.xlsx        # kökteki dosyalar varsayılan bölüme aittir
+
+Keşif yalnızca dosya adlarını okur; Excel dosyaları ve bolum.json ilk
+istendiklerinde açılır. Böylece açılış maliyeti katalog büyüdükçe artmaz.
+bolum.json'u olmayan bölümler varsayılan bölümün (makine) kurallarını kullanır.
+
+bolum.json alanları:
+    ad                      Görünen bölüm adı
+    varsayilan_yil          Arayüzde önce seçili gelen müfredat yılı
+    onek_esdegerlikleri     Aynı dersi gösteren kod önek grupları (MMB224 = MAK224)
+    ingilizce_onekler       Bu öneklerle başlayan dersler İngilizcedir
+    ingilizce_kodlar        Sonu 'E' ile bitmediği halde İngilizce olan dersler
+    ortak_onekler           Alan dışı (üniversite) seçmeli sayılmayan önekler
+    secmeli_slot_kurallari  Müfredattaki seçmeli slotun kategorisi (sırayla ilk eşleşen)
+    secmeli_ders_kurallari  Transkriptteki seçmeli dersin kategorisi (sırayla ilk eşleşen)
+    kategori_aramalari      Slot kategorisi -> havuzda sırayla aranacak kategoriler
+
+Kurallardaki 'desen' normalize ders kodunun başından eşleşen bir regex'tir;
+'ad_icerir' verilirse ders adı (küçük harfle) bu parçalardan birini içermelidir.
+"""
+
+import os
+import re
+import json
+import threading
+from functools import lru_cache
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIR = os.environ.get('MTS_MUFREDAT_DIR', os.path.join(BASE_DIR, 'mufredatlar'))
+DEFAULT_DEPARTMENT = os.environ.get('MTS_DEFAULT_BOLUM', 'makine')
+RULES_FILENAME = 'bolum.json'
+# Kural dosyası olmayan bölümlerin kullandığı, uygulamayla gelen kurallar
+DEFAULT_RULES_PATH = os.path.join(BASE_DIR, 'mufredatlar', DEFAULT_DEPARTMENT, RULES_FILENAME)
+
+CURRICULUM_FILE = re.compile(r'^mufredat_(\d{4})\.xlsx$')
+
+
+# Müfredat tablolarının Excel yerine okunduğu kaynak (frame(path) -> DataFrame veya None)
+_frame_source = None
+
+
+def set_frame_source(source):
+    """Süreçteki müfredat tablolarının okunacağı kaynağı bağlar (örn. curriculum_pack.CurriculumPack).
+
+    Yalnızca henüz yüklenmemiş tabloları etkiler; None verilirse Excel'e dönülür.
+    """
+    global _frame_source
+    _frame_source = source
+
+
+# ===== BÖLÜM KURALLARI =====
+
+class DepartmentRules:
+    """Bir bölümün bolum.json'dan okunan eşleştirme kuralları (değiştirilemez)."""
+
+    __slots__ = ('name', 'default_year', 'prefix_groups', 'english_prefixes', 'english_codes',
+                 'common_prefixes', 'slot_rules', 'course_rules', 'category_search')
+
+    def __init__(self, data: dict):
+        self.name = data.get('ad', '')
+        self.default_year = data.get('varsayilan_yil')
+        # Önek -> aynı gruptaki diğer önekler (grup sırasıyla)
+        self.prefix_groups = {}
+        for group in data.get('onek_esdegerlikleri', []):
+            for prefix in group:
+                self.prefix_groups[prefix] = tuple(group)
+        self.english_prefixes = tuple(data.get('ingilizce_onekler', []))
+        self.english_codes = frozenset(data.get('ingilizce_kodlar', []))
+        self.common_prefixes = tuple(data.get('ortak_onekler', []))
+        self.slot_rules = self._compile(data.get('secmeli_slot_kurallari', []))
+        self.course_rules = self._compile(data.get('secmeli_ders_kurallari', []))
+        self.category_search = {k: tuple(v) for k, v in data.get('kategori_aramalari', {}).items()}
+
+    @staticmethod
+    def _compile(rules: list) -> tuple:
+        return tuple(
+            (re.compile(rule['desen']), tuple(rule.get('ad_icerir', ())), rule['kategori'])
+            for rule in rules
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> 'DepartmentRules':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _prefix_of(self, code: str):
+        for prefix in self.prefix_groups:
+            if code.startswith(prefix):
+                return prefix
+        return None
+
+    def prefix_variants(self, code: str) -> list:
+        """Kodun eşdeğer öneklerle yazılışları (kendisi hariç). Örn: 'MMB224' -> ['MAK224', 'MEC224']"""
+        prefix = self._prefix_of(code)
+        if prefix is None:
+            return []
+        rest = code[len(prefix):]
+        return [other + rest for other in self.prefix_groups[prefix] if other != prefix]
+
+    def base_code(self, code: str) -> str:
+        """Eşdeğer önekli kodları tek biçime indirger (tekrar alınan dersleri birleştirmek için)."""
+        prefix = self._prefix_of(code)
+        if prefix is None:
+            return code
+        return self.prefix_groups[prefix][0] + code[len(prefix):]
+
+    def is_english(self, code: str) -> bool:
+        """Kural: kod özel listede ise, İngilizce önekle başlıyorsa veya rakamdan sonra 'E' ile bitiyorsa."""
+        if code in self.english_codes:
+            return True
+        if self.english_prefixes and code.startswith(self.english_prefixes):
+            return True
+        return len(code) >= 4 and code[-1] == 'E' and code[-2].isdigit()
+
+    @staticmethod
+    def _match(rules: tuple, code: str, name: str = ''):
+        name_lower = None
+        for pattern, name_parts, category in rules:
+            if not pattern.match(code):
+                continue
+            if name_parts:
+                if name_lower is None:
+                    name_lower = str(name).lower()
+                if not any(part in name_lower for part in name_parts):
+                    continue
+            return category
+        return None
+
+    def slot_category(self, code: str, name: str = '') -> str:
+        """Müfredattaki seçmeli slotun kategorisi; bulunamazsa 'bilinmiyor'."""
+        return self._match(self.slot_rules, code, name) or 'bilinmiyor'
+
+    def course_category(self, code: str) -> str:
+        """Transkriptteki dersin seçmeli kategorisi.
+
+        Kurallara uymayan ve ortak öneklerle başlamayan dersler alan dışı
+        ('universite') seçmeli sayılır.
+        """
+        category = self._match(self.course_rules, code)
+        if category is not None:
+            return category
+        if not code.startswith(self.common_prefixes):
+            return 'universite'
+        return 'bilinmiyor'
+
+    def search_categories(self, category: str) -> tuple:
+        """Slot kategorisi için seçmeli havuzunda sırayla aranacak kategoriler."""
+        return self.category_search.get(category, (category,))
+
+
+@lru_cache(maxsize=None)
+def load_rules(path: str) -> DepartmentRules:
+    """bolum.json'u bir kez okur (süreç başına)."""
+    return DepartmentRules.from_file(path)
+
+
+def default_rules() -> DepartmentRules:
+    """Uygulamayla gelen varsayılan bölüm (makine) kuralları."""
+    return load_rules(DEFAULT_RULES_PATH)
+
+
+# ===== KAYIT =====
+
+class Curriculum:
+    """Tek bir bölüm/yıl müfredatı; Excel dosyası ilk frame() çağrısında okunur."""
+
+    __slots__ = ('department', 'year', 'path', '_frame', '_lock')
+
+    def __init__(self, department: 'Department', year: int, path: str):
+        self.department = department
+        self.year = year
+        self.path = path
+        self._frame = None
+        self._lock = threading.Lock()
+
+    @property
+    def label(self) -> str:
+        """Arayüzde gösterilen ad. Örn: '2022-2023 Müfredatı'"""
+        return f'{self.year}-{self.year + 1} Müfredatı'
+
+    @property
+    def key(self) -> str:
+        """Kayıt ve profillerde kullanılan kısa ad. Örn: 'makine/mufredat_2022.xlsx'"""
+        return f'{self.department.slug}/{os.path.basename(self.path)}'
+
+    @property
+    def rules(self) -> DepartmentRules:
+        return self.department.rules
+
+    def frame(self) -> pd.DataFrame:
+        """Müfredat tablosu (paylaşımlı; çağıran değiştirmemelidir).
+
+        Süreçte bir tablo kaynağı (curriculum_pack) bağlıysa tablo oradan,
+        değilse Excel dosyasından okunur.
+        """
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    frame = _frame_source.frame(self.path) if _frame_source is not None else None
+                    self._frame = frame if frame is not None else pd.read_excel(self.path)
+        return self._frame
+
+
+class Department:
+    """Bir bölüm dizini; kuralları ilk istendiğinde okunur."""
+
+    __slots__ = ('slug', 'directory', 'curricula', '_rules')
+
+    def __init__(self, slug: str, directory: str):
+        self.slug = slug
+        self.directory = directory
+        self.curricula = {}
+        self._rules = None
+
+    @property
+    def rules_path(self) -> str:
+        return os.path.join(self.directory, RULES_FILENAME)
+
+    @property
+    def rules(self) -> DepartmentRules:
+        if self._rules is None:
+            path = self.rules_path
+            self._rules = load_rules(path) if os.path.exists(path) else default_rules()
+        return self._rules
+
+    @property
+    def name(self) -> str:
+        return self.rules.name if os.path.exists(self.rules_path) else self.slug
+
+    def years(self) -> list:
+        return sorted(self.curricula)
+
+    def default_curriculum(self) -> Curriculum:
+        """bolum.json'daki varsayılan yıl; yoksa en yeni müfredat."""
+        year = self.rules.default_year
+        return self.curricula.get(year) or self.curricula[max(self.curricula)]
+
+
+class CurriculumRegistry:
+    """Müfredat dizin ağacının bölüm/yıl indeksi.
+
+    Parameters:
+        root: Müfredat kök dizini
+        default_department: Kökteki dosyaların ait olduğu ve varsayılan seçilen bölüm
+    """
+
+    def __init__(self, root: str = DEFAULT_DIR, default_department: str = DEFAULT_DEPARTMENT):
+        self.root = root
+        self.default_department = default_department
+        self.departments = {}
+        self._by_path = {}
+        self._discover()
+
+    def _add(self, slug: str, directory: str, filename: str):
+        match = CURRICULUM_FILE.match(filename)
+        if not match:
+            return
+        department = self.departments.get(slug)
+        if department is None:
+            department = self.departments[slug] = Department(slug, directory)
+        path = os.path.join(directory, filename)
+        curriculum = Curriculum(department, int(match.group(1)), path)
+        department.curricula[curriculum.year] = curriculum
+        self._by_path[os.path.abspath(path)] = curriculum
+
+    def _discover(self):
+        try:
+            entries = sorted(os.scandir(self.root), key=lambda e: e.name)
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir():
+                for filename in sorted(os.listdir(entry.path)):
+                    self._add(entry.name, entry.path, filename)
+            elif entry.is_file():
+                self._add_root_file(entry.name)
+
+    def _add_root_file(self, filename: str):
+        """Kökteki müfredat dosyası varsayılan bölüme eklenir (bölüm dizini varsa kuralları oradan okunur)."""
+        match = CURRICULUM_FILE.match(filename)
+        if not match:
+            return
+        department = self.departments.get(self.default_department)
+        if department is None:
+            directory = os.path.join(self.root, self.default_department)
+            department = self.departments[self.default_department] = Department(self.default_department, directory)
+        path = os.path.join(self.root, filename)
+        curriculum = Curriculum(department, int(match.group(1)), path)
+        department.curricula.setdefault(curriculum.year, curriculum)
+        self._by_path[os.path.abspath(path)] = curriculum
+
+    def department(self, slug: str = None) -> Department:
+        """Bölümü döndürür (verilmezse varsayılan, o da yoksa ilk bölüm)."""
+        if slug is None:
+            slug = self.default_department if self.default_department in self.departments else next(iter(self.departments), slug)
+        return self.departments[slug]
+
+    def get(self, slug: str, year) -> Curriculum:
+        """Bölüm/yıl müfredatı; bulunamazsa KeyError."""
+        return self.department(slug).curricula[int(year)]
+
+    def find(self, path: str) -> Curriculum:
+        """Dosya yolundan müfredatı bulur; kayıtta yoksa None."""
+        return self._by_path.get(os.path.abspath(path))
+
+    def __iter__(self):
+        for department in self.departments.values():
+            for year in department.years():
+                yield department.curricula[year]
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def get_registry() -> CurriculumRegistry:
+    """Süreç başına tek CurriculumRegistry (MTS_MUFREDAT_DIR)."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = CurriculumRegistry()
+        return _default_registry
+
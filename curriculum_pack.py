@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Paylaşımlı Müfredat Paketi
+==========================
+Toplu analiz, API ve klasör alımı işleri süreç havuzlarında çalışır. Paket
+olmadan her işçi süreç müfredat Excel dosyalarını (openpyxl ile) yeniden
+okur ve eşdeğerlik tablosunu SQLite'tan yeniden kurar. Bu işler hem işçinin
+ilk işini yavaşlatır hem de her işçide aynı verinin ayrı bir kopyasını
+tutar.
+
+Bu modül ana süreçte müfredat tablolarını ve eşdeğerlik anlık görüntüsünü
+tek bir ikili dosyaya paketler. Dosya /dev/shm (bellekte) veya geçici
+dizindedir. İşçiler havuz başlatıcısında (attach_worker) dosyayı salt okunur
+np.memmap ile bağlar. Sayısal sütunlar (Donem, AKTS) paylaşılan sayfaların
+üzerinde kopyasız numpy görünümleridir. Metin sütunları tek bir UTF-8
+bloğu ve ofset dizisi olarak tutulur; yalnızca müfredat ilk kullanıldığında
+Python metinlerine açılır; boş hücreler ayrı bir maskeyle tutulur ve NaN
+olarak geri gelir. Dosya adı içeriğin özetidir; aynı veriyi paketleyen
+süreçler aynı dosyayı kullanır.
+
+Her yayımlama ve işçi bağlanması paketin mtime'ını yeniler. MAX_AGE
+saniyedir hiçbir sürecin yayımlamadığı veya bağlanmadığı eski paketler (ve
+yarım kalmış geçici dosyalar) bir sonraki yayımlamada silinir; /dev/shm
+bellekte olduğundan birikmeleri RAM tüketir.
+
+Dosya düzeni:
+    MAGIC (8 bayt) | başlık uzunluğu (uint64) | JSON başlık | 64 bayt hizalı diziler
+
+Eşdeğerlik anlık görüntüsü yalnızca tablonun revizyonu paketlendiği andaki
+ile aynıysa kullanılır; tablo sonradan değiştiyse işçi güncel görüntüyü
+SQLite'tan okur.
+
+Kullanım:
+    path = publish(get_registry(), get_table())
+    ProcessPoolExecutor(initializer=attach_worker, initargs=(path,))
+"""
+
+import os
+import glob
+import json
+import time
+import sqlite3
+import hashlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'MTSPAK1\x00'
+ALIGN = 64
+DEFAULT_DIR = os.environ.get('MTS_PACK_DIR') or ('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+PREFIX = 'mts_mufredat_'
+# Bu süredir (saniye) yayımlanmayan ve bağlanılmayan paketler silinir
+MAX_AGE = float(os.environ.get('MTS_PACK_MAX_AGE', 24 * 3600))
+
+# Eşdeğerlik satırlarının durum kodları
+ACCEPTED, REJECTED = 0, 1
+
+
+# ===== PAKETLEME =====
+
+class _Writer:
+    """Dizileri hizalı olarak biriktirir; başlıkta ofsetleriyle anılır."""
+
+    def __init__(self):
+        self.blobs = []
+        self.size = 0
+
+    def add(self, array: np.ndarray) -> dict:
+        array = np.ascontiguousarray(array)
+        padding = -self.size % ALIGN
+        if padding:
+            self.blobs.append(b'\x00' * padding)
+            self.size += padding
+        entry = {'tur': array.dtype.str, 'ofset': self.size, 'adet': int(array.size)}
+        data = array.tobytes()
+        self.blobs.append(data)
+        self.size += len(data)
+        return entry
+
+    def add_strings(self, values) -> dict:
+        values = list(values)
+        # Boş hücreler (None/NaN) 'nan' metni olarak değil, maskeyle saklanır
+        missing = pd.isna(np.array(values, dtype=object)) if values else np.zeros(0, dtype=bool)
+        encoded = [b'' if empty else str(v).encode('utf-8') for v, empty in zip(values, missing)]
+        bounds = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=bounds[1:])
+        entry = {'metin': self.add(np.frombuffer(b''.join(encoded), dtype=np.uint8)),
+                 'sinirlar': self.add(bounds)}
+        if missing.any():
+            entry['bos'] = self.add(missing.astype(np.uint8))
+        return entry
+
+    def add_column(self, series: pd.Series) -> dict:
+        if series.dtype.kind in 'biuf':
+            return {'dizi': self.add(series.to_numpy())}
+        return self.add_strings(series.tolist())
+
+
+def build_pack(registry, equivalences=None) -> bytes:
+    """Kayıttaki müfredatları ve eşdeğerlik görüntüsünü paket baytlarına dönüştürür."""
+    writer = _Writer()
+    header = {'mufredatlar': {}, 'esdegerlik': None}
+    for curriculum in registry:
+        frame = curriculum.frame()
+        header['mufredatlar'][os.path.abspath(curriculum.path)] = {
+            'satir': len(frame),
+            'sutunlar': [[str(column), writer.add_column(frame[column])] for column in frame.columns],
+        }
+
+    if equivalences is not None:
+        rows = [(m, t, '', ACCEPTED) for m, codes in equivalences.codes.items() for t in sorted(codes)]
+        rows += [(m, '', n, ACCEPTED) for m, names in equivalences.names.items() for n in sorted(names)]
+        rows += [(m, t, '', REJECTED) for m, t in sorted(equivalences.rejected)]
+        header['esdegerlik'] = {
+            'revizyon': equivalences.revision,
+            'mufredat_kodu': writer.add_strings(r[0] for r in rows),
+            'transkript_kodu': writer.add_strings(r[1] for r in rows),
+            'transkript_adi': writer.add_strings(r[2] for r in rows),
+            'durum': writer.add(np.array([r[3] for r in rows], dtype=np.int8)),
+        }
+
+    head = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    prefix = MAGIC + np.uint64(len(head)).tobytes() + head
+    prefix += b'\x00' * (-len(prefix) % ALIGN)
+    # Ofsetler veri bölgesine görelidir; başlık boyu hizalandığından hizalama korunur
+    return prefix + b''.join(writer.blobs)
+
+
+def publish(registry, equivalence_table=None, directory: str = DEFAULT_DIR) -> str:
+    """Paketi yazar (aynı içerik zaten yazılmışsa yeniden yazmaz) ve yolunu döndürür.
+
+    Eşdeğerlik tablosu okunamazsa paket yalnızca müfredatları içerir.
+    """
+    equivalences = None
+    if equivalence_table is not None:
+        try:
+            equivalences = equivalence_table.snapshot()
+        except sqlite3.Error:  # işçiler tabloyu kendileri okur
+            equivalences = None
+    data = build_pack(registry, equivalences)
+    path = os.path.join(directory, f'{PREFIX}{hashlib.sha256(data).hexdigest()[:16]}.pak')
+    if os.path.exists(path):
+        _touch(path)
+    else:
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=PREFIX, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    remove_stale(directory, keep=path)
+    return path
+
+
+def _touch(path: str):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def remove_stale(directory: str = DEFAULT_DIR, keep: str = '', max_age: float = MAX_AGE) -> int:
+    """MAX_AGE'den eski paketleri ve geçici dosyaları siler; silinen dosya sayısını döndürür.
+
+    Bağlı işçilerin eşlemeleri dosya silinse de geçerli kalır; silinmiş bir
+    pakete sonradan bağlanmak isteyen işçi verileri kendisi yükler.
+    """
+    removed = 0
+    now = time.time()
+    for path in glob.glob(os.path.join(directory, f'{PREFIX}*')):
+        if path == keep:
+            continue
+        try:
+            if now - os.stat(path).st_mtime > max_age:
+                os.remove(path)
+                removed += 1
+        except OSError:  # başka bir süreç aynı anda sildi
+            continue
+    return removed
+
+
+def publish_default(registry=None, equivalence_table=None) -> str:
+    """Havuz açan süreçler için paket (varsayılan: süreç kaydı ve eşdeğerlik tablosu).
+
+    Paket yazılamazsa boş metin döner; attach_worker('') hiçbir şey yapmaz ve
+    işçiler verileri kendileri yükler.
+    """
+    import curricula
+    import equivalences
+
+    if equivalence_table is None:
+        try:
+            equivalence_table = equivalences.get_table()
+        except sqlite3.Error:
+            equivalence_table = None
+    try:
+        return publish(registry or curricula.get_registry(), equivalence_table)
+    except OSError:
+        return ''
+
+
+# ===== BAĞLANMA =====
+
+class CurriculumPack:
+    """Salt okunur bağlanmış paket; müfredat tabloları ilk istendiklerinde kurulur."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(self._map[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f'Geçersiz müfredat paketi: {path}')
+        head_len = int(self._map[8:16].view(np.uint64)[0])
+        self.header = json.loads(bytes(self._map[16:16 + head_len]).decode('utf-8'))
+        start = 16 + head_len
+        # memmap alt sınıfı yerine düz ndarray görünümü (pandas düz dizi bekler)
+        self._data = self._map[start + (-start % ALIGN):].view(np.ndarray)
+
+    def _array(self, entry: dict) -> np.ndarray:
+        dtype = np.dtype(entry['tur'])
+        return self._data[entry['ofset']:entry['ofset'] + entry['adet'] * dtype.itemsize].view(dtype)
+
+    def _strings(self, entry: dict) -> list:
+        """Metin sütunu; boş hücreler None döner."""
+        text = self._array(entry['metin'])
+        bounds = self._array(entry['sinirlar'])
+        values = [bytes(text[a:b]).decode('utf-8') for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+        if 'bos' in entry:
+            for i in np.flatnonzero(self._array(entry['bos'])).tolist():
+                values[i] = None
+        return values
+
+    def __contains__(self, path: str) -> bool:
+        return os.path.abspath(path) in self.header['mufredatlar']
+
+    def frame(self, path: str) -> pd.DataFrame:
+        """Müfredat tablosu; sayısal sütunlar paket sayfalarına kopyasız bakar. Pakette yoksa None."""
+        entry = self.header['mufredatlar'].get(os.path.abspath(path))
+        if entry is None:
+            return None
+        columns = {}
+        for name, column in entry['sutunlar']:
+            if 'dizi' in column:
+                columns[name] = self._array(column['dizi'])
+            else:
+                columns[name] = pd.array(self._strings(column), dtype='str')
+        return pd.DataFrame(columns, copy=False)
+
+    def equivalences(self):
+        """Paketlenmiş eşdeğerlik anlık görüntüsü (equivalences.Equivalences); yoksa None."""
+        from equivalences import Equivalences
+
+        entry = self.header['esdegerlik']
+        if entry is None:
+            return None
+        codes, names, rejected = {}, {}, set()
+        rows = zip(self._strings(entry['mufredat_kodu']), self._strings(entry['transkript_kodu']),
+                   self._strings(entry['transkript_adi']), self._array(entry['durum']).tolist())
+        for mufredat_kodu, transkript_kodu, transkript_adi, durum in rows:
+            if durum == REJECTED:
+                rejected.add((mufredat_kodu, transkript_kodu))
+            elif transkript_kodu:
+                codes.setdefault(mufredat_kodu, set()).add(transkript_kodu)
+            else:
+                names.setdefault(mufredat_kodu, set()).add(transkript_adi)
+        return Equivalences(
+            {k: frozenset(v) for k, v in codes.items()},
+            {k: frozenset(v) for k, v in names.items()},
+            frozenset(rejected),
+            entry['revizyon'],
+        )
+
+
+def attach_worker(path: str):
+    """Havuz başlatıcısı: işçinin müfredat kaydını ve eşdeğerlik tablosunu pakete bağlar.
+
+    Paket okunamazsa işçi verileri her zamanki gibi kendisi yükler.
+    """
+    import curricula
+    import equivalences
+
+    if not path:
+        return
+    try:
+        pack = CurriculumPack(path)
+    except (OSError, ValueError):
+        return
+    _touch(path)  # kullanımda olan paket remove_stale ile silinmez
+    curricula.set_frame_source(pack)
+    snapshot = pack.equivalences()
+    if snapshot is not None:
+        try:
+            equivalences.get_table().seed(snapshot)
+        except sqlite3.Error:  # tablo ilk işte yeniden denenir
+            pass
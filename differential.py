@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""
+Fark Testi (Referans Hat Karşılaştırması)
+=========================================
+parse_transcript, match_courses veya generate_summary üzerinde yapılan her
+performans çalışması mezuniyet kararlarını sessizce değiştirebilir. Bu araç,
+komut satırında verilen bir git revizyonundaki (--reference, ör. değişikliğin
+dallandığı ana dal) ya da hazır bir kaynak ağacındaki (--reference-dir) hattı
+referans kâhin olarak çalıştırır; çalışma ağacındaki hattı aynı sentetik transkriptler
+üzerinde çalıştırıp transkript tablosunun, AGNO'nun, results'ın her dersinin
+her alanının ve summary'nin her alanının birebir aynı olduğunu doğrular.
+
+Aynı çalıştırmada aşama bazında (ayrıştırma, eşleştirme, özet) süreler de
+ölçülür ve referans / güncel oranı raporlanır. Bir hızlanma yalnızca tüm
+kararlar aynıysa kabul edilir; fark varsa çıkış kodu 1'dir.
+
+Her hat ayrı bir alt süreçte kendi kaynak ağacından içe aktarılır; böylece
+modül adları çakışmaz ve biri diğerinin önbelleklerini ısıtmaz. Eşleştirme
+eşdeğerlik tablosu olmadan (equivalences=None) yapılır.
+
+Korpus: müfredat kaydındaki (curricula) her müfredat ve her format (metin, tablo)
+için sample_transcripts ile üretilen transkriptler. Seed'e göre devam eden
+dönem sayısı (0-2) değişir; tek seed'lerde başarısız dersler sonraki yıl
+tekrar alınır, çift seed'lerde bazı zorunlu dersler eski kod ve farklı
+yazılmış adla görünür (bulanık eşleştirme yolu).
+
+Kullanım:
+    python differential.py --reference main             # ana dala karşı
+    python differential.py --reference main --seeds 6 --repeat 3 --rounds 3
+    python differential.py --reference HEAD~3           # başka bir revizyona karşı
+    python differential.py --reference-dir /yol/eski_agac
+    python differential.py --artimli --seeds 6          # yeniden yüklemede artımlı eşleştirme
+"""
+
+import io
+import os
+import sys
+import math
+import re
+import time
+import pickle
+import tarfile
+import argparse
+import tempfile
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STAGES = ('parse', 'match', 'summary')
+MAX_REPORTED_DIFFS = 20
+
+# Eski kodlu derslerin transkriptte görülen yazım farkları
+ROMAN_SUFFIX = re.compile(r'[\s-]+(III|II|I)$')
+ROMAN_TO_ARABIC = {'I': '1', 'II': '2', 'III': '3'}
+ABBREVIATIONS = {'Mühendisliği': 'Müh.', 'Mühendislik': 'Müh.', 'Laboratuvarı': 'Lab.', 'Bilgisayar': 'Bilg.'}
+
+
+# ===== KORPUS =====
+
+def build_corpus(directory: str, seeds: int) -> list:
+    """Her müfredat, format ve seed için bir transkript PDF'i yazar; (dosya adı, müfredat yolu) listesi döndürür."""
+    import random
+    import pandas as pd
+    from sample_transcripts import sample_courses, build_transcript_pdf
+    from curricula import get_registry
+
+    corpus = []
+    for curriculum in get_registry():
+        mufredat_path = curriculum.path
+        mufredat_df = pd.read_excel(mufredat_path)
+        stem = f'{curriculum.department.slug}_{curriculum.year}'
+        for seed in range(seeds):
+            rnd = random.Random(seed)
+            courses = sample_courses(mufredat_df, seed=seed, ongoing_semesters=seed % 3)
+            if seed % 2 == 1:
+                courses = with_retakes(courses, rnd)
+            else:
+                courses = with_recoded_courses(courses, rnd)
+            baslangic_yili = 2017 + rnd.randint(0, 5)
+            for fmt in ('metin', 'tablo'):
+                name = f'{stem}_{fmt}_{seed}.pdf'
+                pdf_bytes = build_transcript_pdf(courses, fmt=fmt, baslangic_yili=baslangic_yili,
+                                                 ogrenci_no=f'{1000000000 + seed}')
+                with open(os.path.join(directory, name), 'wb') as f:
+                    f.write(pdf_bytes)
+                corpus.append((name, mufredat_path))
+    return corpus
+
+
+def with_retakes(courses: list, rnd) -> list:
+    """Başarısız derslerin bir kısmını iki yarıyıl sonra tekrar alınmış olarak ekler."""
+    son_donem = max(c['Donem'] for c in courses)
+    retakes = []
+    for course in courses:
+        if course['Harf_Notu'] in ('FF', 'FD') and course['Donem'] + 2 <= son_donem and rnd.random() < 0.7:
+            retakes.append(dict(course, Donem=course['Donem'] + 2, Harf_Notu=rnd.choice(['CC', 'CB', 'DC'])))
+    return courses + retakes
+
+
+def with_recoded_courses(courses: list, rnd) -> list:
+    """Zorunlu derslerin bir kısmına eski müfredat kodu ve farklı yazılmış ad verir (PASS 3'ü çalıştırır)."""
+    recoded = []
+    for course in courses:
+        if course['Tur'] == 'Zorunlu' and rnd.random() < 0.25:
+            # MAK9xxx: hiçbir müfredatta ve seçmeli serisinde olmayan eski kod
+            digits = ''.join(ch for ch in course['Ders_Kodu'] if ch.isdigit())
+            name = ROMAN_SUFFIX.sub(lambda m: f" {ROMAN_TO_ARABIC[m.group(1)]}", course['Ders_Adi'])
+            for word, short in ABBREVIATIONS.items():
+                name = name.replace(word, short)
+            course = dict(course, Ders_Kodu=f'MAK9{digits[-3:]:0>3}', Ders_Adi=name)
+        recoded.append(course)
+    return recoded
+
+
+# ===== ARTIMLI YENİDEN EŞLEŞTİRME KONTROLÜ =====
+
+# Yeniden yüklemede denenen değişiklikler; 'sira*' türleri satırların yalnızca sırasını değiştirir
+REUPLOAD_CHANGES = ('yeni_donem', 'sira', 'sira_tasima', 'sira_ve_not', 'cikarma', 'ad', 'akts')
+
+
+def term_label(donem: int) -> str:
+    yil = 2018 + (donem - 1) // 2
+    return f"{yil}-{yil + 1} {'Güz' if donem % 2 else 'Bahar'}"
+
+
+def transcript_frame(courses: list, rules):
+    """Ders listesinden ayrıştırıcı çıktısıyla aynı biçimde transkript tablosu (son denemeler)."""
+    from attempts import AttemptLog
+
+    rows = []
+    for course in sorted(courses, key=lambda c: c['Donem']):
+        harf = 'Devam Ediyor' if course['Harf_Notu'] == '--' else course['Harf_Notu']
+        rows.append([course['Ders_Kodu'], course['Ders_Adi'], float(course['AKTS']), harf,
+                     harf in ('FF', 'FD', 'DZ'), term_label(course['Donem'])])
+    return AttemptLog(rows, rules).latest_frame()
+
+
+def reupload(old_df, new_df, change: str, rnd):
+    """Yeni dönemin transkriptine (veya eskisinin aynısına) verilen değişikliği uygular."""
+    if change == 'yeni_donem':
+        return new_df
+    if change in ('sira', 'sira_tasima'):
+        new_df = old_df.copy()
+    new_df = new_df.copy()
+    order = list(range(len(new_df)))
+    if change == 'sira':
+        rnd.shuffle(order)
+    elif change in ('sira_tasima', 'sira_ve_not'):
+        order.insert(rnd.randrange(len(order)), order.pop(rnd.randrange(len(order))))
+    elif change == 'cikarma':
+        order.pop(rnd.randrange(len(order)))
+    elif change == 'ad':
+        j = rnd.randrange(len(new_df))
+        new_df.at[j, 'Ders_Adi'] = f"{new_df.at[j, 'Ders_Adi']} Lab"
+    else:
+        j = rnd.randrange(len(new_df))
+        new_df.at[j, 'AKTS'] += 1
+    return new_df.iloc[order].reset_index(drop=True)
+
+
+def check_rematch(seeds: int) -> list:
+    """Yeniden yükleme senaryolarında rematch() sonucunu tam eşleştirmeyle karşılaştırır.
+
+    Her müfredat ve seed için öğrencinin dönem dönem transkripti üretilir;
+    her dönem geçişine REUPLOAD_CHANGES'teki değişiklikler uygulanır.
+    Artımlı sonuç (rematch None döndürmediyse) üç eşikte tam eşleştirmeyle
+    _tr_idx dahil birebir aynı olmalıdır.
+
+    Returns:
+        list: Fark bulunan senaryo etiketleri
+    """
+    import random
+    from sample_transcripts import sample_courses
+    from curricula import get_registry
+    from matcher import compute_match_state, classify_matches
+    from transcript_delta import diff_transcripts, rematch
+
+    failures, checked = [], 0
+    for curriculum in get_registry():
+        mufredat_df, rules = curriculum.frame(), curriculum.rules
+        for seed in range(seeds):
+            rnd = random.Random(seed)
+            courses = sample_courses(mufredat_df, seed=seed, ongoing_semesters=0)
+            courses = with_retakes(courses, rnd) if seed % 2 else with_recoded_courses(courses, rnd)
+            for donem in range(2, 8):
+                def upto(son):
+                    return [dict(c, Harf_Notu='--') if c['Donem'] == son else c
+                            for c in courses if c['Donem'] <= son]
+                old_df = transcript_frame(upto(donem), rules)
+                for change in REUPLOAD_CHANGES:
+                    new_df = reupload(old_df, transcript_frame(upto(donem + 1), rules), change, rnd)
+                    old_state = compute_match_state(mufredat_df, old_df, rules=rules)
+                    state = rematch(old_state, old_df, new_df, diff_transcripts(old_df, new_df), mufredat_df)
+                    if state is None:
+                        continue
+                    checked += 1
+                    full = compute_match_state(mufredat_df, new_df, rules=rules)
+                    if any([dict(r) for r in classify_matches(state, threshold)]
+                           != [dict(r) for r in classify_matches(full, threshold)] for threshold in (70, 85, 95)):
+                        failures.append(f'{curriculum.department.slug}_{curriculum.year} seed={seed} '
+                                        f'yariyil={donem}->{donem + 1} {change}')
+    print(f'Artımlı eşleştirme: {checked} senaryo tam eşleştirmeyle karşılaştırıldı, {len(failures)} fark.')
+    for label in failures[:MAX_REPORTED_DIFFS]:
+        print(f'  {label}')
+    return failures
+
+
+# ===== HAT ÇALIŞTIRICI (ALT SÜREÇ) =====
+
+def plain(value):
+    """numpy/pandas değerlerini ve kapsayıcıları karşılaştırılabilir Python tiplerine çevirir."""
+    if isinstance(value, dict) or hasattr(value, 'keys'):
+        return {k: plain(value[k]) for k in value.keys()}
+    if isinstance(value, (list, tuple)):
+        return [plain(v) for v in value]
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+
+def run_tree(tree: str, corpus_dir: str, corpus: list, repeat: int) -> dict:
+    """Verilen kaynak ağacındaki hattı korpus üzerinde çalıştırır (alt süreçte çağrılır).
+
+    Returns:
+        dict: {dosya: {'transkript', 'agno', 'results', 'summary', 'ms': {aşama: ms}}}
+    """
+    sys.path.insert(0, tree)
+    import pandas as pd
+    from pdf_parser import parse_transcript
+    from matcher import match_courses, generate_summary
+
+    mufredatlar = {}
+    outputs = {}
+    # İlk çağrı içe aktarma ve arka uç ısınmasını ölçümden çıkarır
+    if corpus:
+        name, mufredat_path = corpus[0]
+        with open(os.path.join(corpus_dir, name), 'rb') as f:
+            parse_transcript(io.BytesIO(f.read()))
+
+    for name, mufredat_path in corpus:
+        if mufredat_path not in mufredatlar:
+            mufredatlar[mufredat_path] = pd.read_excel(mufredat_path)
+        mufredat_df = mufredatlar[mufredat_path]
+        with open(os.path.join(corpus_dir, name), 'rb') as f:
+            pdf_bytes = f.read()
+
+        ms = dict.fromkeys(STAGES, 0.0)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            transkript_df, parsed_agno = parse_transcript(io.BytesIO(pdf_bytes))
+            parsed = time.perf_counter()
+            results = match_courses(mufredat_df, transkript_df)
+            matched = time.perf_counter()
+            summary = generate_summary(results, transkript_df, parsed_agno)
+            finished = time.perf_counter()
+            ms['parse'] += (parsed - started) * 1000 / repeat
+            ms['match'] += (matched - parsed) * 1000 / repeat
+            ms['summary'] += (finished - matched) * 1000 / repeat
+
+        outputs[name] = {
+            'transkript': plain(transkript_df.astype(object).to_dict(orient='records')),
+            'agno': plain(parsed_agno),
+            'results': [plain(dict(r)) for r in results],
+            'summary': plain(summary),
+            'ms': ms,
+        }
+    return outputs
+
+
+def run_in_subprocess(label: str, tree: str, corpus_dir: str, corpus: list, repeat: int) -> dict:
+    """run_tree'yi temiz bir Python sürecinde çalıştırır ve çıktısını okur."""
+    job_path = os.path.join(os.path.dirname(corpus_dir), f'{label}_is.pkl')
+    out_path = job_path + '.out'
+    with open(job_path, 'wb') as f:
+        pickle.dump({'tree': tree, 'corpus_dir': corpus_dir, 'corpus': corpus, 'repeat': repeat}, f)
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--run-job', job_path, out_path],
+                   check=True, cwd=tree)
+    with open(out_path, 'rb') as f:
+        return pickle.load(f)
+
+
+def export_revision(revision: str, directory: str) -> str:
+    """Git revizyonundaki kaynak ağacını dizine çıkarır."""
+    archive = subprocess.run(['git', 'archive', '--format=tar', revision], cwd=BASE_DIR,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        if hasattr(tarfile, 'data_filter'):
+            tar.extractall(directory, filter='data')
+        else:
+            tar.extractall(directory)
+    return directory
+
+
+def merge_timings(previous: dict, outputs: dict) -> dict:
+    """Önceki turun çıktısını korur, aşama sürelerinin en kısasını alır."""
+    if previous is None:
+        return outputs
+    for name, output in previous.items():
+        for stage in STAGES:
+            output['ms'][stage] = min(output['ms'][stage], outputs[name]['ms'][stage])
+    return previous
+
+
+# ===== KARŞILAŞTIRMA =====
+
+def same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def diff_values(path: str, expected, actual) -> list:
+    """İki değer arasındaki farkları alan yollarıyla listeler. Örn: 'results[12].Durum'"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        diffs = []
+        for key in list(expected) + [k for k in actual if k not in expected]:
+            if key not in actual or key not in expected:
+                diffs.append((f'{path}.{key}', expected.get(key, '<yok>'), actual.get(key, '<yok>')))
+            else:
+                diffs.extend(diff_values(f'{path}.{key}', expected[key], actual[key]))
+        return diffs
+    if isinstance(expected, list) and isinstance(actual, list):
+        diffs = []
+        if len(expected) != len(actual):
+            diffs.append((f'{path}.uzunluk', len(expected), len(actual)))
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            diffs.extend(diff_values(f'{path}[{i}]', e, a))
+        return diffs
+    return [] if same(expected, actual) else [(path, expected, actual)]
+
+
+def compare(reference: dict, current: dict) -> dict:
+    """Dosya başına alan farklarını döndürür: {dosya: [(yol, referans, güncel), ...]}"""
+    differences = {}
+    for name, expected in reference.items():
+        actual = current[name]
+        diffs = []
+        for field in ('transkript', 'agno', 'results', 'summary'):
+            diffs.extend(diff_values(field, expected[field], actual[field]))
+        if diffs:
+            differences[name] = diffs
+    return differences
+
+
+def stage_totals(outputs: dict) -> dict:
+    totals = dict.fromkeys(STAGES, 0.0)
+    for output in outputs.values():
+        for stage in STAGES:
+            totals[stage] += output['ms'][stage]
+    return totals
+
+
+def print_report(reference: dict, current: dict, differences: dict, reference_label: str):
+    ref_totals, cur_totals = stage_totals(reference), stage_totals(current)
+    ref_totals['toplam'], cur_totals['toplam'] = sum(ref_totals.values()), sum(cur_totals.values())
+    count = len(reference)
+
+    print(f'Referans: {reference_label}')
+    print(f'Korpus: {count} transkript')
+    print()
+    header = f"{'Aşama':<10}{'Referans ms':>14}{'Güncel ms':>12}{'Hızlanma':>11}"
+    print(header)
+    print('-' * len(header))
+    for stage in ref_totals:
+        ref_ms, cur_ms = ref_totals[stage] / count, cur_totals[stage] / count
+        ratio = ref_ms / cur_ms if cur_ms else float('inf')
+        print(f'{stage:<10}{ref_ms:>14.2f}{cur_ms:>12.2f}{ratio:>10.2f}x')
+    print()
+
+    if not differences:
+        print(f'Kararlar aynı: {count}/{count} transkriptte tüm alanlar birebir eşleşti.')
+        return
+    print(f'KARAR FARKI: {len(differences)}/{count} transkriptte fark var; hızlanma kabul edilmez.')
+    reported = 0
+    for name, diffs in differences.items():
+        for path, expected, actual in diffs:
+            if reported == MAX_REPORTED_DIFFS:
+                print('  ...')
+                return
+            print(f'  {name}: {path}: {expected!r} -> {actual!r}')
+            reported += 1
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '--run-job':
+        with open(sys.argv[2], 'rb') as f:
+            job = pickle.load(f)
+        outputs = run_tree(**job)
+        with open(sys.argv[3], 'wb') as f:
+            pickle.dump(outputs, f, protocol=pickle.HIGHEST_PROTOCOL)
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='Çalışma ağacındaki hattı dondurulmuş referans hatla karşılaştırır.')
+    parser.add_argument('--reference', help='Referans git revizyonu (ör. main; --artimli dışında gerekli)')
+    parser.add_argument('--reference-dir', help='Git yerine hazır referans kaynak ağacı')
+    parser.add_argument('--seeds', type=int, default=3, help='Müfredat başına seed sayısı (her seed iki format)')
+    parser.add_argument('--repeat', type=int, default=1, help='Transkript başına tekrar (süre ölçümü için)')
+    parser.add_argument('--rounds', type=int, default=2, help='Dönüşümlü çalıştırma turu sayısı')
+    parser.add_argument('--artimli', action='store_true',
+                        help='Referans yerine yeniden yüklemede artımlı eşleştirmeyi (rematch) tam eşleştirmeyle karşılaştırır')
+    args = parser.parse_args()
+
+    if args.artimli:
+        sys.exit(1 if check_rematch(args.seeds) else 0)
+    # Referans bilerek seçilmelidir; dal üzerindeki bir ara revizyon kâhin olamaz
+    if not (args.reference or args.reference_dir):
+        parser.error('--reference veya --reference-dir verilmelidir')
+
+    with tempfile.TemporaryDirectory(prefix='mts_fark_') as workdir:
+        corpus_dir = os.path.join(workdir, 'korpus')
+        os.makedirs(corpus_dir)
+        corpus = build_corpus(corpus_dir, args.seeds)
+
+        if args.reference_dir:
+            reference_tree, reference_label = os.path.abspath(args.reference_dir), args.reference_dir
+        else:
+            reference_tree = export_revision(args.reference, os.path.join(workdir, 'referans'))
+            reference_label = args.reference
+
+        # Hatlar sırayla dönüşümlü çalıştırılır; her aşamanın en kısa süresi alınır,
+        # böylece ısınma ve makine gürültüsü bir tarafı kayırmaz
+        reference = current = None
+        for _ in range(args.rounds):
+            reference = merge_timings(reference, run_in_subprocess('referans', reference_tree, corpus_dir, corpus, args.repeat))
+            current = merge_timings(current, run_in_subprocess('guncel', BASE_DIR, corpus_dir, corpus, args.repeat))
+
+    differences = compare(reference, current)
+    print_report(reference, current, differences, reference_label)
+    sys.exit(1 if differences else 0)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Ders Eşdeğerlik Tablosu
+=======================
+Müfredat dersi ile transkript dersi arasındaki onaylanmış eşdeğerlikleri
+(örn. yeni MMB koduyla yeniden adlandırılmış bir ders) kalıcı olarak saklar.
+Eşleştirici bu tabloya PASS 2 ile PASS 3 arasında sözlük araması olarak
+bakar; tabloda bulunan çiftler bulanık skorlamaya hiç girmez.
+
+Kayıt kaynakları:
+    - 'otomatik':     PASS 3'te en az LEARN_MIN_SCORE skorla eşleşen çift,
+                      LEARN_MIN_STUDENTS farklı öğrencide görüldüğünde etkinleşir
+    - 'danisman':     Şüpheli eşleşmeler sekmesinden onaylanan çift (hemen etkin)
+    - 'geri_bildirim': Geri bildirim formunda 'Yanlış Eşleşme' olarak bildirilen
+                      çift reddedilir; bir daha ne tablodan ne de bulanık
+                      eşleştirmeyle eşlenir
+
+Tablo bir SQLite dosyasında tutulur (MTS_EQUIVALENCE_DB); Streamlit oturumları
+ve API işçi süreçleri aynı dosyayı paylaşır. Eşleştirici değiştirilemez bir
+anlık görüntüyle (Equivalences) çalışır; görüntünün revizyonu sonuç önbelleği
+anahtarına girer, böylece tablo değişince eski sonuçlar kullanılmaz.
+
+Kullanım:
+    python equivalences.py --list
+    python equivalences.py --confirm "MMB 104" MAK104 "Statik"
+    python equivalences.py --reject MMB104 MAK106
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+from matcher import normalize_code
+from name_index import normalize_name
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.environ.get('MTS_EQUIVALENCE_DB', os.path.join(BASE_DIR, 'esdegerlikler.sqlite3'))
+
+# Otomatik öğrenme: bu skorun altındaki bulanık eşleşmeler kaydedilmez
+LEARN_MIN_SCORE = int(os.environ.get('MTS_EQUIVALENCE_MIN_SCORE', '95'))
+# Otomatik öğrenilen çift, bu kadar farklı öğrencide görülünce etkinleşir
+LEARN_MIN_STUDENTS = int(os.environ.get('MTS_EQUIVALENCE_MIN_STUDENTS', '3'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS esdegerlik (
+    mufredat_kodu   TEXT NOT NULL,
+    transkript_kodu TEXT NOT NULL,
+    transkript_adi  TEXT NOT NULL DEFAULT '',
+    kaynak          TEXT NOT NULL,
+    durum           TEXT NOT NULL,          -- 'aday' | 'onayli' | 'reddedildi'
+    guncelleme      REAL NOT NULL,
+    PRIMARY KEY (mufredat_kodu, transkript_kodu)
+);
+CREATE TABLE IF NOT EXISTS gozlem (
+    mufredat_kodu   TEXT NOT NULL,
+    transkript_kodu TEXT NOT NULL,
+    ogrenci         TEXT NOT NULL,
+    PRIMARY KEY (mufredat_kodu, transkript_kodu, ogrenci)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    anahtar TEXT PRIMARY KEY,
+    deger   INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (anahtar, deger) VALUES ('revizyon', 0);
+"""
+
+
+class Equivalences:
+    """Eşdeğerlik tablosunun değiştirilemez anlık görüntüsü (pickle edilebilir).
+
+    Parameters:
+        codes: {müfredat kodu: frozenset(transkript kodları)}
+        names: {müfredat kodu: frozenset(normalize transkript adları)}
+        rejected: frozenset((müfredat kodu, transkript kodu))
+        revision: Tablonun revizyon numarası
+    """
+
+    __slots__ = ('codes', 'names', 'rejected', 'revision')
+
+    def __init__(self, codes=None, names=None, rejected=frozenset(), revision: int = 0):
+        self.codes = codes or {}
+        self.names = names or {}
+        self.rejected = rejected
+        self.revision = revision
+
+    def __bool__(self):
+        return bool(self.codes or self.rejected)
+
+    def __getstate__(self):
+        return self.codes, self.names, self.rejected, self.revision
+
+    def __setstate__(self, state):
+        self.codes, self.names, self.rejected, self.revision = state
+
+    def accepted_codes(self, mufredat_kodu: str) -> frozenset:
+        return self.codes.get(normalize_code(mufredat_kodu), frozenset())
+
+    def accepted_names(self, mufredat_kodu: str) -> frozenset:
+        return self.names.get(normalize_code(mufredat_kodu), frozenset())
+
+    def is_rejected(self, mufredat_kodu: str, transkript_kodu: str) -> bool:
+        return (normalize_code(mufredat_kodu), normalize_code(transkript_kodu)) in self.rejected
+
+
+class EquivalenceTable:
+    """SQLite destekli eşdeğerlik tablosu; süreç ve iş parçacığı güvenlidir.
+
+    Her işlem kendi bağlantısını açar (SQLite dosya kilidi süreçler arası
+    yazmaları sıralar). snapshot() revizyon değişmedikçe önbellekten döner.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    @staticmethod
+    def _bump(conn):
+        conn.execute("UPDATE meta SET deger = deger + 1 WHERE anahtar = 'revizyon'")
+
+    def revision(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT deger FROM meta WHERE anahtar = 'revizyon'").fetchone()[0]
+
+    def seed(self, snapshot: Equivalences):
+        """Önbelleği hazır bir görüntüyle doldurur (örn. paylaşımlı paketten).
+
+        snapshot() görüntüyü yalnızca revizyonu tablonunkiyle aynıysa kullanır.
+        """
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = snapshot
+
+    def snapshot(self) -> Equivalences:
+        """Eşleştiricinin kullanacağı güncel anlık görüntü."""
+        revision = self.revision()
+        with self._lock:
+            if self._snapshot is not None and self._snapshot.revision == revision:
+                return self._snapshot
+
+        codes, names, rejected = {}, {}, set()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT mufredat_kodu, transkript_kodu, transkript_adi, durum FROM esdegerlik "
+                "WHERE durum IN ('onayli', 'reddedildi')"
+            ).fetchall()
+        for mufredat_kodu, transkript_kodu, transkript_adi, durum in rows:
+            if durum == 'reddedildi':
+                rejected.add((mufredat_kodu, transkript_kodu))
+                continue
+            codes.setdefault(mufredat_kodu, set()).add(transkript_kodu)
+            if transkript_adi:
+                names.setdefault(mufredat_kodu, set()).add(normalize_name(transkript_adi))
+
+        snapshot = Equivalences(
+            {k: frozenset(v) for k, v in codes.items()},
+            {k: frozenset(v) for k, v in names.items()},
+            frozenset(rejected),
+            revision,
+        )
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def _set(self, mufredat_kodu: str, transkript_kodu: str, transkript_adi: str, kaynak: str, durum: str):
+        key = (normalize_code(mufredat_kodu), normalize_code(transkript_kodu))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO esdegerlik (mufredat_kodu, transkript_kodu, transkript_adi, kaynak, durum, guncelleme) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (mufredat_kodu, transkript_kodu) DO UPDATE SET "
+                "transkript_adi = excluded.transkript_adi, kaynak = excluded.kaynak, "
+                "durum = excluded.durum, guncelleme = excluded.guncelleme",
+                (*key, transkript_adi or '', kaynak, durum, time.time()),
+            )
+            self._bump(conn)
+
+    def confirm(self, mufredat_kodu: str, transkript_kodu: str, transkript_adi: str = '', kaynak: str = 'danisman'):
+        """Çifti onaylı eşdeğerlik olarak kaydeder (reddedilmişse de onaylar)."""
+        self._set(mufredat_kodu, transkript_kodu, transkript_adi, kaynak, 'onayli')
+
+    def reject(self, mufredat_kodu: str, transkript_kodu: str, transkript_adi: str = '', kaynak: str = 'geri_bildirim'):
+        """Çifti reddeder; eşleştirici bu çifti bir daha eşlemez."""
+        self._set(mufredat_kodu, transkript_kodu, transkript_adi, kaynak, 'reddedildi')
+
+    def observe(self, state, results: list, ogrenci: str) -> int:
+        """PASS 3'te yüksek skorla eşleşen çiftleri otomatik öğrenme için kaydeder.
+
+        Aynı öğrencinin (ogrenci: örn. PDF özeti) tekrar analizleri bir kez
+        sayılır. LEARN_MIN_STUDENTS farklı öğrencide görülen aday çift onaylanır.
+
+        Returns:
+            int: Bu çağrıyla etkinleşen çift sayısı
+        """
+        pairs = []
+        for i in state.fuzzy_rows:
+            r = results[i]
+            if r.get('_tr_idx') is None or r['Eslesme_Skoru'] < LEARN_MIN_SCORE:
+                continue
+            pairs.append((normalize_code(r['Mufredat_Kodu']), normalize_code(r['Transkript_Kodu']), r['Transkript_Adi']))
+        if not pairs:
+            return 0
+
+        activated = 0
+        now = time.time()
+        with self._connect() as conn:
+            for mufredat_kodu, transkript_kodu, transkript_adi in pairs:
+                conn.execute(
+                    "INSERT OR IGNORE INTO gozlem (mufredat_kodu, transkript_kodu, ogrenci) VALUES (?, ?, ?)",
+                    (mufredat_kodu, transkript_kodu, ogrenci),
+                )
+                conn.execute(
+                    "INSERT OR IGNORE INTO esdegerlik (mufredat_kodu, transkript_kodu, transkript_adi, kaynak, durum, guncelleme) "
+                    "VALUES (?, ?, ?, 'otomatik', 'aday', ?)",
+                    (mufredat_kodu, transkript_kodu, transkript_adi, now),
+                )
+                seen = conn.execute(
+                    "SELECT COUNT(*) FROM gozlem WHERE mufredat_kodu = ? AND transkript_kodu = ?",
+                    (mufredat_kodu, transkript_kodu),
+                ).fetchone()[0]
+                if seen >= LEARN_MIN_STUDENTS:
+                    changed = conn.execute(
+                        "UPDATE esdegerlik SET durum = 'onayli', guncelleme = ? "
+                        "WHERE mufredat_kodu = ? AND transkript_kodu = ? AND durum = 'aday'",
+                        (now, mufredat_kodu, transkript_kodu),
+                    ).rowcount
+                    activated += changed
+            if activated:
+                self._bump(conn)
+        return activated
+
+    def rows(self) -> list:
+        """Tüm kayıtlar (yönetim ve CLI için)."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT e.mufredat_kodu, e.transkript_kodu, e.transkript_adi, e.kaynak, e.durum, "
+                "(SELECT COUNT(*) FROM gozlem g WHERE g.mufredat_kodu = e.mufredat_kodu "
+                "AND g.transkript_kodu = e.transkript_kodu) "
+                "FROM esdegerlik e ORDER BY e.mufredat_kodu, e.transkript_kodu"
+            ).fetchall()
+
+
+_default_table = None
+_default_lock = threading.Lock()
+
+
+def get_table() -> EquivalenceTable:
+    """Süreç başına tek EquivalenceTable (varsayılan dosya)."""
+    global _default_table
+    with _default_lock:
+        if _default_table is None:
+            _default_table = EquivalenceTable()
+        return _default_table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ders eşdeğerlik tablosunu yönetir.")
+    parser.add_argument('--db', default=DEFAULT_PATH, help='SQLite dosyası (MTS_EQUIVALENCE_DB)')
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--list', action='store_true', help='Kayıtları listele')
+    action.add_argument('--confirm', nargs='+', metavar=('MUFREDAT_KODU', 'TRANSKRIPT_KODU'),
+                        help='Çifti onayla: MUFREDAT_KODU TRANSKRIPT_KODU [TRANSKRIPT_ADI]')
+    action.add_argument('--reject', nargs=2, metavar=('MUFREDAT_KODU', 'TRANSKRIPT_KODU'), help='Çifti reddet')
+    args = parser.parse_args()
+
+    table = EquivalenceTable(args.db)
+    if args.list:
+        for mufredat_kodu, transkript_kodu, transkript_adi, kaynak, durum, gorulme in table.rows():
+            print(f'{mufredat_kodu:<10} -> {transkript_kodu:<10} {durum:<11} {kaynak:<14} {gorulme:>3} öğrenci  {transkript_adi}')
+    elif args.confirm:
+        if len(args.confirm) not in (2, 3):
+            parser.error('--confirm için MUFREDAT_KODU TRANSKRIPT_KODU [TRANSKRIPT_ADI] verilmeli.')
+        table.confirm(*args.confirm)
+    else:
+        table.reject(*args.reject, kaynak='danisman')
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Veri Dışa Aktarma Modülü
+========================
+Eşleştirme sonuçlarını (match_courses) ve özetleri (generate_summary) diğer
+sistemlerin okuyabileceği biçimlerde dışa aktarır:
+
+    - 'jsonl': Öğrenci başına bir satır; özet + tüm ders sonuçları
+    - 'csv':   Ders başına bir satır (öğrenci, müfredat ve özet sütunlarıyla)
+    - 'xlsx':  'Dersler' ve 'Ozet' sayfaları
+
+Yazıcılar kayıtları geldikçe yazar (xlsx için openpyxl write-only modu); kohort
+ne kadar büyük olursa olsun bellekte tek öğrencinin verisi tutulur. Birden
+fazla biçim, girdi üzerinden tek geçişte birlikte üretilebilir.
+
+Kullanım:
+    python exporters.py --json ogrenciler.json --jsonl sonuclar.jsonl --csv dersler.csv --xlsx kohort.xlsx
+    python exporters.py --cache-dir .sonuc_onbellegi --csv dersler.csv
+"""
+
+import io
+import csv
+import json
+from collections.abc import Mapping
+
+from openpyxl import Workbook
+
+from matcher import CourseResult
+
+RESULT_COLUMNS = [f for f in CourseResult.FIELDS if not f.startswith('_')]
+
+# Tablo biçimlerinde kullanılan skaler özet alanları (fazladan_dersler listesi hariç)
+SUMMARY_COLUMNS = [
+    'toplam_mufredat_akts', 'basarili_akts', 'agno', 'mezuniyet_durumu', 'toplam_ders',
+    'basarili_ders_sayisi', 'basarisiz_ders_sayisi', 'eksik_ders_sayisi', 'devam_eden_sayisi',
+    'supheli_sayisi', 'fazladan_ders_sayisi', 'ingilizce_basarili_akts', 'ingilizce_devam_akts',
+    'ingilizce_toplam_akts', 'ingilizce_toplam_mufredat', 'ingilizce_oran', 'ingilizce_yeterli',
+]
+
+MIME_TYPES = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def to_builtin(value):
+    """numpy/pandas skalerlerini (iç içe sözlük/listelerde de) JSON'a yazılabilir Python tiplerine çevirir."""
+    if isinstance(value, Mapping):
+        return {k: to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(v) for v in value]
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+
+def json_default(value):
+    """json.dumps için: numpy skalerleri ve CourseResult gibi eşlemeler."""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'keys'):
+        return dict(value)
+    return str(value)
+
+
+def result_row(result) -> list:
+    """Bir ders sonucunu RESULT_COLUMNS sırasında değer listesine çevirir."""
+    return [to_builtin(result.get(column)) for column in RESULT_COLUMNS]
+
+
+def summary_row(summary: dict) -> list:
+    """Özeti SUMMARY_COLUMNS sırasında değer listesine çevirir."""
+    return [to_builtin(summary.get(column)) for column in SUMMARY_COLUMNS]
+
+
+# ===== YAZICILAR =====
+
+class JsonLinesWriter:
+    """Öğrenci başına bir JSON satırı yazar."""
+
+    def __init__(self, fp):
+        self.stream = io.TextIOWrapper(fp, encoding='utf-8', newline='\n', write_through=True)
+
+    def write(self, ad: str, mufredat: str, results: list, summary: dict):
+        record = {
+            'ad': ad,
+            'mufredat': mufredat,
+            'summary': summary,
+            'results': [{k: v for k, v in r.items() if not k.startswith('_')} for r in results],
+        }
+        self.stream.write(json.dumps(record, ensure_ascii=False, default=json_default))
+        self.stream.write('\n')
+
+    def close(self):
+        self.stream.flush()
+        self.stream.detach()
+
+
+class CsvWriter:
+    """Ders başına bir satır yazar; Excel'in Türkçe karakterleri tanıması için BOM eklenir.
+
+    Tek dosyada kalmak için öğrencinin özeti (AGNO, AKTS toplamları, mezuniyet
+    durumu) her ders satırının sonunda tekrarlanır; hiç dersi olmayan öğrenci
+    için ders sütunları boş tek bir satır yazılır.
+    """
+
+    def __init__(self, fp):
+        self.stream = io.TextIOWrapper(fp, encoding='utf-8-sig', newline='', write_through=True)
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow(['Ogrenci', 'Mufredat'] + RESULT_COLUMNS + SUMMARY_COLUMNS)
+
+    def write(self, ad: str, mufredat: str, results: list, summary: dict):
+        ozet = summary_row(summary)
+        if not results:
+            self.writer.writerow([ad, mufredat] + [None] * len(RESULT_COLUMNS) + ozet)
+            return
+        self.writer.writerows([ad, mufredat] + result_row(r) + ozet for r in results)
+
+    def close(self):
+        self.stream.flush()
+        self.stream.detach()
+
+
+class XlsxWriter:
+    """'Dersler' ve 'Ozet' sayfalarını write-only modda yazar; dosya close()'da kaydedilir."""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.workbook = Workbook(write_only=True)
+        self.dersler = self.workbook.create_sheet('Dersler')
+        self.ozet = self.workbook.create_sheet('Ozet')
+        self.dersler.append(['Ogrenci', 'Mufredat'] + RESULT_COLUMNS)
+        self.ozet.append(['Ogrenci', 'Mufredat'] + SUMMARY_COLUMNS)
+
+    def write(self, ad: str, mufredat: str, results: list, summary: dict):
+        for r in results:
+            self.dersler.append([ad, mufredat] + result_row(r))
+        self.ozet.append([ad, mufredat] + summary_row(summary))
+
+    def close(self):
+        self.workbook.save(self.fp)
+
+
+WRITERS = {
+    'jsonl': JsonLinesWriter,
+    'csv': CsvWriter,
+    'xlsx': XlsxWriter,
+}
+
+
+# ===== DIŞA AKTARMA =====
+
+def export_cohort(items, targets: dict) -> int:
+    """Öğrenci kayıtlarını tek geçişte istenen tüm biçimlere yazar.
+
+    Parameters:
+        items: {'ad', 'results', 'summary', 'mufredat'} kayıtları (liste veya üreteç)
+        targets: {'csv': 'dersler.csv', 'xlsx': dosya_nesnesi, ...}
+
+    Returns:
+        int: Yazılan öğrenci sayısı
+    """
+    opened = []
+    writers = []
+    try:
+        for fmt, target in targets.items():
+            if fmt not in WRITERS:
+                raise ValueError(f"Bilinmeyen dışa aktarma biçimi: '{fmt}'")
+            if isinstance(target, str):
+                target = open(target, 'wb')
+                opened.append(target)
+            writers.append(WRITERS[fmt](target))
+
+        count = 0
+        for item in items:
+            for writer in writers:
+                writer.write(str(item['ad']), item.get('mufredat', ''), item['results'], item['summary'])
+            count += 1
+
+        for writer in writers:
+            writer.close()
+        return count
+    finally:
+        for fp in opened:
+            fp.close()
+
+
+def export_student(results: list, summary: dict, fmt: str, ad: str = '', mufredat: str = '') -> bytes:
+    """Tek öğrencinin sonuçlarını verilen biçimde bayt olarak döndürür (indirme butonları için)."""
+    buffer = io.BytesIO()
+    export_cohort([{'ad': ad, 'mufredat': mufredat, 'results': results, 'summary': summary}], {fmt: buffer})
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    from cohort_reports import iter_cache_entries, load_json_items
+
+    parser = argparse.ArgumentParser(description="Kohort sonuçlarını JSON Lines / CSV / XLSX olarak dışa aktarır.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--json', help="Öğrenci kayıtlarını içeren JSON dosyası")
+    source.add_argument('--cache-dir', help="ResultCache disk dizini (MTS_RESULT_CACHE_DIR)")
+    for fmt in WRITERS:
+        parser.add_argument(f'--{fmt}', help=f'Yazılacak {fmt.upper()} dosyası')
+    args = parser.parse_args()
+
+    targets = {fmt: getattr(args, fmt) for fmt in WRITERS if getattr(args, fmt)}
+    if not targets:
+        parser.error('En az bir çıktı biçimi (--jsonl, --csv, --xlsx) belirtilmeli.')
+
+    items = load_json_items(args.json) if args.json else iter_cache_entries(args.cache_dir)
+    started = time.perf_counter()
+    count = export_cohort(items, targets)
+    print(f'{count} öğrenci dışa aktarıldı: {", ".join(targets.values())} ({time.perf_counter() - started:.1f} sn).')
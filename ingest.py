@@ -0,0 +1,567 @@
+# -*- coding: utf-8 -*-
+"""
+Klasör İzleyen Transkript Alım Servisi
+======================================
+Öğrenci işleri başvuru dönemi boyunca transkript PDF'lerini paylaşılan bir
+klasöre bırakır. Bu servis klasörü sürekli izler; yeni PDF'leri ayrıştırma
+-> eşleştirme -> özet hattından geçirip sonuçları yerel bir SQLite deposuna
+(MTS_INGEST_DB) yazar.
+
+    - İzleme: Linux'ta inotify (ek bağımlılık olmadan, ctypes ile); inotify
+      yoksa veya kullanılamıyorsa klasör MTS_INGEST_POLL saniyede bir taranır.
+    - Yarım dosyalar: Bir dosya, boyutu ve değişiklik zamanı MTS_INGEST_SETTLE
+      saniye boyunca değişmeyince ve PDF sonu (%%EOF) yazılmışsa işlenir.
+    - Havuz: İşler sınırlı bir süreç havuzunda çalışır (api.analyze_job);
+      aynı anda en fazla 2 x işçi iş havuzdadır, kalanlar yalnızca dosya adı
+      olarak sırada bekler.
+    - Tekrarsızlık: Sonuçlar içerik özeti (SHA-256) + müfredat anahtarlıdır;
+      aynı PDF farklı adla tekrar bırakılsa da yeniden işlenmez.
+    - Yeniden başlatma: İşlenen her dosya (ad, boyut, değişiklik zamanı) ile
+      kaydedilir; servis yeniden başladığında bu dosyalar okunmadan atlanır,
+      yarıda kalanlar baştan işlenir.
+    - Ölçümler: Kuyruk derinliği (bekleyen, sıradaki, işlenen) ve işlem
+      gecikmesi (p50/p95) stats() ile alınır; MTS_INGEST_METRICS_PORT
+      verilirse HTTP üzerinden JSON olarak sunulur.
+
+Kullanım:
+    python ingest.py --dir /srv/ogrenci_isleri/transkriptler
+    python ingest.py --dir gelen/ --bolum makine --mufredat 2022 --workers 4 --metrics-port 9100
+    python ingest.py --dir gelen/ --once          # klasördekileri işle ve çık
+"""
+
+import os
+import json
+import time
+import signal
+import select
+import struct
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from api import analyze_job
+from curricula import get_registry
+from curriculum_pack import attach_worker, publish_default
+from stats import percentile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIR = os.environ.get('MTS_INGEST_DIR', '')
+DEFAULT_DB = os.environ.get('MTS_INGEST_DB', os.path.join(BASE_DIR, 'alim.sqlite3'))
+DEFAULT_WORKERS = int(os.environ.get('MTS_INGEST_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+# Dosya bu kadar saniye değişmeden kalınca yazımı bitmiş sayılır
+DEFAULT_SETTLE = float(os.environ.get('MTS_INGEST_SETTLE', '2'))
+# inotify yoksa klasör tarama aralığı (saniye)
+DEFAULT_POLL = float(os.environ.get('MTS_INGEST_POLL', '2'))
+# Bu kadar süre değişmeyip hâlâ %%EOF içermeyen dosya bozuk sayılır
+STALE_SECONDS = float(os.environ.get('MTS_INGEST_STALE', '60'))
+DEFAULT_METRICS_PORT = int(os.environ.get('MTS_INGEST_METRICS_PORT', '0'))
+
+# Gecikme yüzdelikleri için tutulan son ölçüm sayısı
+LATENCY_WINDOW = 1000
+
+logger = logging.getLogger('ingest')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sonuc (
+    pdf_ozeti        TEXT NOT NULL,
+    mufredat         TEXT NOT NULL,
+    dosya            TEXT NOT NULL,      -- ilk görülen dosya adı
+    mezuniyet_durumu TEXT NOT NULL,
+    agno             REAL NOT NULL,
+    veri             TEXT NOT NULL,      -- JSON: transkript, agno, results, summary
+    sure             REAL NOT NULL,      -- işçideki işlem süresi (sn)
+    zaman            REAL NOT NULL,
+    PRIMARY KEY (pdf_ozeti, mufredat)
+);
+CREATE TABLE IF NOT EXISTS dosya (
+    ad        TEXT PRIMARY KEY,
+    boyut     INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    pdf_ozeti TEXT,
+    durum     TEXT NOT NULL,             -- 'tamam' | 'hata'
+    hata      TEXT NOT NULL DEFAULT '',
+    zaman     REAL NOT NULL
+);
+"""
+
+
+# ===== SONUÇ DEPOSU =====
+
+class IngestStore:
+    """Alım sonuçları ve işlenmiş dosyalar (SQLite); yazımlar tekrarlanabilir."""
+
+    def __init__(self, path: str = DEFAULT_DB):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def processed_files(self) -> dict:
+        """Ad -> (boyut, mtime_ns); bu haliyle işlenmiş (veya hatalı bulunmuş) dosyalar."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT ad, boyut, mtime_ns FROM dosya").fetchall()
+        return {ad: (boyut, mtime_ns) for ad, boyut, mtime_ns in rows}
+
+    def has_result(self, pdf_hash: str, mufredat: str) -> bool:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT 1 FROM sonuc WHERE pdf_ozeti = ? AND mufredat = ?", (pdf_hash, mufredat),
+            ).fetchone() is not None
+
+    def put_result(self, pdf_hash: str, mufredat: str, dosya: str, data: dict, sure: float):
+        """Sonucu yazar; aynı içerik + müfredat zaten varsa dokunmaz."""
+        summary = data['summary']
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO sonuc (pdf_ozeti, mufredat, dosya, mezuniyet_durumu, agno, veri, sure, zaman) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (pdf_hash, mufredat, dosya, summary['mezuniyet_durumu'], float(summary['agno']),
+                 json.dumps(data, ensure_ascii=False), sure, time.time()),
+            )
+
+    def mark_file(self, ad: str, boyut: int, mtime_ns: int, pdf_hash: str = None, hata: str = ''):
+        """Dosyayı bu boyut/zamanla işlenmiş olarak kaydeder (yeniden başlatmada atlanır)."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO dosya (ad, boyut, mtime_ns, pdf_ozeti, durum, hata, zaman) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (ad, boyut, mtime_ns, pdf_hash, 'hata' if hata else 'tamam', hata, time.time()),
+            )
+
+    def counts(self) -> dict:
+        with self._connect() as conn:
+            sonuc = conn.execute("SELECT COUNT(*) FROM sonuc").fetchone()[0]
+            hata = conn.execute("SELECT COUNT(*) FROM dosya WHERE durum = 'hata'").fetchone()[0]
+        return {'sonuc': sonuc, 'hatali_dosya': hata}
+
+
+# ===== KLASÖR İZLEME =====
+
+class InotifyWatcher:
+    """Linux inotify ile klasör olaylarını bekler (ctypes; ek paket gerekmez).
+
+    wait() değişen dosya adlarını döndürür; olay kuyruğu taştıysa None
+    döndürür ve çağıran klasörü baştan tarar.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 başarısız')
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f'inotify_add_watch başarısız: {directory}')
+
+    def wait(self, timeout: float):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """inotify olmayan sistemler (ve ağ dosya sistemleri) için periyodik tarama."""
+
+    def __init__(self, directory: str, interval: float = DEFAULT_POLL):
+        self.interval = interval
+        self._last_scan = time.monotonic()
+
+    def wait(self, timeout: float):
+        time.sleep(timeout)
+        if time.monotonic() - self._last_scan >= self.interval:
+            self._last_scan = time.monotonic()
+            return None
+        return set()
+
+    def close(self):
+        pass
+
+
+def make_watcher(directory: str, poll_interval: float = DEFAULT_POLL, polling: bool = False):
+    """Mümkünse inotify, değilse tarama tabanlı izleyici."""
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            logger.info('inotify kullanılamıyor (%s); %.1f sn aralıkla taranacak.', e, poll_interval)
+    return PollingWatcher(directory, poll_interval)
+
+
+# ===== SERVİS =====
+
+def is_candidate(name: str) -> bool:
+    """İşlenecek dosya adı mı (gizli/geçici dosyalar hariç .pdf)."""
+    return name.lower().endswith('.pdf') and not name.startswith(('.', '~'))
+
+
+def has_pdf_trailer(path: str) -> bool:
+    """Dosyanın son 1 KB'ında %%EOF var mı (yazımı tamamlanmış PDF)."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 1024))
+            return b'%%EOF' in f.read()
+    except OSError:
+        return False
+
+
+def _init_worker(pack_path: str):
+    """İşçi süreçler Ctrl+C'yi yok sayar (durdurma ana süreçten yönetilir, havuzdaki işler biter)
+    ve müfredatları paylaşımlı paketten bağlar."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    attach_worker(pack_path)
+
+
+class _Job:
+    """Sıradaki veya havuzdaki bir dosya."""
+
+    __slots__ = ('name', 'size', 'mtime_ns', 'seen', 'pdf_hash', 'started')
+
+    def __init__(self, name: str, size: int, mtime_ns: int, seen: float):
+        self.name = name
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.seen = seen            # dosyanın ilk görüldüğü an (monotonic)
+        self.pdf_hash = None
+        self.started = None         # havuza gönderildiği an
+
+
+class IngestService:
+    """Klasörü izleyip yeni transkriptleri süreç havuzunda işleyen servis.
+
+    Parameters:
+        directory: İzlenecek klasör
+        curriculum: Eşleştirmede kullanılacak müfredat (curricula.Curriculum)
+        store: Sonuç deposu (IngestStore)
+        workers: Süreç havuzu büyüklüğü
+        settle: Dosyanın yazımı bitmiş sayılması için değişmeden geçmesi gereken süre (sn)
+        watcher: İzleyici (verilmezse make_watcher)
+    """
+
+    def __init__(self, directory: str, curriculum, store: IngestStore, workers: int = DEFAULT_WORKERS,
+                 settle: float = DEFAULT_SETTLE, watcher=None):
+        self.directory = directory
+        self.curriculum = curriculum
+        self.store = store
+        self.workers = workers
+        self.settle = settle
+        self.max_in_flight = 2 * workers
+        self.watcher = watcher or make_watcher(directory)
+
+        self._processed = store.processed_files()
+        self._pending = {}          # ad -> (boyut, mtime_ns, değişmez olduğu an, ilk görülme)
+        self._queue = deque()       # havuza gönderilmeyi bekleyen _Job'lar
+        self._in_flight = {}        # future -> _Job
+        self._hash_owner = {}       # havuzdaki içerik özeti -> aynı içerikli bekleyen _Job'lar
+        self._latency = deque(maxlen=LATENCY_WINDOW)       # havuza gönderim -> kayıt
+        self._end_to_end = deque(maxlen=LATENCY_WINDOW)    # ilk görülme -> kayıt
+        self._done = 0
+        self._failed = 0
+        self._skipped = 0
+        self._started = time.time()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    # ----- dosya olayları -----
+
+    def _touch(self, name: str, now: float):
+        """Dosya olayı veya tarama: aday dosyayı bekleyenlere ekler/günceller."""
+        if not is_candidate(name):
+            return
+        try:
+            st = os.stat(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            self._pending.pop(name, None)
+            return
+        signature = (st.st_size, st.st_mtime_ns)
+        if self._processed.get(name) == signature:
+            self._pending.pop(name, None)
+            return
+        entry = self._pending.get(name)
+        if entry is None or entry[:2] != signature:
+            first_seen = entry[3] if entry else now
+            # Son değişikliği settle süresinden eski dosya (yeniden başlatmada bekleyenler,
+            # yazımı bitip taşınmış dosyalar) beklemeden işlenebilir
+            settled = time.time() - st.st_mtime >= self.settle
+            self._pending[name] = (st.st_size, st.st_mtime_ns, now - self.settle if settled else now, first_seen)
+
+    def _scan(self, now: float):
+        try:
+            names = os.listdir(self.directory)
+        except OSError as e:
+            logger.error('Klasör okunamadı: %s', e)
+            return
+        for name in names:
+            self._touch(name, now)
+
+    def _settle_pending(self, now: float):
+        """Yazımı bitmiş dosyaları sıraya alır (debounce)."""
+        queued = {job.name for job in self._queue} | {job.name for job in self._in_flight.values()}
+        for name, (size, mtime_ns, stable_since, first_seen) in list(self._pending.items()):
+            self._touch(name, now)
+            if self._pending.get(name) != (size, mtime_ns, stable_since, first_seen):
+                continue  # değişti veya silindi
+            if now - stable_since < self.settle or name in queued:
+                continue
+            path = os.path.join(self.directory, name)
+            if not has_pdf_trailer(path):
+                if now - stable_since >= STALE_SECONDS:
+                    del self._pending[name]
+                    self._fail(_Job(name, size, mtime_ns, first_seen), 'PDF tamamlanmamış (%%EOF yok)')
+                continue
+            del self._pending[name]
+            self._queue.append(_Job(name, size, mtime_ns, first_seen))
+
+    # ----- havuz -----
+
+    def _dispatch(self, pool):
+        """Sıradaki işleri havuz sınırına kadar gönderir."""
+        mufredat = self.curriculum.key
+        while self._queue and len(self._in_flight) < self.max_in_flight:
+            job = self._queue.popleft()
+            try:
+                with open(os.path.join(self.directory, job.name), 'rb') as f:
+                    pdf_bytes = f.read()
+            except OSError as e:
+                self._fail(job, f'Dosya okunamadı: {e}')
+                continue
+            job.pdf_hash = hashlib.sha256(pdf_bytes).hexdigest()
+            if self.store.has_result(job.pdf_hash, mufredat):
+                self._complete(job)
+                self._skipped += 1
+                continue
+            if job.pdf_hash in self._hash_owner:
+                # Aynı içerik zaten işleniyor; bitince bu dosya da tamamlanır
+                self._hash_owner[job.pdf_hash].append(job)
+                continue
+            job.started = time.monotonic()
+            try:
+                future = pool.submit(analyze_job, pdf_bytes, self.curriculum.path)
+            except BrokenProcessPool:
+                self._queue.appendleft(job)
+                self._pool_broken()
+                return
+            self._in_flight[future] = job
+            self._hash_owner[job.pdf_hash] = []
+
+    def _collect(self, futures):
+        now = time.monotonic()
+        for future in futures:
+            job = self._in_flight.pop(future)
+            duplicates = self._hash_owner.pop(job.pdf_hash, [])
+            try:
+                data = future.result()
+            except BrokenProcessPool:
+                # İşçi süreci öldü; dosyalar işaretlenmez, yeniden başlatmada tekrar işlenir
+                self._pool_broken()
+                continue
+            except Exception as e:  # işçideki ayrıştırma/eşleştirme hatası
+                for j in [job] + duplicates:
+                    self._fail(j, f'{type(e).__name__}: {e}')
+                continue
+            if not data['transkript']:
+                for j in [job] + duplicates:
+                    self._fail(j, 'Transkriptten ders verisi çıkarılamadı')
+                continue
+            self.store.put_result(job.pdf_hash, self.curriculum.key, job.name, data, now - job.started)
+            self._latency.append(now - job.started)
+            for j in [job] + duplicates:
+                self._complete(j)
+            logger.info('%s işlendi (%.2f sn): %s', job.name, now - job.started,
+                        data['summary']['mezuniyet_durumu'])
+
+    def _pool_broken(self):
+        if not self._stop.is_set():
+            logger.error('Süreç havuzu bozuldu; servis duruyor (yeniden başlatıldığında kalan dosyalar işlenir).')
+        self._stop.set()
+
+    def _complete(self, job: _Job):
+        self.store.mark_file(job.name, job.size, job.mtime_ns, job.pdf_hash)
+        self._processed[job.name] = (job.size, job.mtime_ns)
+        self._end_to_end.append(time.monotonic() - job.seen)
+        self._done += 1
+
+    def _fail(self, job: _Job, message: str):
+        logger.warning('%s işlenemedi: %s', job.name, message)
+        self.store.mark_file(job.name, job.size, job.mtime_ns, job.pdf_hash, hata=message)
+        self._processed[job.name] = (job.size, job.mtime_ns)
+        self._failed += 1
+
+    # ----- ölçümler -----
+
+    def _update_metrics(self):
+        latency = list(self._latency)
+        end_to_end = list(self._end_to_end)
+        metrics = {
+            'klasor': self.directory,
+            'mufredat': self.curriculum.key,
+            'izleyici': 'inotify' if isinstance(self.watcher, InotifyWatcher) else 'tarama',
+            'calisma_suresi_sn': round(time.time() - self._started, 1),
+            'kuyruk': {
+                'yazimi_bekleyen': len(self._pending),
+                'sirada': len(self._queue),
+                'isleniyor': len(self._in_flight),
+                'toplam': len(self._pending) + len(self._queue) + len(self._in_flight),
+            },
+            'tamamlanan': self._done,
+            'tekrar_atlanan': self._skipped,
+            'hatali': self._failed,
+            'islem_gecikmesi_ms': {
+                'p50': round(percentile(latency, 50) * 1000, 1),
+                'p95': round(percentile(latency, 95) * 1000, 1),
+            },
+            'toplam_gecikme_ms': {
+                'p50': round(percentile(end_to_end, 50) * 1000, 1),
+                'p95': round(percentile(end_to_end, 95) * 1000, 1),
+            },
+        }
+        with self._lock:
+            self._metrics = metrics
+
+    def stats(self) -> dict:
+        """Kuyruk derinliği, sayaçlar ve gecikme yüzdelikleri (iş parçacığı güvenli)."""
+        with self._lock:
+            return dict(self._metrics)
+
+    def idle(self) -> bool:
+        return not (self._pending or self._queue or self._in_flight)
+
+    # ----- döngü -----
+
+    def stop(self):
+        """Döngüyü durdurur; havuzdaki işler bitirilir, sıradakiler yeniden başlatmada işlenir."""
+        self._stop.set()
+
+    def run(self, once: bool = False):
+        """Servis döngüsü. once=True ise klasördekiler işlenince döner."""
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(publish_default(),)) as pool:
+            self._scan(time.monotonic())
+            try:
+                while not self._stop.is_set():
+                    if self._in_flight:
+                        done, _ = wait(list(self._in_flight), timeout=0)
+                        self._collect(done)
+                    busy = not self.idle()
+                    if once and not busy:
+                        break
+                    changed = self.watcher.wait(min(0.25, self.settle / 4) if busy else 1.0)
+                    now = time.monotonic()
+                    if changed is None:
+                        self._scan(now)
+                    else:
+                        for name in changed:
+                            self._touch(name, now)
+                    self._settle_pending(now)
+                    self._dispatch(pool)
+                    self._update_metrics()
+            finally:
+                while self._in_flight:
+                    done, _ = wait(list(self._in_flight), return_when=FIRST_COMPLETED)
+                    self._collect(done)
+                self._update_metrics()
+                self.watcher.close()
+
+
+def serve_metrics(service: IngestService, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """stats() çıktısını GET isteklerine JSON olarak döndüren arka plan HTTP sunucusu."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(service.stats(), ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='ingest-metrics', daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Klasöre bırakılan transkriptleri sürekli işler.")
+    parser.add_argument('--dir', default=DEFAULT_DIR, help='İzlenecek klasör (MTS_INGEST_DIR)')
+    parser.add_argument('--db', default=DEFAULT_DB, help='Sonuç deposu (MTS_INGEST_DB)')
+    parser.add_argument('--bolum', default=None, help='Bölüm (varsayılan: MTS_DEFAULT_BOLUM)')
+    parser.add_argument('--mufredat', default=None, help='Müfredat yılı (varsayılan: bölümün varsayılanı)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='İşçi süreç sayısı')
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE, help='Yazım bitti sayılma süresi (sn)')
+    parser.add_argument('--poll', type=float, default=DEFAULT_POLL, help='Tarama aralığı (sn, inotify yoksa)')
+    parser.add_argument('--polling', action='store_true', help='inotify yerine tarama kullan')
+    parser.add_argument('--metrics-port', type=int, default=DEFAULT_METRICS_PORT,
+                        help='Ölçümlerin sunulacağı HTTP portu (0: kapalı)')
+    parser.add_argument('--once', action='store_true', help='Klasördekileri işle ve çık')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    if not args.dir or not os.path.isdir(args.dir):
+        parser.error(f'Klasör bulunamadı: {args.dir!r}')
+
+    registry = get_registry()
+    try:
+        department = registry.department(args.bolum)
+        curriculum = department.curricula[int(args.mufredat)] if args.mufredat else department.default_curriculum()
+    except (KeyError, ValueError, StopIteration):
+        parser.error(f'Müfredat bulunamadı: bölüm={args.bolum!r} yıl={args.mufredat!r}')
+
+    service = IngestService(
+        args.dir, curriculum, IngestStore(args.db), workers=args.workers, settle=args.settle,
+        watcher=make_watcher(args.dir, args.poll, polling=args.polling),
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: service.stop())
+    if args.metrics_port:
+        serve_metrics(service, args.metrics_port, os.environ.get('MTS_INGEST_METRICS_HOST', '127.0.0.1'))
+
+    logger.info('%s izleniyor (%s, %d işçi)', args.dir, curriculum.key, args.workers)
+    service.run(once=args.once)
+    logger.info('Durduruldu: %s', json.dumps(service.stats(), ensure_ascii=False))
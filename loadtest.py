@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Yük Testi Aracı
+===============
+Streamlit uygulamasını N eşzamanlı kullanıcı oturumuyla yerel olarak zorlar.
+
+Her sanal kullanıcı kendi `AppTest` oturumunda `app.py` betiğini çalıştırır
+(yani `app.main()` ile birebir aynı kod yolu), örnek bir transkript yükler ve
+ardından müfredat seçimi, eşik kaydırıcısı ve yeni transkript yükleme gibi
+etkileşimleri rastgele (ama seed ile tekrarlanabilir) sırayla yapar.
+
+Streamlit sunucusu oturumları tek süreç içinde iş parçacıklarıyla çalıştırdığı
+için kullanıcılar da iş parçacığı olarak simüle edilir; böylece GIL ve
+`parse_transcript` kaynaklı bekleme, gerçek bir konteynerdeki gibi ölçülür.
+
+Kullanım:
+    python loadtest.py --users 8 --iterations 5
+    python loadtest.py --users 16 --iterations 10 --format tablo --json sonuc.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+import statistics
+
+from sample_transcripts import generate_sample
+from curricula import get_registry
+from stats import percentile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, 'app.py')
+
+
+def current_rss() -> int:
+    """Sürecin anlık yerleşik bellek kullanımını (bayt) döndürür."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS bayt, Linux KB döndürür
+        return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class VirtualUser(threading.Thread):
+    """Tek bir tarayıcı oturumunu simüle eden iş parçacığı."""
+
+    def __init__(self, user_id: int, transcripts: list, iterations: int, seed: int,
+                 timeout: float, start_barrier: threading.Barrier):
+        super().__init__(name=f'user-{user_id}', daemon=True)
+        self.user_id = user_id
+        self.transcripts = transcripts
+        self.iterations = iterations
+        self.rnd = random.Random(seed * 1000 + user_id)
+        self.timeout = timeout
+        self.start_barrier = start_barrier
+        self.timings = []   # (eylem, saniye)
+        self.errors = []
+        self.app = None
+
+    def timed_run(self, action: str):
+        started = time.perf_counter()
+        self.app.run(timeout=self.timeout)
+        elapsed = time.perf_counter() - started
+        self.timings.append((action, elapsed))
+        if self.app.exception:
+            self.errors.append(f'{action}: {self.app.exception[0].value}')
+
+    def upload(self):
+        pdf_bytes = self.rnd.choice(self.transcripts)
+        name = f'transkript_{self.user_id}.pdf'
+        self.app.sidebar.file_uploader[0].set_value((name, pdf_bytes, 'application/pdf'))
+        self.timed_run('upload')
+
+    def run(self):
+        from streamlit.testing.v1 import AppTest
+
+        try:
+            self.app = AppTest.from_file(APP_PATH, default_timeout=self.timeout)
+            self.start_barrier.wait()
+            self.timed_run('landing')
+            self.upload()
+
+            for _ in range(self.iterations):
+                action = self.rnd.choice(['curriculum', 'threshold', 'upload'])
+                if action == 'curriculum':
+                    box = self.app.sidebar.selectbox[0]
+                    box.set_value(self.rnd.choice(box.options))
+                    self.timed_run('curriculum')
+                elif action == 'threshold':
+                    self.app.sidebar.slider[0].set_value(self.rnd.choice(range(50, 101, 5)))
+                    self.timed_run('threshold')
+                else:
+                    self.upload()
+        except Exception as e:  # Bir kullanıcının hatası testi durdurmamalı
+            self.errors.append(f'{type(e).__name__}: {e}')
+
+
+def run_load_test(users: int, iterations: int, fmt: str, seed: int, timeout: float,
+                  sample_count: int) -> dict:
+    """Yük testini çalıştırır ve ölçüm sonuçlarını döndürür."""
+    # Streamlit'in "bare mode" ve kullanımdan kaldırma uyarılarını sustur
+    from streamlit import logger as st_logger
+    st_logger.set_log_level(logging.ERROR)
+    os.chdir(BASE_DIR)  # app.py müfredat dosyalarını göreli yolla açar
+
+    mufredatlar = [curriculum.path for curriculum in get_registry()]
+    transcripts = [
+        generate_sample(mufredatlar[i % len(mufredatlar)], fmt, seed + i)
+        for i in range(sample_count)
+    ]
+
+    rss_before = current_rss()
+    barrier = threading.Barrier(users)
+    workers = [VirtualUser(i, transcripts, iterations, seed, timeout, barrier) for i in range(users)]
+
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - started
+    rss_after = current_rss()
+
+    by_action = {}
+    all_timings = []
+    for w in workers:
+        for action, elapsed in w.timings:
+            by_action.setdefault(action, []).append(elapsed)
+            all_timings.append(elapsed)
+
+    def describe(values):
+        return {
+            'count': len(values),
+            'mean_ms': round(statistics.mean(values) * 1000, 1) if values else 0.0,
+            'p50_ms': round(percentile(values, 50) * 1000, 1),
+            'p90_ms': round(percentile(values, 90) * 1000, 1),
+            'p95_ms': round(percentile(values, 95) * 1000, 1),
+            'p99_ms': round(percentile(values, 99) * 1000, 1),
+            'max_ms': round(max(values) * 1000, 1) if values else 0.0,
+        }
+
+    # Oturumlar hâlâ canlıyken ölçülen bellek artışı kullanıcı sayısına bölünür
+    per_session = (rss_after - rss_before) / users if users else 0
+    result = {
+        'users': users,
+        'iterations': iterations,
+        'format': fmt,
+        'wall_seconds': round(wall, 2),
+        'reruns': len(all_timings),
+        'throughput_rps': round(len(all_timings) / wall, 2) if wall > 0 else 0.0,
+        'latency': describe(all_timings),
+        'latency_by_action': {a: describe(v) for a, v in sorted(by_action.items())},
+        'rss_before_mb': round(rss_before / 1024 / 1024, 1),
+        'rss_after_mb': round(rss_after / 1024 / 1024, 1),
+        'rss_per_session_mb': round(per_session / 1024 / 1024, 2),
+        'errors': [e for w in workers for e in w.errors],
+    }
+    return result
+
+
+def print_report(result: dict):
+    """Sonuçları okunabilir bir tablo olarak yazdırır."""
+    print(f"\nKullanıcı: {result['users']}  Etkileşim/kullanıcı: {result['iterations']}  "
+          f"Format: {result['format']}")
+    print(f"Toplam süre: {result['wall_seconds']} sn  Yeniden çalıştırma: {result['reruns']}  "
+          f"Verim: {result['throughput_rps']} çalıştırma/sn")
+    print(f"Bellek: {result['rss_before_mb']} MB -> {result['rss_after_mb']} MB  "
+          f"(oturum başına ~{result['rss_per_session_mb']} MB)\n")
+
+    header = f"{'Eylem':<12}{'Adet':>6}{'Ort':>9}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'Maks':>9}"
+    print(header)
+    print('-' * len(header))
+    rows = list(result['latency_by_action'].items()) + [('TOPLAM', result['latency'])]
+    for action, s in rows:
+        print(f"{action:<12}{s['count']:>6}{s['mean_ms']:>9}{s['p50_ms']:>9}{s['p90_ms']:>9}"
+              f"{s['p95_ms']:>9}{s['p99_ms']:>9}{s['max_ms']:>9}")
+    print('(süreler ms)')
+
+    if result['errors']:
+        print(f"\n{len(result['errors'])} hata:")
+        for e in result['errors'][:10]:
+            print(f'  - {e}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Streamlit uygulaması için eşzamanlı oturum yük testi.')
+    parser.add_argument('--users', type=int, default=4, help='Eşzamanlı sanal kullanıcı sayısı')
+    parser.add_argument('--iterations', type=int, default=5, help='Yüklemeden sonra kullanıcı başına etkileşim')
+    parser.add_argument('--format', choices=['metin', 'tablo'], default='metin', help='Örnek transkript biçimi')
+    parser.add_argument('--samples', type=int, default=8, help='Üretilecek farklı örnek transkript sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Tekrarlanabilirlik için rastgelelik tohumu')
+    parser.add_argument('--timeout', type=float, default=120, help='Tek bir yeniden çalıştırma için zaman aşımı (sn)')
+    parser.add_argument('--json', help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    result = run_load_test(args.users, args.iterations, args.format, args.seed, args.timeout, args.samples)
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
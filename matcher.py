@@ -7,8 +7,14 @@ Ders kodu bazlı kesin eşleştirme + ders adı bazlı bulanık eşleştirme kul
 """
 
 import re
+import sys
+from collections.abc import MutableMapping
+
+import numpy as np
 import pandas as pd
-from thefuzz import fuzz, process
+
+from name_index import NameIndex, normalize_name
+from curricula import DepartmentRules, default_rules
 
 
 def normalize_code(code: str) -> str:
@@ -16,23 +22,12 @@ def normalize_code(code: str) -> str:
     return re.sub(r'\s+', '', code.strip().upper())
 
 
-# İngilizce ders olarak sayılan ek kodlar (sonu E ile bitmeyen ama İngilizce olan dersler)
-EXTRA_ENGLISH_CODES = {'MTH101', 'MTH102', 'MEC321', 'MEC325'}
-
-
-def is_english_course(ders_kodu: str) -> bool:
+def is_english_course(ders_kodu: str, rules: DepartmentRules = None) -> bool:
     """Dersin İngilizce olup olmadığını belirler.
-    Kural: Ders kodu 'E' harfi ile bitiyorsa VEYA özel listede yer alıyorsa İngilizce.
+    Kural: Ders kodu 'E' harfi ile bitiyorsa VEYA bölüm kurallarındaki özel
+    listede / İngilizce öneklerde yer alıyorsa İngilizce.
     """
-    code = normalize_code(ders_kodu)
-    if code in EXTRA_ENGLISH_CODES:
-        return True
-    if code.startswith('MEC') or code.startswith('MTH'):
-        return True
-    # Kodun son karakteri 'E' ve ondan önceki karakter rakam ise (ör: MMB312E)
-    if len(code) >= 4 and code[-1] == 'E' and code[-2].isdigit():
-        return True
-    return False
+    return (rules or default_rules()).is_english(normalize_code(ders_kodu))
 
 
 def is_elective_slot(ders_kodu: str) -> bool:
@@ -43,94 +38,121 @@ def is_elective_slot(ders_kodu: str) -> bool:
     return ('XX' in code) or ('UNI-SEC' in code)
 
 
-def get_elective_category(ders_kodu: str, ders_adi: str = "") -> str:
-    """Seçmeli ders kodunun kategorisini belirler.
-    Döndürdükleri: 'mekanik_tasarim', 'isil_tasarim', 'bolum_mekanik',
+def get_elective_category(ders_kodu: str, ders_adi: str = "", rules: DepartmentRules = None) -> str:
+    """Seçmeli ders slotunun kategorisini bölüm kurallarına (bolum.json) göre belirler.
+    Makine için: 'mekanik_tasarim', 'isil_tasarim', 'tasarim_secmeli', 'bolum_mekanik',
     'bolum_termo', 'bolum_konstruksiyon', 'universite', 'bilinmiyor'
     """
-    code = normalize_code(ders_kodu)
-    
-    # 2025 müfredatı: 35xx (Isıl), 36xx (Mekanik), 45xx, 46xx, 47xx
-    if re.match(r'(MMB|MED)35', code):
-        return 'isil_tasarim'
-    if re.match(r'(MMB|MED)36', code):
-        return 'mekanik_tasarim'
-    if re.match(r'(MMB|MED)45', code):
-        return 'bolum_mekanik'
-    if re.match(r'(MMB|MED)46', code):
-        return 'bolum_termo'
-    if re.match(r'(MMB|MED)47', code):
-        return 'bolum_konstruksiyon'
-
-    # 2022/2024 müfredatı: 30xx, 41xx, 42xx, 43xx
-    if re.match(r'(MMB|MAK|MEC)30', code):
-        name_lower = ders_adi.lower()
-        if 'ısıl' in name_lower or 'isil' in name_lower or 'isıl' in name_lower:
-            return 'isil_tasarim'
-        elif 'mekanik' in name_lower:
-            return 'mekanik_tasarim'
-        return 'tasarim_secmeli'  # Hem mekanik hem ısıl olabilir
-
-    if re.match(r'(MMB|MAK|MEC)41', code):
-        return 'bolum_mekanik'
-    if re.match(r'(MMB|MAK|MEC)42', code):
-        return 'bolum_termo'
-    if re.match(r'(MMB|MAK|MEC)43', code):
-        return 'bolum_konstruksiyon'
-    if 'UNI' in code or 'SEC' in code:
-        return 'universite'
-    
-    return 'bilinmiyor'
+    return (rules or default_rules()).slot_category(normalize_code(ders_kodu), ders_adi)
 
 
-def classify_transcript_elective(ders_kodu: str) -> str:
+def classify_transcript_elective(ders_kodu: str, rules: DepartmentRules = None) -> str:
     """Transkriptteki dersin hangi seçmeli kategorisine ait olduğunu belirler.
-    Ders koduna bakarak seçmeli türünü tespit eder.
+    Ders koduna bakarak bölüm kurallarına göre seçmeli türünü tespit eder;
+    bölüm dışı kodlar alan dışı ('universite') seçmeli sayılır.
     """
-    code = normalize_code(ders_kodu)
-    
-    # 2025 format: 35xx/36xx serisi (5-6. YY), 45xx/46xx/47xx serisi (7-8. YY)
-    if re.match(r'(MMB|MED)35\d{2}', code):
-        return 'isil_tasarim'
-    if re.match(r'(MMB|MED)36\d{2}', code):
-        return 'mekanik_tasarim'
-    if re.match(r'(MMB|MED)45\d{2}', code):
-        return 'bolum_mekanik'
-    if re.match(r'(MMB|MED)46\d{2}', code):
-        return 'bolum_termo'
-    if re.match(r'(MMB|MED)47\d{2}', code):
-        return 'bolum_konstruksiyon'
-
-    # 2022/2024 format: 30xx serisi (5-6. YY), 41xx/42xx/43xx serisi (7-8. YY)
-    match_30xx = re.match(r'(MMB|MAK|MEC)30(\d{2})[A-Za-z]?', code)
-    if match_30xx:
-        num = int(match_30xx.group(2))
-        return 'isil_tasarim' if num % 2 == 1 else 'mekanik_tasarim'
-    if re.match(r'(MMB|MAK|MEC)41\d{2}', code):
-        return 'bolum_mekanik'
-    if re.match(r'(MMB|MAK|MEC)42\d{2}', code):
-        return 'bolum_termo'
-    if re.match(r'(MMB|MAK|MEC)43\d{2}', code):
-        return 'bolum_konstruksiyon'
-    
-    # Alan dışı seçmeli: Farklı bölüm kodları (CEK, MAD, vb.)
-    # Not: MMB, MAK gibi temel kodlar veya ZTD, ZAI, MK (Hazırlık) gibi ortak dersler Alan Dışı Seçmeli değildir.
-    if not re.match(r'(MMB|MAK|MEC|MED|MTH|MAT|FİZ|KİM|BİL|ZTD|ZAI|MUH|HZD|MK)', code):
-        return 'universite'
-    
-    return 'bilinmiyor'
+    return (rules or default_rules()).course_category(normalize_code(ders_kodu))
 
 
-def match_courses(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame) -> list:
+class CourseResult(MutableMapping):
+    """Tek bir müfredat satırının eşleştirme sonucu.
+
+    Her satır için 16 anahtarlı bir dict yerine __slots__ kullanan kompakt bir
+    kayıttır; dict arayüzünü (r['Durum'], r.get(...), r.pop(...), dict(r))
+    aynen destekler. Ayarlanmamış alanlar anahtar olarak görünmez.
     """
-    Müfredat ile transkriptteki dersleri eşleştirir.
 
-    Eşleştirme stratejisi (Çok Geçişli Algoritma):
-    Pass 0: Seçmeli dersleri kategorize et.
-    Pass 1: Seçmeli dersleri müfredat slotlarıyla eşleştir.
-    Pass 2: Kalan dersleri EXACT ders kodlarına (MAK/MMB varyasyonları dahil) göre eşleştir.
-    Pass 3: Hala eşleşmeyenleri ders adına göre FUZZY match (Bulanık Eşleştirme) ile eşleştir.
+    FIELDS = (
+        'Donem', 'Mufredat_Kodu', 'Mufredat_Adi', 'Mufredat_AKTS', 'Tur',
+        'Transkript_Kodu', 'Transkript_Adi', 'Transkript_Notu', 'Transkript_AKTS',
+        'Eslesme_Skoru', 'Durum', 'Basarisiz', 'Ikon', 'Ingilizce', '_matched', '_tr_idx',
+    )
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        for key, value in values.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        # Ders kodları tüm oturumlarda aynı küçük kümeden gelir; tek kopya tut
+        if key in ('Mufredat_Kodu', 'Transkript_Kodu') and isinstance(value, str):
+            value = sys.intern(str(value))
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return (key for key in self.FIELDS if hasattr(self, key))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        """Sığ kopya (dict.copy() karşılığı)."""
+        new = CourseResult.__new__(CourseResult)
+        for key in self:
+            setattr(new, key, getattr(self, key))
+        return new
+
+    def __repr__(self):
+        return f'CourseResult({dict(self)!r})'
+
+
+# Bulanık eşleştirme eşikleri: skor >= eşik ise kesin eşleşme, SUSPECT_FLOOR ile
+# eşik arası 'Şüpheli Eşleşme', altı eşleşmemiş sayılır.
+DEFAULT_THRESHOLD = 85
+SUSPECT_FLOOR = 65
+
+
+class MatchState:
+    """match_courses'ın eşikten bağımsız ara durumu.
+
+    PASS 1 ve PASS 2 sonuçlarını ve PASS 3 için (müfredat satırı x kalan
+    transkript dersi) bulanık skor matrisini tutar. Eşik değiştiğinde yalnızca
+    classify_matches() yeniden çalıştırılır; PDF ayrıştırma ve skorlama tekrarlanmaz.
     """
+
+    __slots__ = ('base_results', 'fuzzy_rows', 'candidate_indices', 'candidate_rows', 'scores', 'rules')
+
+    def __init__(self, base_results, fuzzy_rows, candidate_indices, candidate_rows, scores, rules=None):
+        self.base_results = base_results            # PASS 1-2 sonrası CourseResult listesi
+        self.fuzzy_rows = fuzzy_rows                # PASS 3'e kalan sonuç satırlarının sırası
+        self.candidate_indices = candidate_indices  # PASS 3 adayı transkript satır indeksleri
+        self.candidate_rows = candidate_rows        # Aday transkript satırları (pd.Series)
+        self.scores = scores                        # float skor matrisi (fuzzy_rows x adaylar)
+        self.rules = rules                          # Bölüm kuralları (curricula.DepartmentRules)
+
+
+def compute_match_state(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame,
+                        akts_tolerance: float = None, equivalences=None,
+                        rules: DepartmentRules = None) -> MatchState:
+    """PASS 1-2'yi çalıştırır ve PASS 3 skor matrisini bir kez hesaplar.
+
+    Skorlar, name_index ile Türkçe kurallarına göre normalize edilmiş adlar
+    üzerinde fuzz.token_sort_ratio ölçütüyle, yuvarlanmamış olarak tutulur.
+    Ders sıra numarası çelişen (veya akts_tolerance verilmişse AKTS farkı bu
+    değeri aşan) çiftlerin skoru 0'dır.
+
+    equivalences verilirse (equivalences.Equivalences), onaylı çiftler PASS 3'ten
+    önce sözlük aramasıyla eşlenir; reddedilmiş çiftler PASS 2'de (E eki ve önek
+    varyasyonları) atlanır, PASS 3'te skorları 0 olur.
+
+    rules, müfredatın bölüm kurallarıdır (curricula); verilmezse varsayılan
+    bölümün (makine) kuralları kullanılır.
+    """
+    rules = rules or default_rules()
     results = []
     
     transkript_df = transkript_df.reset_index(drop=True)
@@ -139,7 +161,7 @@ def match_courses(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame) -> lis
 
     elective_pool = {}
     for idx, row in transkript_df.iterrows():
-        cat = classify_transcript_elective(row['Ders_Kodu'])
+        cat = classify_transcript_elective(row['Ders_Kodu'], rules)
         if cat != 'bilinmiyor':
             if cat not in elective_pool:
                 elective_pool[cat] = []
@@ -153,39 +175,31 @@ def match_courses(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame) -> lis
         muf_tur = muf_row['Tur']
         muf_donem = muf_row['Donem']
         
-        results.append({
-            'Donem': muf_donem,
-            'Mufredat_Kodu': muf_code,
-            'Mufredat_Adi': muf_name,
-            'Mufredat_AKTS': muf_akts,
-            'Tur': muf_tur,
-            'Transkript_Kodu': '',
-            'Transkript_Adi': '',
-            'Transkript_Notu': '',
-            'Transkript_AKTS': 0,
-            'Eslesme_Skoru': 0,
-            'Durum': 'Eksik',
-            'Basarisiz': False,
-            'Ikon': '❌',
-            'Ingilizce': is_english_course(muf_code),
-            '_matched': False, # temporary flag
-            '_tr_idx': None
-        })
+        results.append(CourseResult(
+            Donem=muf_donem,
+            Mufredat_Kodu=muf_code,
+            Mufredat_Adi=muf_name,
+            Mufredat_AKTS=muf_akts,
+            Tur=muf_tur,
+            Transkript_Kodu='',
+            Transkript_Adi='',
+            Transkript_Notu='',
+            Transkript_AKTS=0,
+            Eslesme_Skoru=0,
+            Durum='Eksik',
+            Basarisiz=False,
+            Ikon='❌',
+            Ingilizce=is_english_course(muf_code, rules),
+            _matched=False,  # temporary flag
+            _tr_idx=None
+        ))
 
     # PASS 1: SEÇMELİ DERS EŞLEŞTİRME
     for result in results:
         muf_code = result['Mufredat_Kodu']
         if is_elective_slot(muf_code):
-            cat = get_elective_category(muf_code, result['Mufredat_Adi'])
-            search_cats = [cat]
-            if cat == 'tasarim_secmeli':
-                search_cats = ['tasarim_secmeli', 'mekanik_tasarim', 'isil_tasarim']
-            elif cat == 'mekanik_tasarim':
-                search_cats = ['mekanik_tasarim', 'tasarim_secmeli']
-            elif cat == 'isil_tasarim':
-                search_cats = ['isil_tasarim', 'tasarim_secmeli']
-
-            for search_cat in search_cats:
+            cat = get_elective_category(muf_code, result['Mufredat_Adi'], rules)
+            for search_cat in rules.search_categories(cat):
                 if search_cat in elective_pool:
                     best_tr_idx = None
                     # 8. Yarıyıl slotları için öncelikle "Devam Ediyor" olanları tercih et (kullanıcı beklentisi)
@@ -226,7 +240,7 @@ def match_courses(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame) -> lis
 
                         used_transcript_indices.add(best_tr_idx)
                         elective_pool[search_cat].remove(best_tr_idx)
-                        if is_english_course(tr_row['Ders_Kodu']):
+                        if is_english_course(tr_row['Ders_Kodu'], rules):
                             result['Ingilizce'] = True
                         break
                 if result['_matched']:
@@ -246,19 +260,14 @@ def match_courses(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame) -> lis
         else:
             candidate_codes.append(norm_muf_code + 'E')
             
-        temp_codes = candidate_codes.copy()
-        for cand in temp_codes:
-            if cand.startswith('MMB'):
-                candidate_codes.append(cand.replace('MMB', 'MAK'))
-                candidate_codes.append(cand.replace('MMB', 'MEC'))
-            elif cand.startswith('MAK'):
-                candidate_codes.append(cand.replace('MAK', 'MMB'))
-                candidate_codes.append(cand.replace('MAK', 'MEC'))
-            elif cand.startswith('MEC'):
-                candidate_codes.append(cand.replace('MEC', 'MMB'))
-                candidate_codes.append(cand.replace('MEC', 'MAK'))
+        # Bölümün eşdeğer önekleri (makine: MMB/MAK/MEC)
+        for cand in candidate_codes.copy():
+            candidate_codes.extend(rules.prefix_variants(cand))
             
         for cand in candidate_codes:
+            # Geri bildirimle reddedilen varyasyon eşlemeleri (örn. MMB <-> MAK) kullanılmaz
+            if equivalences and equivalences.rejected and equivalences.is_rejected(muf_code, cand):
+                continue
             if cand in tr_codes:
                 tr_idx = tr_codes[cand]
                 if tr_idx not in used_transcript_indices:
@@ -272,7 +281,7 @@ def match_courses(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame) -> lis
                     result['_matched'] = True
                     result['_tr_idx'] = tr_idx
                     
-                    if is_english_course(tr_row['Ders_Kodu']):
+                    if is_english_course(tr_row['Ders_Kodu'], rules):
                         result['Ingilizce'] = True
                     
                     if tr_row['Harf_Notu'] == 'Devam Ediyor':
@@ -288,55 +297,125 @@ def match_courses(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame) -> lis
                     used_transcript_indices.add(tr_idx)
                     break
 
-    # PASS 3: FUZZY NAME MATCHING FOR REMAINING
-    for result in results:
-        if result['_matched'] or is_elective_slot(result['Mufredat_Kodu']):
-            continue
-            
-        muf_name = result['Mufredat_Adi']
-        available_indices = [i for i in range(len(transkript_df)) if i not in used_transcript_indices]
-        
-        if available_indices:
-            available_names = [transkript_df.iloc[i]['Ders_Adi'] for i in available_indices]
-            choices_dict = {i: name for i, name in enumerate(available_names)}
-            
-            best_match = process.extractOne(muf_name, choices_dict, scorer=fuzz.token_sort_ratio)
-            
-            if best_match:
-                match_name = best_match[0]
-                score = best_match[1]
-                match_idx_in_list = best_match[2] if len(best_match) > 2 else available_names.index(match_name)
-                actual_idx = available_indices[match_idx_in_list]
-                tr_row = transkript_df.iloc[actual_idx]
-                
-                if score >= 65:
-                    result['Transkript_Kodu'] = tr_row['Ders_Kodu']
-                    result['Transkript_Adi'] = tr_row['Ders_Adi']
-                    result['Transkript_Notu'] = tr_row['Harf_Notu']
-                    result['Transkript_AKTS'] = tr_row['AKTS']
-                    result['Basarisiz'] = tr_row['Basarisiz']
-                    result['Eslesme_Skoru'] = score
-                    result['_matched'] = True
-                    result['_tr_idx'] = actual_idx
-                    
-                    if is_english_course(tr_row['Ders_Kodu']):
-                        result['Ingilizce'] = True
-                    
-                    if score >= 85:
-                        if tr_row['Harf_Notu'] == 'Devam Ediyor':
-                            result['Durum'] = 'Devam Ediyor'
-                            result['Ikon'] = '🔵'
-                        elif tr_row['Basarisiz']:
-                            result['Durum'] = 'Başarısız'
-                            result['Ikon'] = '❌'
-                        else:
-                            result['Durum'] = 'Başarılı'
-                            result['Ikon'] = '✅'
-                    else:
-                        result['Durum'] = 'Şüpheli Eşleşme'
-                        result['Ikon'] = '⚠️'
-                        
-                    used_transcript_indices.add(actual_idx)
+    # PASS 2.5: ÖĞRENİLMİŞ EŞDEĞERLİKLER (onaylı çiftler; kod, yoksa normalize ad ile)
+    if equivalences and equivalences.codes:
+        tr_names = {}
+        for i, name in enumerate(transkript_df['Ders_Adi']):
+            tr_names.setdefault(normalize_name(name), i)
+
+        for result in results:
+            if result['_matched'] or is_elective_slot(result['Mufredat_Kodu']):
+                continue
+            accepted = [tr_codes.get(code) for code in sorted(equivalences.accepted_codes(result['Mufredat_Kodu']))]
+            accepted += [tr_names.get(name) for name in sorted(equivalences.accepted_names(result['Mufredat_Kodu']))]
+            tr_idx = next((i for i in accepted if i is not None and i not in used_transcript_indices), None)
+            if tr_idx is None:
+                continue
+
+            tr_row = transkript_df.loc[tr_idx]
+            result['Transkript_Kodu'] = tr_row['Ders_Kodu']
+            result['Transkript_Adi'] = tr_row['Ders_Adi']
+            result['Transkript_Notu'] = tr_row['Harf_Notu']
+            result['Transkript_AKTS'] = tr_row['AKTS']
+            result['Basarisiz'] = tr_row['Basarisiz']
+            result['Eslesme_Skoru'] = 100
+            result['_matched'] = True
+            result['_tr_idx'] = tr_idx
+
+            if is_english_course(tr_row['Ders_Kodu'], rules):
+                result['Ingilizce'] = True
+
+            if tr_row['Harf_Notu'] == 'Devam Ediyor':
+                result['Durum'] = 'Devam Ediyor'
+                result['Ikon'] = '🔵'
+            elif tr_row['Basarisiz']:
+                result['Durum'] = 'Başarısız'
+                result['Ikon'] = '❌'
+            else:
+                result['Durum'] = 'Başarılı'
+                result['Ikon'] = '✅'
+
+            used_transcript_indices.add(tr_idx)
+
+    # PASS 3 HAZIRLIĞI: eşikten bağımsız bulanık skor matrisi
+    fuzzy_rows = [
+        i for i, r in enumerate(results)
+        if not r['_matched'] and not is_elective_slot(r['Mufredat_Kodu'])
+    ]
+    candidate_indices = [i for i in range(len(transkript_df)) if i not in used_transcript_indices]
+    candidate_rows = [transkript_df.iloc[i] for i in candidate_indices]
+
+    scores = None
+    if fuzzy_rows and candidate_indices:
+        index = NameIndex([row['Ders_Adi'] for row in candidate_rows], [row['AKTS'] for row in candidate_rows])
+        scores = index.score_matrix(
+            [results[i]['Mufredat_Adi'] for i in fuzzy_rows],
+            [results[i]['Mufredat_AKTS'] for i in fuzzy_rows],
+            akts_tolerance,
+        )
+        # Geri bildirimle reddedilen çiftler bulanık eşleştirmeyle de eşlenmez
+        if equivalences and equivalences.rejected:
+            for row_pos, result_idx in enumerate(fuzzy_rows):
+                for col, tr_row in enumerate(candidate_rows):
+                    if equivalences.is_rejected(results[result_idx]['Mufredat_Kodu'], tr_row['Ders_Kodu']):
+                        scores[row_pos, col] = 0.0
+
+    return MatchState(results, fuzzy_rows, candidate_indices, candidate_rows, scores, rules)
+
+
+def classify_matches(state: MatchState, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Önceden hesaplanmış skorlar üzerinden PASS 3'ü verilen eşikle uygular.
+
+    Skor >= threshold: kesin eşleşme (Başarılı / Başarısız / Devam Ediyor)
+    min(SUSPECT_FLOOR, threshold) <= skor < threshold: 'Şüpheli Eşleşme'
+    Daha düşük skorlar eşleşmemiş kalır.
+    """
+    results = [r.copy() for r in state.base_results]
+    floor = min(SUSPECT_FLOOR, threshold)
+
+    if state.scores is not None:
+        available = np.ones(len(state.candidate_indices), dtype=bool)
+        for row_pos, result_idx in enumerate(state.fuzzy_rows):
+            if not available.any():
+                break
+            result = results[result_idx]
+
+            # extractOne gibi: en yüksek skor, eşitlikte listedeki ilk aday
+            row_scores = np.where(available, state.scores[row_pos], -1.0)
+            best_pos = int(np.argmax(row_scores))
+            score = int(round(float(row_scores[best_pos])))
+            if score < floor:
+                continue
+
+            actual_idx = state.candidate_indices[best_pos]
+            tr_row = state.candidate_rows[best_pos]
+            result['Transkript_Kodu'] = tr_row['Ders_Kodu']
+            result['Transkript_Adi'] = tr_row['Ders_Adi']
+            result['Transkript_Notu'] = tr_row['Harf_Notu']
+            result['Transkript_AKTS'] = tr_row['AKTS']
+            result['Basarisiz'] = tr_row['Basarisiz']
+            result['Eslesme_Skoru'] = score
+            result['_matched'] = True
+            result['_tr_idx'] = actual_idx
+
+            if is_english_course(tr_row['Ders_Kodu'], state.rules):
+                result['Ingilizce'] = True
+
+            if score >= threshold:
+                if tr_row['Harf_Notu'] == 'Devam Ediyor':
+                    result['Durum'] = 'Devam Ediyor'
+                    result['Ikon'] = '🔵'
+                elif tr_row['Basarisiz']:
+                    result['Durum'] = 'Başarısız'
+                    result['Ikon'] = '❌'
+                else:
+                    result['Durum'] = 'Başarılı'
+                    result['Ikon'] = '✅'
+            else:
+                result['Durum'] = 'Şüpheli Eşleşme'
+                result['Ikon'] = '⚠️'
+
+            available[best_pos] = False
 
     # Clean up temporary flag
     for r in results:
@@ -345,13 +424,82 @@ def match_courses(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame) -> lis
     return results
 
 
-def generate_summary(results: list, transkript_df: pd.DataFrame, parsed_agno: float = 0.0) -> dict:
+def match_courses(mufredat_df: pd.DataFrame, transkript_df: pd.DataFrame,
+                  threshold: float = DEFAULT_THRESHOLD, equivalences=None,
+                  rules: DepartmentRules = None) -> list:
+    """
+    Müfredat ile transkriptteki dersleri eşleştirir.
+
+    Eşleştirme stratejisi (Çok Geçişli Algoritma):
+    Pass 0: Seçmeli dersleri kategorize et.
+    Pass 1: Seçmeli dersleri müfredat slotlarıyla eşleştir.
+    Pass 2: Kalan dersleri EXACT ders kodlarına (bölümün eşdeğer önekleri, örn. MAK/MMB dahil) göre eşleştir.
+    Pass 2.5: Eşdeğerlik tablosundaki onaylı çiftleri sözlük aramasıyla eşleştir.
+    Pass 3: Hala eşleşmeyenleri ders adına göre FUZZY match (Bulanık Eşleştirme) ile eşleştir.
+            Adlar Türkçe kurallarıyla normalize edilir ve tüm çiftler tek
+            cdist çağrısıyla skorlanır (bkz. name_index).
+
+    Eşik değiştikçe yeniden hesaplamamak için compute_match_state() sonucu
+    saklanıp classify_matches() doğrudan çağrılabilir.
+
+    Parameters:
+        threshold: Bulanık eşleşmenin kesin sayılacağı en düşük skor (varsayılan 85)
+        equivalences: Eşdeğerlik tablosu anlık görüntüsü (equivalences.get_table().snapshot())
+        rules: Müfredatın bölüm kuralları (curricula.Curriculum.rules; varsayılan: makine)
+
+    Returns:
+        list of CourseResult: Her müfredat satırı için dict gibi davranan sonuç kaydı
+    """
+    return classify_matches(compute_match_state(mufredat_df, transkript_df, equivalences=equivalences, rules=rules), threshold)
+
+
+# Harf notu -> katsayı (BL: AGNO'ya katılmayan başarılı not)
+GRADE_POINTS = {
+    'AA': 4.0, 'BA': 3.5, 'BB': 3.0, 'CB': 2.5, 'CC': 2.0,
+    'DC': 1.5, 'DD': 1.5, 'FD': 1.0, 'FF': 0.0, 'BL': None, 'DZ': 0.0
+}
+FAILING_GRADES = ('FF', 'FD', 'DZ')
+ENGLISH_RATIO_MIN = 30
+
+
+def graduation_status(eksik: int, basarisiz: int, supheli: int, devam_eden: int, ingilizce_oran: float) -> str:
+    """Ders sayıları ve İngilizce oranından mezuniyet durumu metnini üretir."""
+    if eksik == 0 and basarisiz == 0 and devam_eden == 0 and supheli == 0:
+        mezuniyet = "✅ Mezuniyet Koşulları Sağlanıyor"
+    elif devam_eden > 0 and eksik == 0 and basarisiz == 0:
+        mezuniyet = "🔵 Dersler Devam Ediyor"
+    else:
+        mezuniyet = f"❌ Mezuniyet Koşulları Sağlanmıyor ({eksik} eksik, {basarisiz} başarısız)"
+
+    # Mezuniyet durumuna İngilizce kontrolü ekle
+    if ingilizce_oran < ENGLISH_RATIO_MIN and 'Sağlanıyor' in mezuniyet:
+        mezuniyet = f"❌ İngilizce Ders Oranı Yetersiz (%{ingilizce_oran} < %{ENGLISH_RATIO_MIN})"
+    return mezuniyet
+
+
+def transcript_agno(transkript_df: pd.DataFrame) -> float:
+    """Transkript satırlarından (her dersin son denemesi) AKTS ağırlıklı AGNO."""
+    points = transkript_df['Harf_Notu'].astype(object).map(GRADE_POINTS).to_numpy(dtype=float, na_value=np.nan)
+    graded = ~np.isnan(points)
+    akts = transkript_df['AKTS'].to_numpy(dtype=float)[graded]
+    toplam_akts = akts.sum()
+    return round(float((points[graded] * akts).sum() / toplam_akts), 2) if toplam_akts > 0 else 0.0
+
+
+def generate_summary(results: list, transkript_df: pd.DataFrame, parsed_agno: float = 0.0,
+                     attempts=None) -> dict:
     """
     Eşleştirme sonuçlarından özet istatistikleri üretir.
 
+    Parameters:
+        attempts: Tekrarlar dahil ders denemeleri (attempts.AttemptLog); verilirse
+                  AGNO denemelerden hesaplanır, PDF'teki AGNO doğrulanır ve
+                  dönem ortalamaları özete eklenir
+
     Returns:
         dict: toplam_akts, basarili_akts, eksik_ders_sayisi, basarisiz_ders_sayisi,
               supheli_sayisi, devam_eden_sayisi, mezuniyet_durumu
+              (+ attempts ile: agno_dogrulama, donem_ortalamalari)
     """
     toplam_mufredat_akts = sum(r['Mufredat_AKTS'] for r in results)
     basarili_akts = sum(
@@ -366,30 +514,11 @@ def generate_summary(results: list, transkript_df: pd.DataFrame, parsed_agno: fl
 
     if parsed_agno > 0:
         agno = parsed_agno
+    elif attempts is not None:
+        # Tekrar alınan dersin önceki notu, yeni denemesi notlanana kadar sayılır
+        agno = attempts.agno()
     else:
-        # AGNO hesaplama (transkriptten)
-        katsayi_map = {
-            'AA': 4.0, 'BA': 3.5, 'BB': 3.0, 'CB': 2.5, 'CC': 2.0,
-            'DC': 1.5, 'DD': 1.5, 'FD': 1.0, 'FF': 0.0, 'BL': None, 'DZ': 0.0
-        }
-        
-        toplam_puan = 0
-        toplam_akts_hesap = 0
-        for _, row in transkript_df.iterrows():
-            notu = row['Harf_Notu']
-            if notu in katsayi_map and katsayi_map[notu] is not None:
-                toplam_puan += katsayi_map[notu] * row['AKTS']
-                toplam_akts_hesap += row['AKTS']
-        
-        agno = round(toplam_puan / toplam_akts_hesap, 2) if toplam_akts_hesap > 0 else 0.0
-
-    # Mezuniyet durumu
-    if eksik == 0 and basarisiz == 0 and devam_eden == 0 and supheli == 0:
-        mezuniyet = "✅ Mezuniyet Koşulları Sağlanıyor"
-    elif devam_eden > 0 and eksik == 0 and basarisiz == 0:
-        mezuniyet = "🔵 Dersler Devam Ediyor"
-    else:
-        mezuniyet = f"❌ Mezuniyet Koşulları Sağlanmıyor ({eksik} eksik, {basarisiz} başarısız)"
+        agno = transcript_agno(transkript_df)
 
     # İngilizce ders AKTS hesaplama (başarılı + devam eden)
     ingilizce_basarili_akts = sum(
@@ -411,11 +540,8 @@ def generate_summary(results: list, transkript_df: pd.DataFrame, parsed_agno: fl
     ingilizce_oran = round(
         (ingilizce_toplam_akts / toplam_aktif_akts * 100) if toplam_aktif_akts > 0 else 0, 1
     )
-    ingilizce_yeterli = ingilizce_oran >= 30
-
-    # Mezuniyet durumuna İngilizce kontrolü ekle
-    if not ingilizce_yeterli and 'Sağlanıyor' in mezuniyet:
-        mezuniyet = f"❌ İngilizce Ders Oranı Yetersiz (%{ingilizce_oran} < %30)"
+    ingilizce_yeterli = ingilizce_oran >= ENGLISH_RATIO_MIN
+    mezuniyet = graduation_status(eksik, basarisiz, supheli, devam_eden, ingilizce_oran)
 
     # Fazladan (Müfredat Dışı) alınan dersler
     kullanilan_idx_seti = set(r['_tr_idx'] for r in results if r.get('_tr_idx') is not None)
@@ -431,7 +557,7 @@ def generate_summary(results: list, transkript_df: pd.DataFrame, parsed_agno: fl
                 'Harf_Notu': row['Harf_Notu']
             })
 
-    return {
+    summary = {
         'toplam_mufredat_akts': toplam_mufredat_akts,
         'basarili_akts': basarili_akts,
         'eksik_ders_sayisi': eksik,
@@ -451,3 +577,9 @@ def generate_summary(results: list, transkript_df: pd.DataFrame, parsed_agno: fl
         'ingilizce_oran': ingilizce_oran,
         'ingilizce_yeterli': ingilizce_yeterli,
     }
+    if attempts is not None:
+        summary['agno_dogrulama'] = attempts.verify_agno(parsed_agno)
+        # Notlandırılmış dersi olmayan dönemin ANO'su yok (None)
+        gpa = attempts.term_gpa().astype(object)
+        summary['donem_ortalamalari'] = gpa.where(gpa.notna(), None).to_dict(orient='records')
+    return summary
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Bellek Muhasebesi Modülü
+========================
+Bir Streamlit oturumunun tuttuğu nesnelerin (yüklenen dosya, transkript
+DataFrame'i, eşleştirme sonuçları, özet, rapor baytları vb.) yaklaşık bellek
+kullanımını nesne ve tür bazında raporlar.
+
+Boyutlar "derin"dir: kapsayıcıların içindeki nesneler de sayılır, aynı nesne
+bir ölçümde yalnızca bir kez sayılır. Oturumlar arasında paylaşılan nesneler
+(önbellekteki müfredat, intern edilmiş ders kodları) her oturumda ayrıca
+görünür; bu yüzden toplam, paylaşımlı belleği olduğundan fazla gösterebilir.
+"""
+
+import io
+import sys
+from collections.abc import Mapping
+
+import pandas as pd
+
+
+def type_label(obj) -> str:
+    """Nesne için okunabilir bir tür etiketi üretir. Örn: 'list[CourseResult]'"""
+    name = type(obj).__name__
+    if isinstance(obj, (list, tuple)) and obj:
+        return f'{name}[{type(obj[0]).__name__}]'
+    return name
+
+
+def deep_sizeof(obj, seen: set = None) -> int:
+    """Nesnenin ve içerdiği nesnelerin toplam boyutunu (bayt) hesaplar."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True, index=True))
+
+    size = sys.getsizeof(obj)
+    if obj is None or isinstance(obj, (str, bytes, bytearray, int, float, bool, complex)):
+        return size
+    if isinstance(obj, io.BytesIO):
+        with obj.getbuffer() as buffer:
+            return size + buffer.nbytes
+
+    if isinstance(obj, Mapping):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+
+    # __slots__ ile tanımlı alanlar (Mapping ise zaten sayıldı)
+    if not isinstance(obj, Mapping):
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(obj, slot):
+                    size += deep_sizeof(getattr(obj, slot), seen)
+    if hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def account_session(objects: dict) -> pd.DataFrame:
+    """Oturum nesnelerinin bellek dökümünü çıkarır.
+
+    Parameters:
+        objects: {'Nesne adı': nesne} sözlüğü
+
+    Returns:
+        pd.DataFrame: Nesne, Tur, Bayt, KB sütunları (büyükten küçüğe)
+    """
+    seen = set()
+    rows = []
+    for name, obj in objects.items():
+        if obj is None:
+            continue
+        size = deep_sizeof(obj, seen)
+        rows.append({'Nesne': name, 'Tur': type_label(obj), 'Bayt': size})
+
+    df = pd.DataFrame(rows, columns=['Nesne', 'Tur', 'Bayt'])
+    df['KB'] = (df['Bayt'] / 1024).round(1)
+    return df.sort_values('Bayt', ascending=False).reset_index(drop=True)
+
+
+def summarize_by_type(accounting_df: pd.DataFrame) -> pd.DataFrame:
+    """account_session() çıktısını tür bazında toplar."""
+    grouped = accounting_df.groupby('Tur', as_index=False)['Bayt'].sum()
+    grouped['KB'] = (grouped['Bayt'] / 1024).round(1)
+    return grouped.sort_values('Bayt', ascending=False).reset_index(drop=True)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Ders Adı İndeksi Modülü
+=======================
+Bulanık eşleştirme (PASS 3) için ders adlarını normalize eder ve tüm
+(müfredat x transkript) çiftlerini tek bir rapidfuzz cdist çağrısıyla skorlar.
+
+Normalizasyon:
+    - Türkçe büyük/küçük harf dönüşümü (I -> ı, İ -> i), ardından ASCII'ye
+      katlama (ç, ğ, ı, ö, ş, ü -> c, g, i, o, s, u)
+    - Noktalama boşluğa çevrilir; İngilizce bağlaçlar Türkçe karşılıklarına
+      çevrilir ('and' -> 've'), yalnızca 'of', 'the' gibi İngilizce dolgu
+      kelimeleri atılır. Türkçe 've', 'ile', 'için' skorlamada kalır; atılırsa
+      kısaltılmış adların ('Bilg. ve Programlama') skoru eşiğin altına düşer
+    - Romen rakamları ve sayılar tek biçime getirilir ('Mukavemet II' ve
+      'Mukavemet-2' -> 'mukavemet 2')
+    - Yaygın İngilizce ders adı kelimeleri Türkçe karşılıklarına çevrilir
+      ('Technical Drawing' -> 'teknik cizim')
+    - Kelimeler sıralanır; böylece fuzz.token_sort_ratio yerine doğrudan
+      fuzz.ratio kullanılabilir
+
+Eleme: Ders sıra numarası çelişen (Matematik-I / Matematik-II) veya istenirse
+AKTS'si çok farklı olan çiftlerin skoru 0'dır. Adaylar skorlamadan önce
+elenmez: bir trigram ters indeksiyle ön eleme, ölçülen her boyutta (60x60'tan
+4000x4000'e) tüm çiftleri cdist ile skorlamaktan 5-10 kat yavaştı.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+from rapidfuzz import fuzz as rfuzz, process as rprocess
+
+TURKISH_CASE = str.maketrans({'I': 'ı', 'İ': 'i'})
+ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+ROMAN_NUMERALS = {'i': '1', 'ii': '2', 'iii': '3', 'iv': '4', 'v': '5', 'vi': '6', 'vii': '7', 'viii': '8'}
+
+STOPWORDS = frozenset({'of', 'in', 'to', 'the', 'a', 'an'})
+
+# İngilizce ders adı kelimesi -> müfredatlarda kullanılan Türkçe karşılığı (ASCII)
+NAME_SYNONYMS = {
+    'and': 've', 'with': 'ile', 'for': 'icin',
+    'calculus': 'matematik', 'mathematics': 'matematik', 'math': 'matematik',
+    'physics': 'fizik', 'chemistry': 'kimya', 'general': 'genel',
+    'technical': 'teknik', 'drawing': 'cizim', 'computer': 'bilgisayar', 'aided': 'destekli',
+    'programming': 'programlama', 'linear': 'lineer', 'algebra': 'cebir',
+    'differential': 'diferansiyel', 'equations': 'denklemler', 'statistics': 'istatistik',
+    'engineering': 'muhendislik', 'engineer': 'muhendislik', 'introduction': 'giris',
+    'statics': 'statik', 'dynamics': 'dinamik', 'thermodynamics': 'termodinamik',
+    'fluid': 'akiskanlar', 'mechanics': 'mekanigi', 'heat': 'isi', 'transfer': 'transferi',
+    'materials': 'malzeme', 'material': 'malzeme', 'science': 'bilimi',
+    'machine': 'makine', 'makina': 'makine', 'elements': 'elemanlari',
+    'manufacturing': 'imalat', 'methods': 'yontemleri', 'measurement': 'olcme',
+    'automatic': 'otomatik', 'control': 'kontrol', 'design': 'tasarim',
+    'laboratory': 'laboratuvar', 'project': 'proje', 'internship': 'staj',
+    'graduation': 'bitirme', 'thesis': 'tezi', 'foreign': 'yabanci', 'language': 'dil',
+    'business': 'is', 'life': 'hayati', 'reading': 'okuma', 'speaking': 'konusma',
+    'occupational': 'is', 'health': 'sagligi', 'safety': 'guvenligi',
+    'career': 'kariyer', 'planning': 'planlama', 'entrepreneurship': 'girisimcilik',
+    'turkish': 'turk', 'english': 'ingilizce',
+}
+
+
+def turkish_casefold(text: str) -> str:
+    """Türkçe kurallarıyla küçük harfe çevirir ('ISI' -> 'ısı', 'İŞ' -> 'iş')."""
+    return str(text).translate(TURKISH_CASE).lower()
+
+
+@lru_cache(maxsize=8192)
+def name_tokens(name: str) -> tuple:
+    """Ders adını kanonik kelimelere ayırır. Örn: 'Akışkanlar Mekaniği - I' -> ('akiskanlar', 'mekanigi', '1')"""
+    folded = turkish_casefold(name).translate(ASCII_FOLD)
+    tokens = []
+    for token in NON_ALNUM.split(folded):
+        if not token or token in STOPWORDS:
+            continue
+        if token in ROMAN_NUMERALS:
+            token = ROMAN_NUMERALS[token]
+        elif token.isdigit():
+            token = str(int(token))
+        else:
+            token = NAME_SYNONYMS.get(token, token)
+        tokens.append(token)
+    return tuple(tokens)
+
+
+def normalize_name(name: str) -> str:
+    """Karşılaştırma anahtarı: kanonik kelimelerin sıralı birleşimi."""
+    return ' '.join(sorted(name_tokens(name)))
+
+
+def sequence_number(tokens: tuple):
+    """Adın sonundaki ders sıra numarası ('Proje - III' -> '3'); yoksa None."""
+    if tokens and tokens[-1].isdigit():
+        return tokens[-1]
+    return None
+
+
+@lru_cache(maxsize=8192)
+def name_profile(name: str) -> tuple:
+    """(anahtar, sıra numarası ya da -1).
+
+    Ders adları öğrenciler ve oturumlar arasında tekrarlandığı için önbelleklenir.
+    """
+    tokens = name_tokens(name)
+    sequence = sequence_number(tokens)
+    return ' '.join(sorted(tokens)), int(sequence) if sequence else -1
+
+
+class NameIndex:
+    """Transkript ders adları (adaylar) üzerinde bulanık skorlayıcı.
+
+    Aday adları bir kez normalize edilir; score_matrix her sorgu kümesini
+    tüm adaylarla tek bir C çağrısında skorlar.
+
+    Parameters:
+        names: Aday ders adları (ham)
+        akts: Adayların AKTS değerleri (AKTS yakınlığı elemesi için, isteğe bağlı)
+    """
+
+    def __init__(self, names, akts=None):
+        profiles = [name_profile(name) for name in names]
+        self.keys = [key for key, _ in profiles]
+        self.sequences = np.array([seq for _, seq in profiles], dtype=np.int64)
+        self.akts = np.array(akts, dtype=np.float64) if akts is not None else None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def candidate_mask(self, names, akts=None, akts_tolerance: float = None) -> np.ndarray:
+        """(sorgu x aday) bool matrisi: sıra numarası ve AKTS elemesinden geçen çiftler."""
+        sequences = np.array([name_profile(name)[1] for name in names], dtype=np.int64)
+        # Sıra numarası çelişen çiftler (Matematik-I / Matematik-II) elenir; numarasız adlar serbesttir
+        mask = (sequences[:, None] == self.sequences[None, :]) | (sequences[:, None] < 0) | (self.sequences[None, :] < 0)
+
+        if akts_tolerance is not None and akts is not None and self.akts is not None:
+            query_akts = np.array(akts, dtype=np.float64)
+            mask &= np.abs(query_akts[:, None] - self.akts[None, :]) <= akts_tolerance
+        return mask
+
+    def score_matrix(self, names, akts=None, akts_tolerance: float = None) -> np.ndarray:
+        """(sorgu x aday) fuzz.token_sort_ratio matrisi; elenen çiftlerin skoru 0'dır."""
+        if not len(names) or not self.keys:
+            return np.zeros((len(names), len(self.keys)), dtype=np.float64)
+        # Anahtarlar kelime sıralı olduğundan ratio, token_sort_ratio ile aynıdır
+        scores = rprocess.cdist([name_profile(name)[0] for name in names], self.keys,
+                                scorer=rfuzz.ratio, dtype=np.float64)
+        scores[~self.candidate_mask(names, akts, akts_tolerance)] = 0.0
+        return scores
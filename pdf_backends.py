@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+PDF Metin Çıkarma Arka Uçları
+=============================
+parse_transcript'in PDF'ten okuduğu ham veriyi sağlayan değiştirilebilir arka uçlar.
+Her arka uç, sayfa başına {'text': str veya None, 'tables': [...]} sözlükleri üretir;
+'text' satırları sıralı sayfa metni, 'tables' ise (destekleniyorsa) tablo hücreleridir.
+
+    - 'pdfplumber': Tam yerleşim analizi; metin + çerçeveli tablolar.
+                    Eski (tablo) formatı yalnızca bu arka uçla okunabilir.
+    - 'pdfminer':   pdfminer.six karakterlerinden, yerleşim analizi yapmadan satır üretir.
+    - 'pypdfium2':  PDFium'un (C) metin katmanı; varsayılan metin arka ucu (requirements.txt).
+
+Yeni (metin) formatındaki transkriptler yalnızca sıralı satırlara ihtiyaç duyar;
+otomatik seçimde önce TEXT_BACKEND_ORDER'daki ilk kullanılabilir hızlı arka uç
+denenir, metin formatında ders bulunamazsa pdfplumber'a geçilir. Sıra,
+benchmark_backends.py ölçümleriyle belirlenmiştir.
+"""
+
+import os
+import re
+
+import pdfplumber
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LTChar, LTContainer
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+
+try:
+    import pypdfium2
+except ImportError:  # İsteğe bağlı bağımlılık
+    pypdfium2 = None
+
+# Sayfa ön taraması (probe) için ucuz regex'ler.
+# Ders satırı içeren her sayfada hem "2022-2023" biçiminde bir yıl aralığı (dönem
+# başlığı veya metin satırındaki dönem) hem de bir ders kodu bulunmak zorundadır.
+PROBE_YEAR_PATTERN = re.compile(r'20\d{2}\s*[-–]\s*20\d{2}')
+PROBE_CODE_PATTERN = re.compile(r'[A-ZÇĞİÖŞÜa-zçğıöşü]{2,6}\s?\d{2,5}')
+PROBE_AGNO_PATTERN = re.compile(r'AGNO|Ağırlıklı\s*Genel', re.IGNORECASE)
+
+# Kırpma bölgesine eklenen pay (pt) ve satır gruplama toleransı
+CROP_PADDING = 3
+LINE_TOLERANCE = 3
+
+# page.crop() her nesneyi kırptığı için kendi maliyeti vardır; bölge sayfadaki
+# karakterlerin en az bu oranını dışarıda bırakmıyorsa kırpma yapılmaz.
+CROP_MIN_GAIN = 0.3
+
+
+def group_lines(chars) -> list:
+    """Karakterleri dikey konumlarına göre satırlara gruplar (pdfplumber'ın y_tolerance mantığına benzer).
+
+    chars: 'text', 'x0', 'x1', 'top', 'bottom' anahtarlı sözlükler
+    """
+    lines = []
+    for ch in sorted(chars, key=lambda c: (c['top'], c['x0'])):
+        if lines and abs(ch['top'] - lines[-1]['top']) <= LINE_TOLERANCE:
+            lines[-1]['chars'].append(ch)
+            lines[-1]['bottom'] = max(lines[-1]['bottom'], ch['bottom'])
+        else:
+            lines.append({'top': ch['top'], 'bottom': ch['bottom'], 'chars': [ch]})
+    return lines
+
+
+def line_text_of(line: dict) -> str:
+    """Satırdaki karakterleri soldan sağa birleştirir; büyük boşluklara ayraç koyar."""
+    parts = []
+    prev_x1 = None
+    for ch in sorted(line['chars'], key=lambda c: c['x0']):
+        if prev_x1 is not None and ch['x0'] - prev_x1 > LINE_TOLERANCE:
+            parts.append(' ')
+        parts.append(ch['text'])
+        prev_x1 = ch['x1']
+    return ''.join(parts)
+
+
+def probe_page(page) -> dict:
+    """Sayfayı tam yerleşim analizi yapmadan, yalnızca karakter listesi üzerinden tarar.
+
+    Karakterler dikey konumlarına göre satırlara gruplanır ve her satır ucuz
+    regex'lerle denetlenir. Böylece kapak, not skalası ve imza sayfaları
+    extract_text/extract_tables çağrılmadan elenir.
+
+    Returns:
+        dict: has_courses (dönem + ders kodu var), has_agno,
+              text_bbox (ilgili satırları kapsayan bölge veya None),
+              table_bbox (çizgi/çerçeve nesnelerini kapsayan bölge veya None),
+              char_count, text_char_count, table_char_count
+    """
+    lines = group_lines(page.chars)
+
+    has_year = has_code = has_agno = False
+    region_top = region_bottom = None
+    region_first = region_last = 0
+    agno_pending = False
+    for line_index, line in enumerate(lines):
+        line_text = line_text_of(line)
+
+        line_year = bool(PROBE_YEAR_PATTERN.search(line_text))
+        line_code = bool(PROBE_CODE_PATTERN.search(line_text))
+        line_agno = bool(PROBE_AGNO_PATTERN.search(line_text))
+        has_year = has_year or line_year
+        has_code = has_code or line_code
+        has_agno = has_agno or line_agno
+
+        # AGNO değeri bir alt satıra kaymış olabilir, o satırı da bölgeye dahil et
+        if line_year or line_code or line_agno or agno_pending:
+            if region_top is None:
+                region_top = line['top']
+                region_first = line_index
+            region_bottom = line['bottom']
+            region_last = line_index
+        agno_pending = line_agno
+
+    width, height = page.width, page.height
+    text_bbox = None
+    text_char_count = 0
+    if region_top is not None:
+        text_char_count = sum(len(line['chars']) for line in lines[region_first:region_last + 1])
+        text_bbox = (
+            0,
+            max(0, region_top - CROP_PADDING),
+            width,
+            min(height, region_bottom + CROP_PADDING),
+        )
+
+    # Varsayılan tablo stratejisi yalnızca çizgi/çerçeve kenarlarından tablo üretir;
+    # kenar yoksa extract_tables zaten boş döner.
+    table_bbox = None
+    table_char_count = 0
+    edges = page.edges
+    if edges:
+        table_bbox = (
+            max(0, min(e['x0'] for e in edges) - CROP_PADDING),
+            max(0, min(e['top'] for e in edges) - CROP_PADDING),
+            min(width, max(e['x1'] for e in edges) + CROP_PADDING),
+            min(height, max(e['bottom'] for e in edges) + CROP_PADDING),
+        )
+        table_char_count = sum(
+            1 for line in lines for ch in line['chars']
+            if ch['x0'] >= table_bbox[0] and ch['x1'] <= table_bbox[2]
+            and ch['top'] >= table_bbox[1] and ch['bottom'] <= table_bbox[3]
+        )
+
+    return {
+        'has_courses': has_year and has_code,
+        'has_agno': has_agno,
+        'text_bbox': text_bbox,
+        'table_bbox': table_bbox,
+        'char_count': sum(len(line['chars']) for line in lines),
+        'text_char_count': text_char_count,
+        'table_char_count': table_char_count,
+    }
+
+
+def crop_region(page, bbox, kept_chars: int, total_chars: int):
+    """Sayfayı verilen bölgeye kırpar; kazanç kırpma maliyetine değmiyorsa sayfayı aynen döndürür."""
+    if bbox is None or kept_chars > total_chars * (1 - CROP_MIN_GAIN):
+        return page
+    return page.crop(bbox)
+
+
+def rewind(source):
+    """Dosya nesnelerini başa sarar; dosya yolları aynen döner."""
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source
+
+
+# ===== ARKA UÇLAR =====
+
+class PdfplumberBackend:
+    """pdfplumber ile tam yerleşim analizi (mevcut davranış).
+
+    Sayfalar önce probe_page() ile ucuzca taranır; ders/AGNO içermeyenler
+    atlanır, metin ve tablolar yalnızca ilgili bölgeden çıkarılır.
+    """
+
+    name = 'pdfplumber'
+    supports_tables = True
+
+    def available(self) -> bool:
+        return True
+
+    def pages(self, source):
+        pdf = pdfplumber.open(rewind(source))
+        try:
+            for page in pdf.pages:
+                probe = probe_page(page)
+                if not probe['has_courses'] and not probe['has_agno']:
+                    page.close()
+                    continue
+
+                text = None
+                if probe['text_bbox']:
+                    text_region = crop_region(page, probe['text_bbox'], probe['text_char_count'], probe['char_count'])
+                    text = text_region.extract_text()
+
+                tables = []
+                if probe['has_courses'] and probe['table_bbox']:
+                    table_region = crop_region(page, probe['table_bbox'], probe['table_char_count'], probe['char_count'])
+                    tables = table_region.extract_tables()
+                page.close()
+
+                yield {'text': text, 'tables': tables}
+        finally:
+            pdf.close()
+
+
+class PdfminerBackend:
+    """pdfminer.six ile yerleşim analizi yapmadan (laparams=None) satır çıkarır.
+
+    Karakterler group_lines() ile satırlara toplanır; metin kutusu ve
+    sütun tespiti yapılmadığı için pdfplumber'dan belirgin şekilde ucuzdur.
+    """
+
+    name = 'pdfminer'
+    supports_tables = False
+
+    def available(self) -> bool:
+        return True
+
+    def pages(self, source):
+        fp = rewind(source) if hasattr(source, 'read') else open(source, 'rb')
+        try:
+            manager = PDFResourceManager()
+            device = PDFPageAggregator(manager, laparams=None)
+            interpreter = PDFPageInterpreter(manager, device)
+            for page in PDFPage.get_pages(fp):
+                interpreter.process_page(page)
+                layout = device.get_result()
+                chars = []
+                self._collect_chars(layout, layout.height, chars)
+                text = '\n'.join(line_text_of(line) for line in group_lines(chars))
+                yield {'text': text or None, 'tables': []}
+        finally:
+            if fp is not source:
+                fp.close()
+
+    def _collect_chars(self, item, page_height: float, chars: list):
+        for child in item:
+            if isinstance(child, LTChar):
+                chars.append({
+                    'text': child.get_text(),
+                    'x0': child.x0,
+                    'x1': child.x1,
+                    'top': page_height - child.y1,
+                    'bottom': page_height - child.y0,
+                })
+            elif isinstance(child, LTContainer):
+                self._collect_chars(child, page_height, chars)
+
+
+class Pypdfium2Backend:
+    """PDFium metin katmanı (pypdfium2 kuruluysa)."""
+
+    name = 'pypdfium2'
+    supports_tables = False
+
+    def available(self) -> bool:
+        return pypdfium2 is not None
+
+    def pages(self, source):
+        pdf = pypdfium2.PdfDocument(rewind(source))
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                text = '\n'.join(textpage.get_text_range().splitlines())
+                textpage.close()
+                page.close()
+                yield {'text': text or None, 'tables': []}
+        finally:
+            pdf.close()
+
+
+BACKENDS = {backend.name: backend for backend in (PdfplumberBackend(), PdfminerBackend(), Pypdfium2Backend())}
+
+# Metin formatı için hızlıdan yavaşa deneme sırası (benchmark_backends.py ölçümü)
+TEXT_BACKEND_ORDER = ('pypdfium2', 'pdfminer')
+
+# 'auto' veya BACKENDS anahtarlarından biri
+DEFAULT_BACKEND = os.environ.get('MTS_PDF_BACKEND', 'auto')
+
+
+def available_backends() -> list:
+    """Bu ortamda kullanılabilen arka uçların adları."""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def get_backend(name: str):
+    """Adı verilen arka ucu döndürür; bilinmiyor veya kurulu değilse ValueError."""
+    backend = BACKENDS.get(name)
+    if backend is None or not backend.available():
+        raise ValueError(f"Kullanılamayan PDF arka ucu: '{name}'. Seçenekler: {', '.join(available_backends())}")
+    return backend
+
+
+def fast_text_backend():
+    """TEXT_BACKEND_ORDER'daki ilk kullanılabilir arka uç."""
+    for name in TEXT_BACKEND_ORDER:
+        if BACKENDS[name].available():
+            return BACKENDS[name]
+    return BACKENDS['pdfplumber']
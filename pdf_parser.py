@@ -3,13 +3,16 @@
 PDF Parser Modülü
 =================
 Öğrenci transkript PDF dosyalarını okuyarak yapılandırılmış veri çıkarır.
-pdfplumber kullanarak tablo verilerini ayrıştırır ve pandas DataFrame'e dönüştürür.
+PDF metni ve tabloları pdf_backends arka uçlarından alınır, ders satırları
+ayrıştırılıp pandas DataFrame'e dönüştürülür.
 """
 
 import re
-import pdfplumber
-import pandas as pd
-import io
+import sys
+
+from pdf_backends import BACKENDS, DEFAULT_BACKEND, get_backend, fast_text_backend
+from curricula import default_rules
+from attempts import AttemptLog
 
 
 def normalize_code(code: str) -> str:
@@ -19,86 +22,75 @@ def normalize_code(code: str) -> str:
     return re.sub(r'\s+', '', code.strip().upper())
 
 
-def parse_transcript(uploaded_file) -> tuple:
-    """
-    Yüklenen transkript PDF dosyasını okuyarak ders bilgilerini çıkarır.
+# Dönem algılama regex'i: "2022-2023 Güz" veya "2025 - 2026 Bahar" veya "Muaf"
+SEMESTER_PATTERN = re.compile(r'(20\d{2}\s*[-–]\s*20\d{2}\s+(?:Güz|Bahar|G[üu]z|Bahar|Muaf))', re.IGNORECASE)
 
-    Transkript yapısı (her tablo):
-        R0: ['2022-2023 Güz', None, ...]     <- Dönem başlığı
-        R1: ['Ders Kodu', 'Ders Adı', ...]   <- Sütun başlıkları
-        R2-Rn: ['BİL107 BİLGİSAYAR... 3 4 12 AA', None, ...]  <- Ders verileri
-        Son satırlar: ANO / AGNO
+# AGNO algılama regex'i
+AGNO_PATTERN = re.compile(r'AGNO\s+(?:::\s*)?(\d+[.,]\d+)', re.IGNORECASE)
+
+# Öğrenci numarası: "Öğrenci No: 1234567" veya "Öğrenci Numarası 1234567" (belge başlığında)
+STUDENT_ID_PATTERN = re.compile(r'[ÖO][ğg]renci\s+(?:No|Numaras[ıi])\s*[:.]?\s*(\d{5,12})', re.IGNORECASE)
+
+# Ders satırı regex'i: (ESKİ FORMAT - TABLO)
+COURSE_PATTERN = re.compile(
+    r'^([A-ZÇĞİÖŞÜa-zçğıöşü]{2,6}\s?\d{2,5}[A-Za-z]?)\s+'  # Ders kodu
+    r'(.+?)\s+'                                                  # Ders adı
+    r'(\d+[.,]?\d*)\s+'                                         # Kredi
+    r'(\d+[.,]?\d*)\s+'                                         # AKTS
+    r'([\d.,]+|--)\s+'                                           # Puan
+    r'([A-Z]{2}|--|MU|EX)$',                                     # Harf notu (MU/EX eklendi)
+    re.IGNORECASE
+)
+
+# Yeni formattaki AGNO regex'i
+NEW_AGNO_PATTERN = re.compile(r'Ağırlıklı\s+Genel\s+Not\s+Ort.*?[=:]\s*(\d+[.,]\d+)', re.IGNORECASE)
+
+# Ders satırı regex'i: (YENİ FORMAT TEXT-BASED)
+# Örn: MAK3004 Seçmeli Mekanik Titreşimler 2025 - 2026 Güz Tek De3rs 5 15 BB
+TEXT_COURSE_PATTERN = re.compile(
+    r'^([A-ZÇĞİÖŞÜa-zçğıöşü]{2,6}\s?\d{2,5}[A-Za-z]?)\s+'  # 1: Ders kodu
+    r'(Zorunlu|Seçmeli)\s+'                                # 2: Türü
+    r'(.+?)\s+'                                            # 3: Ders adı
+    r'(20\d{2}\s*[-–]\s*20\d{2}.+?)\s+'                    # 4: Dönem (Esnek)
+    r'(?:(\d+[.,]?\d*)\s+)?'                               # 5: Kredi (Opsiyonel)
+    r'(\d+[.,]?\d*)\s+'                                    # 6: AKTS
+    r'([\d.,]+|--)\s+'                                     # 7: Puan
+    r'([A-Z]{2}|--|BL|DZ)$',                               # 8: Harf notu
+    re.IGNORECASE
+)
+
+
+def extract_courses(pages) -> tuple:
+    """Arka ucun ürettiği sayfalardan ders kayıtlarını ve AGNO'yu çıkarır.
 
     Parameters:
-        uploaded_file: Streamlit file_uploader'dan gelen dosya objesi veya dosya yolu
+        pages: pdf_backends arka ucunun pages() çıktısı ({'text', 'tables'} sözlükleri)
 
     Returns:
-        tuple: (pd.DataFrame, float) - Derslerin tablosu ve PDF'ten okunan AGNO
+        tuple: (list of dict, float) - Ders kayıtları ve son okunan AGNO
     """
-    # PDF dosyasını oku
-    if hasattr(uploaded_file, 'read'):
-        pdf_bytes = uploaded_file.read()
-        uploaded_file.seek(0)
-        pdf = pdfplumber.open(io.BytesIO(pdf_bytes))
-    else:
-        pdf = pdfplumber.open(uploaded_file)
-
     all_courses = []
     parsed_agno = 0.0
 
-    # Dönem algılama regex'i: "2022-2023 Güz" veya "2025 - 2026 Bahar" veya "Muaf"
-    semester_pattern = re.compile(r'(20\d{2}\s*[-–]\s*20\d{2}\s+(?:Güz|Bahar|G[üu]z|Bahar|Muaf))', re.IGNORECASE)
-    
-    # AGNO algılama regex'i
-    agno_pattern = re.compile(r'AGNO\s+(?:::\s*)?(\d+[.,]\d+)', re.IGNORECASE)
-
-    # Ders satırı regex'i: (ESKİ FORMAT - TABLO)
-    course_pattern = re.compile(
-        r'^([A-ZÇĞİÖŞÜa-zçğıöşü]{2,6}\s?\d{2,5}[A-Za-z]?)\s+'  # Ders kodu
-        r'(.+?)\s+'                                                  # Ders adı
-        r'(\d+[.,]?\d*)\s+'                                         # Kredi
-        r'(\d+[.,]?\d*)\s+'                                         # AKTS
-        r'([\d.,]+|--)\s+'                                           # Puan
-        r'([A-Z]{2}|--|MU|EX)$',                                     # Harf notu (MU/EX eklendi)
-        re.IGNORECASE
-    )
-
-    # Yeni formattaki AGNO regex'i
-    new_agno_pattern = re.compile(r'Ağırlıklı\s+Genel\s+Not\s+Ort.*?[=:]\s*(\d+[.,]\d+)', re.IGNORECASE)
-
-    # Ders satırı regex'i: (YENİ FORMAT TEXT-BASED)
-    # Örn: MAK3004 Seçmeli Mekanik Titreşimler 2025 - 2026 Güz Tek De3rs 5 15 BB
-    text_course_pattern = re.compile(
-        r'^([A-ZÇĞİÖŞÜa-zçğıöşü]{2,6}\s?\d{2,5}[A-Za-z]?)\s+'  # 1: Ders kodu
-        r'(Zorunlu|Seçmeli)\s+'                                # 2: Türü
-        r'(.+?)\s+'                                            # 3: Ders adı
-        r'(20\d{2}\s*[-–]\s*20\d{2}.+?)\s+'                    # 4: Dönem (Esnek)
-        r'(?:(\d+[.,]?\d*)\s+)?'                               # 5: Kredi (Opsiyonel)
-        r'(\d+[.,]?\d*)\s+'                                    # 6: AKTS
-        r'([\d.,]+|--)\s+'                                     # 7: Puan
-        r'([A-Z]{2}|--|BL|DZ)$',                               # 8: Harf notu
-        re.IGNORECASE
-    )
-
     # Tüm sayfaları ve tabloları tara
-    for page in pdf.pages:
+    for page in pages:
         # AGNO parsing from raw text
-        text = page.extract_text()
+        text = page['text']
         if text:
             # Eski format AGNO kontrolü
-            matches = agno_pattern.findall(text)
+            matches = AGNO_PATTERN.findall(text)
             if matches:
                 parsed_agno = float(matches[-1].replace(',', '.'))
             else:
                 # Yeni format AGNO kontrolü
-                new_matches = new_agno_pattern.findall(text)
+                new_matches = NEW_AGNO_PATTERN.findall(text)
                 if new_matches:
                     parsed_agno = float(new_matches[-1].replace(',', '.'))
             
             # YENİ FORMAT (Metin Tabanlı) Ayrıştırma
             for line in text.split('\n'):
                 line = line.strip()
-                t_match = text_course_pattern.match(line)
+                t_match = TEXT_COURSE_PATTERN.match(line)
                 if t_match:
                     ders_kodu = t_match.group(1).strip()
                     ders_adi = t_match.group(3).strip()
@@ -117,7 +109,7 @@ def parse_transcript(uploaded_file) -> tuple:
                     basarisiz = harf_notu in ('FF', 'FD', 'DZ')
                     
                     all_courses.append({
-                        'Ders_Kodu': normalize_code(ders_kodu),
+                        'Ders_Kodu': sys.intern(normalize_code(ders_kodu)),
                         'Ders_Adi': ders_adi,
                         'AKTS': akts_val,
                         'Harf_Notu': harf_notu,
@@ -126,9 +118,7 @@ def parse_transcript(uploaded_file) -> tuple:
                     })
                 
         # Tabloları tara (Eski format için)
-        tables = page.extract_tables()
-
-        for table in tables:
+        for table in page['tables']:
             if not table or len(table) < 2:
                 continue
 
@@ -141,7 +131,7 @@ def parse_transcript(uploaded_file) -> tuple:
 
             # Dönem bilgisini çıkar
             current_semester = ""
-            sem_match = semester_pattern.search(first_cell)
+            sem_match = SEMESTER_PATTERN.search(first_cell)
             if sem_match:
                 current_semester = sem_match.group(1).strip()
             else:
@@ -164,7 +154,7 @@ def parse_transcript(uploaded_file) -> tuple:
                     continue
 
                 # Ders satırını regex ile ayrıştır
-                match = course_pattern.match(cell)
+                match = COURSE_PATTERN.match(cell)
                 if match:
                     ders_kodu = match.group(1).strip()
                     ders_adi = match.group(2).strip()
@@ -185,7 +175,7 @@ def parse_transcript(uploaded_file) -> tuple:
                     basarisiz = harf_notu in ('FF', 'FD', 'DZ')
 
                     all_courses.append({
-                        'Ders_Kodu': normalize_code(ders_kodu),
+                        'Ders_Kodu': sys.intern(normalize_code(ders_kodu)),
                         'Ders_Adi': ders_adi,
                         'AKTS': akts_val,
                         'Harf_Notu': harf_notu,
@@ -193,30 +183,96 @@ def parse_transcript(uploaded_file) -> tuple:
                         'Donem': current_semester
                     })
 
-    pdf.close()
+    return all_courses, parsed_agno
+
 
-    if not all_courses:
-        return pd.DataFrame(columns=['Ders_Kodu', 'Ders_Adi', 'AKTS', 'Harf_Notu', 'Basarisiz', 'Donem']), parsed_agno
+def extract_student_id(uploaded_file) -> str:
+    """
+    Transkript başlığından öğrenci numarasını okur (yalnızca ilk sayfa).
+
+    Parameters:
+        uploaded_file: Streamlit file_uploader'dan gelen dosya objesi veya dosya yolu
 
-    df = pd.DataFrame(all_courses)
+    Returns:
+        str: Öğrenci numarası; bulunamazsa boş metin
+    """
+    student_id = ''
+    for page in fast_text_backend().pages(uploaded_file):
+        match = STUDENT_ID_PATTERN.search(page['text'] or '')
+        if match:
+            student_id = match.group(1)
+        break
+
+    if hasattr(uploaded_file, 'seek'):
+        uploaded_file.seek(0)
+    return student_id
 
-    # Aynı ders birden fazla kez alınmışsa (tekrar/iyileştirme),
-    # kodu farklı olsa bile (MAK224 -> MMB224) aynı ders sayılmalı.
-    # Bunun için 'MAK' veya 'MMB' öneklerini silip geçici bir baz kod oluşturalım.
-    def get_base_code(code):
-        c = str(code)
-        if c.startswith('MMB') or c.startswith('MAK') or c.startswith('MEC'):
-            return c[3:] # Sadece sayı (ve varsa E) kısmını al
-        return c
 
-    df['Base_Kodu'] = df['Ders_Kodu'].apply(get_base_code)
+def _sniff_student_id(pages, header: dict):
+    """Sayfaları aynen geçirir; ilk sayfanın metninden öğrenci numarasını header'a yazar."""
+    for page in pages:
+        if 'ogrenci_no' not in header:
+            match = STUDENT_ID_PATTERN.search(page['text'] or '')
+            header['ogrenci_no'] = match.group(1) if match else ''
+        yield page
 
-    # En son alınan (son dönem) kaydı tut (orijinal sırasına göre sonuncu)
-    df = df.drop_duplicates(subset=['Base_Kodu'], keep='last')
-    
-    # Geçici kolonu sil
-    df = df.drop(columns=['Base_Kodu'])
-    
-    df = df.reset_index(drop=True)
 
-    return df, parsed_agno
+def parse_attempts(uploaded_file, backend: str = None, rules=None, header: dict = None) -> tuple:
+    """
+    Yüklenen transkript PDF dosyasındaki tüm ders denemelerini çıkarır.
+
+    Transkript yapısı (her tablo):
+        R0: ['2022-2023 Güz', None, ...]     <- Dönem başlığı
+        R1: ['Ders Kodu', 'Ders Adı', ...]   <- Sütun başlıkları
+        R2-Rn: ['BİL107 BİLGİSAYAR... 3 4 12 AA', None, ...]  <- Ders verileri
+        Son satırlar: ANO / AGNO
+
+    'auto' arka uç seçiminde önce hızlı bir metin arka ucu denenir; yeni
+    (metin) formatında ders bulunamazsa tablolar için pdfplumber kullanılır.
+
+    Parameters:
+        uploaded_file: Streamlit file_uploader'dan gelen dosya objesi veya dosya yolu
+        backend: 'auto' veya pdf_backends.BACKENDS anahtarı (varsayılan: MTS_PDF_BACKEND)
+        rules: Tekrar alınan dersleri birleştirirken kullanılacak bölüm kuralları
+               (curricula.DepartmentRules; varsayılan: makine)
+        header: Verilirse başlıktaki öğrenci numarası 'ogrenci_no' anahtarına
+                yazılır (extract_student_id ile aynı sonuç, ikinci okuma olmadan)
+
+    Returns:
+        tuple: (AttemptLog, float) - Tekrarlar dahil tüm denemeler ve PDF'ten okunan AGNO
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'auto':
+        pages = fast_text_backend().pages(uploaded_file)
+        if header is not None:
+            pages = _sniff_student_id(pages, header)
+        all_courses, parsed_agno = extract_courses(pages)
+        if not all_courses:
+            # Eski tablo formatı (veya tanınmayan düzen): tam yerleşim analizi
+            all_courses, parsed_agno = extract_courses(BACKENDS['pdfplumber'].pages(uploaded_file))
+    else:
+        all_courses, parsed_agno = extract_courses(get_backend(backend).pages(uploaded_file))
+
+    if header is not None and 'ogrenci_no' not in header:
+        # Sabit arka uç seçilmiş: pdfplumber başlığı kırpabildiğinden ayrı okunur
+        header['ogrenci_no'] = extract_student_id(uploaded_file)
+
+    if hasattr(uploaded_file, 'seek'):
+        uploaded_file.seek(0)
+
+    return AttemptLog(all_courses, rules or default_rules()), parsed_agno
+
+
+def parse_transcript(uploaded_file, backend: str = None, rules=None) -> tuple:
+    """
+    Transkriptteki derslerin son denemelerini çıkarır (parse_attempts'e bakınız).
+
+    Aynı ders birden fazla kez alınmışsa (tekrar/iyileştirme), kodu farklı
+    olsa bile (MAK224 -> MMB224) yalnızca son (PDF'te en son görünen)
+    denemesi tutulur.
+
+    Returns:
+        tuple: (pd.DataFrame, float) - Derslerin tablosu ve PDF'ten okunan AGNO
+    """
+    log, parsed_agno = parse_attempts(uploaded_file, backend=backend, rules=rules)
+    return log.latest_frame(), parsed_agno
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Aşamalı Analiz Hattı
+====================
+Streamlit her etkileşimde betiği baştan çalıştırır. Bu modül, hattın
+aşamalarını (PDF özeti, ayrıştırma + skor matrisi, sınıflandırma + özet)
+oturum durumunda (st.session_state) girdileriyle birlikte saklar; bir aşama
+yalnızca kendi girdileri değiştiğinde yeniden hesaplanır.
+
+Bağımlılıklar açıktır: alt aşamanın girdileri üst aşamanın girdilerini de
+içerir. Örn:
+    analiz   <- (pdf_ozeti, mufredat, esdegerlik_revizyonu)
+    sonuclar <- analiz girdileri + (esik,)
+Böylece eşik değişince yalnızca 'sonuclar', müfredat değişince ikisi de
+yeniden hesaplanır; geri bildirim formu veya açılır paneller hiçbirine
+dokunmaz.
+"""
+
+from collections.abc import MutableMapping
+
+
+class StagedPipeline:
+    """Girdileri değişmedikçe aşama sonuçlarını tekrar kullanan hafif hat.
+
+    Parameters:
+        store: Aşama kayıtlarının tutulacağı eşleme (genellikle st.session_state)
+        namespace: Anahtar öneki; aynı store'da birden fazla hat için
+    """
+
+    def __init__(self, store: MutableMapping, namespace: str = 'hat'):
+        self.store = store
+        self.namespace = namespace
+
+    def _key(self, name: str) -> str:
+        return f'{self.namespace}:{name}'
+
+    def stage(self, name: str, inputs: tuple, compute):
+        """Aşamanın değerini döndürür; girdiler son çalıştırmadakiyle aynıysa compute() çağrılmaz.
+
+        Parameters:
+            name: Aşama adı
+            inputs: Aşamanın gerçek girdileri (karşılaştırılabilir demet)
+            compute: Argümansız fonksiyon; aşamanın değerini üretir
+        """
+        key = self._key(name)
+        entry = self.store.get(key)
+        if entry is not None and entry[0] == inputs:
+            return entry[1]
+        value = compute()
+        self.store[key] = (inputs, value)
+        counts = self.store.get(self._key('_sayac')) or {}
+        counts[name] = counts.get(name, 0) + 1
+        self.store[self._key('_sayac')] = counts
+        return value
+
+    def invalidate(self, *names):
+        """Verilen aşamaları (hiç verilmezse tümünü) bir sonraki çağrıda yeniden hesaplatır."""
+        prefix = self._key('')
+        for key in list(self.store.keys()):
+            if not str(key).startswith(prefix) or key == self._key('_sayac'):
+                continue
+            if not names or str(key)[len(prefix):] in names:
+                del self.store[key]
+
+    def run_counts(self) -> dict:
+        """Aşama başına kaç kez hesaplandığı (hata ayıklama ve ölçüm için)."""
+        return dict(self.store.get(self._key('_sayac')) or {})
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Mezuniyet Planlayıcı (Ne Olur?)
+===============================
+"Gelecek dönem bu iki dersi geçersem mezun olur muyum, İngilizce oranım
+%30'a ulaşır mı?" sorusu için varsayımsal notlarla senaryo kurar.
+
+Eşleştirme sonuçları (match_courses) bir kez hesaplanır; planlayıcı özet
+metriklerini (başarılı AKTS, eksik/başarısız sayıları, AGNO, İngilizce oranı,
+mezuniyet durumu) durum başına tutulan toplamlardan üretir. Bir satırın notu
+değiştiğinde yalnızca o satırın eski katkısı çıkarılıp yenisi eklenir; yani
+her değişiklik O(değişen satır) maliyetlidir ve summary() tüm sonuç listesini
+yeniden taramaz.
+
+Kullanım:
+    planner = WhatIfPlanner(results, transkript_df, parsed_agno, summary, attempts)
+    planner.set_grade(12, 'BB')                  # eksik dersi planla
+    planner.set_grade(30, 'CC', ingilizce=True)  # İngilizce şubesinden al
+    planner.set_english(41, True)                # notu değiştirmeden İngilizce işaretle
+    planner.summary()['mezuniyet_durumu']
+"""
+
+from collections import defaultdict
+
+import pandas as pd
+
+from matcher import GRADE_POINTS, FAILING_GRADES, ENGLISH_RATIO_MIN, graduation_status, generate_summary
+
+
+# Planlayıcıda seçilebilen notlar ('Devam Ediyor': ders alınıyor, not yok)
+GRADE_OPTIONS = tuple(GRADE_POINTS) + ('Devam Ediyor',)
+
+
+def status_for_grade(grade: str) -> tuple:
+    """Varsayımsal nottan (Durum, Ikon, Basarisiz) üçlüsü; classify_matches ile aynı kurallar."""
+    if grade == 'Devam Ediyor':
+        return 'Devam Ediyor', '🔵', False
+    if grade in FAILING_GRADES:
+        return 'Başarısız', '❌', True
+    return 'Başarılı', '✅', False
+
+
+class WhatIfPlanner:
+    """Eşleştirme sonuçları üzerinde varsayımsal not senaryosu ve artımlı özet.
+
+    Parameters:
+        results: match_courses() / classify_matches() çıktısı (değiştirilmez)
+        transkript_df: Ayrıştırılmış transkript (AGNO katkıları için)
+        parsed_agno: PDF'ten okunan AGNO (0 ise transkriptten hesaplanır)
+        summary: Aynı sonuçların generate_summary() çıktısı (verilmezse hesaplanır)
+        attempts: Tekrarlar dahil denemeler (attempts.AttemptLog; transkript_df
+                  bunun latest_frame() çıktısı olmalı). Verilirse AGNO katkıları,
+                  generate_summary gibi, her dersin son notlandırılmış
+                  denemesinden alınır; verilmezse son denemelerden
+    """
+
+    def __init__(self, results: list, transkript_df: pd.DataFrame, parsed_agno: float = 0.0, summary: dict = None,
+                 attempts=None):
+        self.results = results
+        self.transkript_df = transkript_df
+        self.base_summary = summary if summary is not None else generate_summary(results, transkript_df, parsed_agno,
+                                                                                  attempts)
+        self.planned = {}  # sonuç indeksi -> (not, ingilizce); not None ise gerçek not korunur
+
+        # AGNO'da sayılan denemeler: attempts varsa her dersin son notlandırılmış
+        # denemesi (tekrar alınan dersin önceki notu dahil), yoksa son denemeler
+        if attempts is not None:
+            counted = attempts.counted_rows()
+            frame = attempts.frame
+            counted_grades = frame['Harf_Notu'].to_numpy()[list(counted.values())]
+            counted_akts = frame['AKTS'].to_numpy()[list(counted.values())]
+        else:
+            counted_grades = transkript_df['Harf_Notu']
+            counted_akts = transkript_df['AKTS']
+
+        # Satır başına AGNO'da sayılan not ve AKTS (eşleşmeyen satırda müfredat AKTS'si)
+        self._actual_grade = []
+        self._credit_akts = []
+        for r in results:
+            tr_idx = r.get('_tr_idx')
+            if tr_idx is None:
+                self._actual_grade.append(None)
+                self._credit_akts.append(r['Mufredat_AKTS'])
+                continue
+            row = None
+            if attempts is not None:
+                row = counted.get(frame['Base_Kodu'].iat[attempts.latest_rows[tr_idx]])
+            if row is None:
+                self._actual_grade.append(transkript_df.at[tr_idx, 'Harf_Notu'])
+                self._credit_akts.append(transkript_df.at[tr_idx, 'AKTS'])
+            else:
+                self._actual_grade.append(frame['Harf_Notu'].iat[row])
+                self._credit_akts.append(frame['AKTS'].iat[row])
+
+        self._count = defaultdict(int)
+        self._akts = defaultdict(float)
+        self._english_akts = defaultdict(float)
+        self._english_total = 0.0
+        for r in results:
+            self._add(r['Durum'], r['Mufredat_AKTS'], r.get('Ingilizce', False), 1)
+
+        # AGNO payı/paydası sayılan denemelerden; PDF'teki AGNO varsa pay ona göre
+        # ölçeklenir (senaryo boşken özet birebir generate_summary ile aynıdır)
+        self._points = 0.0
+        self._credits = 0.0
+        for notu, akts in zip(counted_grades, counted_akts):
+            if GRADE_POINTS.get(notu) is not None:
+                self._points += GRADE_POINTS[notu] * akts
+                self._credits += akts
+        if parsed_agno > 0 and self._credits > 0:
+            self._points = parsed_agno * self._credits
+
+    # ===== ARTIMLI GÜNCELLEME =====
+
+    def _add(self, durum: str, akts: float, ingilizce: bool, sign: int):
+        self._count[durum] += sign
+        self._akts[durum] += sign * akts
+        if ingilizce:
+            self._english_akts[durum] += sign * akts
+            self._english_total += sign * akts
+
+    def _grade_credit(self, index: int, grade: str) -> tuple:
+        """Satırın verilen notla AGNO'ya katkısı (puan, AKTS); not katsayısızsa (0, 0)."""
+        if GRADE_POINTS.get(grade) is None:
+            return 0.0, 0.0
+        akts = self._credit_akts[index]
+        return GRADE_POINTS[grade] * akts, akts
+
+    def _counted_grade(self, index: int, grade: str) -> str:
+        """Varsayımsal notla satırın AGNO'da sayılan notu.
+
+        Katsayısız not ('Devam Ediyor') sayılan notu değiştirmez; tekrar alınan
+        dersin önceki notu yeni deneme notlanana kadar sayılır.
+        """
+        return grade if GRADE_POINTS.get(grade) is not None else self._actual_grade[index]
+
+    def _state(self, index: int) -> tuple:
+        """Satırın senaryodaki (Durum, AGNO'da sayılan not, İngilizce) hali."""
+        r = self.results[index]
+        if index in self.planned:
+            grade, ingilizce = self.planned[index]
+            if grade is not None:
+                return status_for_grade(grade)[0], self._counted_grade(index, grade), ingilizce
+            return r['Durum'], self._actual_grade[index], ingilizce
+        return r['Durum'], self._actual_grade[index], r.get('Ingilizce', False)
+
+    def _replace(self, index: int, new_state: tuple):
+        akts = self.results[index]['Mufredat_AKTS']
+        old_durum, old_grade, old_english = self._state(index)
+        new_durum, new_grade, new_english = new_state
+        self._add(old_durum, akts, old_english, -1)
+        self._add(new_durum, akts, new_english, 1)
+        old_points, old_credits = self._grade_credit(index, old_grade)
+        new_points, new_credits = self._grade_credit(index, new_grade)
+        self._points += new_points - old_points
+        self._credits += new_credits - old_credits
+
+    def set_grade(self, index: int, grade: str, ingilizce: bool = None):
+        """Sonuç satırına varsayımsal not verir (eksik ders planlama, tekrar, devam eden dersin notu).
+
+        Parameters:
+            index: results listesindeki satır
+            grade: GRADE_OPTIONS içinden bir not
+            ingilizce: Ders İngilizce alınacaksa True (verilmezse satırın mevcut değeri)
+        """
+        if grade not in GRADE_OPTIONS:
+            raise ValueError(f'Geçersiz not: {grade!r}')
+        if ingilizce is None:
+            ingilizce = self.results[index].get('Ingilizce', False)
+        new_state = (status_for_grade(grade)[0], self._counted_grade(index, grade), bool(ingilizce))
+        self._replace(index, new_state)
+        self.planned[index] = (grade, bool(ingilizce))
+
+    def set_english(self, index: int, ingilizce: bool):
+        """Notu değiştirmeden yalnızca satırın İngilizce alınıp alınmayacağını planlar.
+
+        Satırın gerçek notu ve durumu korunur; işaret gerçek değerle aynıysa satır sıfırlanır.
+        """
+        r = self.results[index]
+        ingilizce = bool(ingilizce)
+        if ingilizce == bool(r.get('Ingilizce', False)):
+            self.reset(index)
+            return
+        self._replace(index, (r['Durum'], self._actual_grade[index], ingilizce))
+        self.planned[index] = (None, ingilizce)
+
+    def reset(self, index: int):
+        """Satırı gerçek sonucuna döndürür."""
+        if index not in self.planned:
+            return
+        r = self.results[index]
+        self._replace(index, (r['Durum'], self._actual_grade[index], r.get('Ingilizce', False)))
+        del self.planned[index]
+
+    def clear(self):
+        """Tüm varsayımları kaldırır."""
+        for index in list(self.planned):
+            self.reset(index)
+
+    # ===== ÇIKTILAR =====
+
+    def summary(self) -> dict:
+        """generate_summary() ile aynı anahtarlı özet; toplamlardan O(1) üretilir."""
+        base = self.base_summary
+        basarili_akts = self._akts['Başarılı']
+        devam_akts = self._akts['Devam Ediyor']
+        eksik = self._count['Eksik']
+        basarisiz = self._count['Başarısız']
+        supheli = self._count['Şüpheli Eşleşme']
+        devam_eden = self._count['Devam Ediyor']
+
+        ingilizce_basarili_akts = self._english_akts['Başarılı']
+        ingilizce_devam_akts = self._english_akts['Devam Ediyor']
+        ingilizce_toplam_akts = ingilizce_basarili_akts + ingilizce_devam_akts
+        toplam_aktif_akts = basarili_akts + devam_akts
+        ingilizce_oran = round(
+            (ingilizce_toplam_akts / toplam_aktif_akts * 100) if toplam_aktif_akts > 0 else 0, 1
+        )
+
+        # Not planlanmamışsa (yalnızca İngilizce işaretleri) AGNO değişmez
+        if all(grade is None for grade, _ in self.planned.values()):
+            agno = base['agno']
+        else:
+            agno = round(float(self._points / self._credits), 2) if self._credits > 0 else 0.0
+
+        return {
+            **base,
+            'basarili_akts': basarili_akts,
+            'eksik_ders_sayisi': eksik,
+            'basarisiz_ders_sayisi': basarisiz,
+            'supheli_sayisi': supheli,
+            'devam_eden_sayisi': devam_eden,
+            'basarili_ders_sayisi': self._count['Başarılı'],
+            'agno': agno,
+            'mezuniyet_durumu': graduation_status(eksik, basarisiz, supheli, devam_eden, ingilizce_oran),
+            'ingilizce_basarili_akts': ingilizce_basarili_akts,
+            'ingilizce_devam_akts': ingilizce_devam_akts,
+            'ingilizce_toplam_akts': ingilizce_toplam_akts,
+            'ingilizce_toplam_mufredat': self._english_total,
+            'ingilizce_oran': ingilizce_oran,
+            'ingilizce_yeterli': ingilizce_oran >= ENGLISH_RATIO_MIN,
+        }
+
+    def planned_results(self) -> list:
+        """Senaryo uygulanmış sonuç listesi; yalnızca planlanan satırlar kopyalanır."""
+        results = list(self.results)
+        for index, (grade, ingilizce) in self.planned.items():
+            r = results[index].copy()
+            if grade is not None:
+                r['Durum'], r['Ikon'], r['Basarisiz'] = status_for_grade(grade)
+                r['Transkript_Notu'] = grade
+            r['Ingilizce'] = ingilizce
+            results[index] = r
+        return results
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Açılış Isınması
+===============
+Her dağıtım veya yeni sunucu sürecinden sonraki ilk kullanıcı soğuk
+yolları öder: Excel okuyucunun (openpyxl) ilk yüklenmesi, tüm müfredat
+dosyalarının okunması, pdfplumber/pdfminer'ın ilk sayfa analizi (yazı tipi
+ve kodlama tabloları), eşleştiricinin ad önbellekleri ve fpdf'in yazı tipi
+yüklemesi.
+
+Bu modül sunucu açılışında, karşılama sayfası sunulduktan sonra arka plan
+iş parçacığında çalışır: kayıttaki tüm müfredatları ve bölüm kurallarını
+yükler, eşdeğerlik tablosunu okur, varsayılan müfredattan küçük bir sentetik
+transkripti (ilk iki yarıyıl, iki PDF formatında) ayrıştırma + eşleştirme +
+özet + rapor hattından geçirir. Sentetik analiz sonuç önbelleğine,
+eşdeğerlik tablosuna veya öğrenci geçmişine yazılmaz.
+
+Süreler adım adım tutulur ve 'prewarm' günlüğüne yazılır; arayüzde yavaş
+çalışma profilleri görünümünde gösterilir. MTS_PREWARM=0 ile kapatılır.
+
+Kullanım:
+    python prewarm.py       # ısınma adımlarını çalıştırıp süreleri yazdırır
+"""
+
+import io
+import os
+import time
+import logging
+import threading
+
+ENABLED = os.environ.get('MTS_PREWARM', '1') != '0'
+# Sentetik transkriptin kapsadığı yarıyıl sayısı
+SAMPLE_SEMESTERS = 2
+
+logger = logging.getLogger('prewarm')
+
+
+def sample_pdfs(curriculum) -> list:
+    """Müfredatın ilk yarıyıllarından küçük sentetik transkriptler (metin ve tablo formatı)."""
+    from sample_transcripts import sample_courses, build_transcript_pdf
+
+    courses = [c for c in sample_courses(curriculum.frame(), seed=0, ongoing_semesters=0)
+               if c['Donem'] <= SAMPLE_SEMESTERS]
+    return [build_transcript_pdf(courses, fmt=fmt) for fmt in ('metin', 'tablo')]
+
+
+def run_prewarm(registry, equivalence_table=None) -> dict:
+    """Isınma adımlarını sırayla çalıştırır.
+
+    Parameters:
+        registry: curricula.CurriculumRegistry (arayüzün paylaşılan kaydı)
+        equivalence_table: Eşdeğerlik tablosu; verilirse anlık görüntüsü okunur
+                           ve eşleştirmede kullanılır (tabloya yazılmaz)
+
+    Returns:
+        dict: Adım adı -> saniye ('toplam' dahil)
+    """
+    from pdf_parser import parse_attempts
+    from matcher import compute_match_state, classify_matches, generate_summary
+    from report import generate_report
+    from equivalences import Equivalences
+
+    durations = {}
+    started = time.perf_counter()
+
+    def step(name, since):
+        now = time.perf_counter()
+        durations[name] = round(now - since, 3)
+        return now
+
+    t = started
+    for curriculum in registry:
+        curriculum.frame()
+        curriculum.rules
+    t = step('mufredatlar', t)
+
+    equivalences = equivalence_table.snapshot() if equivalence_table is not None else Equivalences()
+    t = step('esdegerlikler', t)
+
+    curriculum = registry.department().default_curriculum()
+    pdfs = sample_pdfs(curriculum)
+    t = step('ornek_transkript', t)
+
+    parsed = [parse_attempts(io.BytesIO(pdf_bytes), rules=curriculum.rules) for pdf_bytes in pdfs]
+    t = step('ayristirma', t)
+
+    for attempts, parsed_agno in parsed:
+        transkript_df = attempts.latest_frame()
+        state = compute_match_state(curriculum.frame(), transkript_df, equivalences=equivalences,
+                                    rules=curriculum.rules)
+        results = classify_matches(state)
+        summary = generate_summary(results, transkript_df, parsed_agno, attempts)
+    t = step('eslestirme', t)
+
+    generate_report(results, summary, curriculum.label)
+    t = step('rapor', t)
+
+    durations['toplam'] = round(t - started, 3)
+    return durations
+
+
+class Prewarm:
+    """Arka planda bir kez çalışan ısınma; durumu iş parçacığı güvenli okunur.
+
+    Attributes:
+        durations: Adım süreleri (bitince dolar)
+        error: Isınma başarısız olduysa hata metni
+    """
+
+    def __init__(self, registry, equivalence_table=None):
+        self.durations = {}
+        self.error = ''
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(registry, equivalence_table),
+                                        name='prewarm', daemon=True)
+
+    def start(self) -> 'Prewarm':
+        if ENABLED:
+            self._thread.start()
+        else:
+            self._done.set()
+        return self
+
+    def _run(self, registry, equivalence_table):
+        try:
+            self.durations = run_prewarm(registry, equivalence_table)
+            logger.info('Isınma tamamlandı (%.2f sn): %s', self.durations['toplam'], self.durations)
+        except Exception as e:  # ısınma hatası uygulamayı durdurmamalı; ilk istek soğuk yolu öder
+            self.error = f'{type(e).__name__}: {e}'
+            logger.warning('Isınma başarısız: %s', self.error)
+        finally:
+            self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def status(self) -> str:
+        """Arayüzde gösterilen kısa durum metni."""
+        if not ENABLED:
+            return 'Isınma kapalı (MTS_PREWARM=0)'
+        if not self.done:
+            return 'Isınma sürüyor…'
+        if self.error:
+            return f'Isınma başarısız: {self.error}'
+        adimlar = ', '.join(f'{k} {v:.2f}' for k, v in self.durations.items() if k != 'toplam')
+        return f"Isınma {self.durations['toplam']:.2f} sn sürdü ({adimlar})"
+
+
+if __name__ == "__main__":
+    from curricula import CurriculumRegistry
+
+    registry = CurriculumRegistry()
+    print('Soğuk:', run_prewarm(registry))
+    print('Sıcak:', run_prewarm(registry))
@@ -3,46 +3,159 @@
 PDF Rapor Modülü
 ================
 FPDF2 kullanarak A4 boyutunda mezuniyet kontrol raporu oluşturur.
-Türkçe karakter desteği için DejaVu fontu kullanır.
+Türkçe karakter desteği için fonts/ altındaki DejaVu fontunu kullanır; font
+süreç başına bir kez rapor karakter kümesine indirgenip geçici dizine yazılır
+ve belgelere fpdf2'nin add_font() yoluyla bu küçük dosyadan eklenir.
 """
 
-import os
 import io
+import os
+import hashlib
+import tempfile
+import threading
 from datetime import datetime
 from fpdf import FPDF
+from fontTools import ttLib, subset as ftsubset
+
+
+# ===== FONT ÖNBELLEĞİ =====
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+# İndirgenmiş fontların yazıldığı dizin (dosya adları içerik özetidir)
+FONT_CACHE_DIR = os.environ.get('MTS_FONT_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'mts_fontlar')
+FONT_FAMILY = 'DejaVu'
+FONT_FILES = {
+    '': 'DejaVuSans.ttf',
+    'B': 'DejaVuSans-Bold.ttf',
+    'I': 'DejaVuSans-Oblique.ttf',
+}
+
+# Raporda geçebilecek karakterler: ASCII, Latin-1, Latin Extended-A (ğ, ı, ş, İ...)
+# ve durum sembolleri. Fontlar süreç başına bir kez bu kümeye indirgenir; her
+# rapor 6000 glifli dosya yerine birkaç yüz glifle açılır ve alt kümelenir.
+FONT_CHARSET = (
+    set(range(0x20, 0x7F)) | set(range(0xA0, 0x180))
+    | {ord(c) for c in '✓✗⚠●→–—‘’“”…•'}
+)
+
+_font_cache = {}
+_font_cache_lock = threading.Lock()
+
+
+def _subset_font(style: str) -> bytes:
+    """DejaVu fontunu FONT_CHARSET'e indirgenmiş TTF baytları olarak döndürür."""
+    font = ttLib.TTFont(os.path.join(FONT_DIR, FONT_FILES[style]), recalcTimestamp=False)
+    options = ftsubset.Options(notdef_outline=True, recommended_glyphs=True)
+    options.layout_features = []
+    options.drop_tables += ['FFTM', 'GDEF', 'GPOS', 'GSUB', 'hdmx', 'kern']
+    subsetter = ftsubset.Subsetter(options)
+    subsetter.populate(unicodes=FONT_CHARSET)
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    font.save(buffer)
+    return buffer.getvalue()
+
+
+def load_font_path(style: str = ''):
+    """FONT_CHARSET'e indirgenmiş DejaVu fontunun dosya yolu (add_font(fname=...) için).
+
+    Font süreç başına bir kez indirgenir ve FONT_CACHE_DIR'e içerik özetli adla
+    yazılır; aynı fontu yazan süreçler aynı dosyayı kullanır. Font dosyası
+    yoksa veya yazılamıyorsa None döner.
+    """
+    with _font_cache_lock:
+        if style in _font_cache:
+            return _font_cache[style]
+
+        try:
+            data = _subset_font(style)
+            stem = os.path.splitext(FONT_FILES[style])[0]
+            path = os.path.join(FONT_CACHE_DIR, f'{stem}-{hashlib.sha256(data).hexdigest()[:16]}.ttf')
+            if not os.path.exists(path):
+                os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=FONT_CACHE_DIR, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+        except (OSError, ttLib.TTLibError):
+            path = None
+
+        _font_cache[style] = path
+        return path
+
+
+# ===== METİN DÖNÜŞÜMLERİ =====
+
+# Helvetica (cp1252) için Türkçe karakter ve emoji karşılıkları
+ASCII_TABLE = str.maketrans({
+    'ç': 'c', 'Ç': 'C', 'ğ': 'g', 'Ğ': 'G',
+    'ı': 'i', 'İ': 'I', 'ö': 'o', 'Ö': 'O',
+    'ş': 's', 'Ş': 'S', 'ü': 'u', 'Ü': 'U',
+    '✅': '[OK]', '❌': '[X]', '⚠': '[!]', '🔵': '[~]', '\ufe0f': None,
+})
+
+# DejaVu'da bulunmayan durum emojilerinin sembol karşılıkları
+UNICODE_TABLE = str.maketrans({
+    '✅': '✓', '❌': '✗', '🔵': '●', '\ufe0f': None,
+})
+
+
+def safe_text(text: str) -> str:
+    """Türkçe karakterleri ASCII-safe versiyonlarına çevirir (Helvetica fallback için)."""
+    return text.translate(ASCII_TABLE)
+
+
+def unicode_text(text: str) -> str:
+    """Metni DejaVu ile yazılabilir hale getirir (Türkçe karakterler korunur)."""
+    return text.translate(UNICODE_TABLE)
+
+
+# ===== TABLO ŞABLONLARI =====
+
+# (başlık, genişlik, hizalama)
+COURSE_COLUMNS = [
+    ('Ders Kodu', 25, 'L'),
+    ('Ders Adı', 65, 'L'),
+    ('AKTS', 20, 'C'),
+    ('Not', 15, 'C'),
+    ('Durum', 45, 'C'),
+    ('Sonuç', 20, 'C'),
+]
+COURSE_TABLE_WIDTH = sum(width for _, width, _ in COURSE_COLUMNS)
+
+DURUM_FILLS = {
+    'Başarısız': (255, 220, 220),
+    'Basarisiz': (255, 220, 220),
+    'Eksik': (255, 240, 200),
+    'Şüpheli Eşleşme': (255, 255, 200),
+    'Supheli Eslesme': (255, 255, 200),
+    'Devam Ediyor': (220, 235, 255),
+}
+DEFAULT_FILL = (220, 255, 220)
 
 
 class UnicodePDF(FPDF):
-    """Türkçe karakter destekli PDF sınıfı."""
+    """Türkçe karakter destekli PDF sınıfı.
+
+    Fontlar her örnekte tam DejaVu dosyasından ayrıştırılmaz; load_font_path()
+    ile yazılmış indirgenmiş dosyalardan add_font() ile eklenir. Fontlar yoksa
+    Helvetica ve safe_text kullanılır. Yazılacak metinler self.to_text()
+    üzerinden geçmelidir.
+    """
 
     def __init__(self):
         super().__init__()
-        # Sistem fontlarından birini bul veya varsayılan kullan
-        self.add_page()
-        # DejaVu fontunu dene, yoksa Helvetica kullan
-        try:
-            # fpdf2 ile built-in unicode desteği
-            self.add_font('DejaVu', '', os.path.join(os.path.dirname(__file__), 'fonts', 'DejaVuSans.ttf'), uni=True)
-            self.add_font('DejaVu', 'B', os.path.join(os.path.dirname(__file__), 'fonts', 'DejaVuSans-Bold.ttf'), uni=True)
-            self.font_family_name = 'DejaVu'
-        except Exception:
-            self.font_family_name = 'Helvetica'
-
-    def header(self):
-        """Sayfa başlığı."""
-        self.set_font(self.font_family_name, 'B', 14)
-        self.cell(0, 10, 'Trakya Universitesi', 0, 1, 'C')
-        self.set_font(self.font_family_name, '', 11)
-        self.cell(0, 7, 'Makina Muhendisligi Bolumu', 0, 1, 'C')
-        self.cell(0, 7, 'Mezuniyet Kontrol Raporu', 0, 1, 'C')
-        self.set_font(self.font_family_name, '', 9)
-        self.cell(0, 5, f'Rapor Tarihi: {datetime.now().strftime("%d.%m.%Y %H:%M")}', 0, 1, 'C')
-        self.ln(5)
-        # Çizgi
-        self.set_draw_color(0, 102, 204)
-        self.set_line_width(0.5)
-        self.line(10, self.get_y(), 200, self.get_y())
-        self.ln(5)
+        self.font_family_name = 'Helvetica'
+        self.to_text = safe_text
+
+        # fpdf2 çıktı sırasında fontu yerinde alt kümelediği için her belge
+        # kendi (küçük) font nesnesini açar
+        fonts = {style: load_font_path(style) for style in FONT_FILES}
+        if all(fonts.values()):
+            for style, path in fonts.items():
+                self.add_font(FONT_FAMILY, style, path)
+            self.font_family_name = FONT_FAMILY
+            self.to_text = unicode_text
 
     def footer(self):
         """Sayfa alt bilgisi."""
@@ -51,47 +164,55 @@ class UnicodePDF(FPDF):
         self.set_text_color(128)
         self.cell(0, 10, f'Sayfa {self.page_no()}/{{nb}}', 0, 0, 'C')
 
-
-def safe_text(text: str) -> str:
-    """Türkçe karakterleri ASCII-safe versiyonlarına çevirir (Helvetica fallback için)."""
-    replacements = {
-        'ç': 'c', 'Ç': 'C', 'ğ': 'g', 'Ğ': 'G',
-        'ı': 'i', 'İ': 'I', 'ö': 'o', 'Ö': 'O',
-        'ş': 's', 'Ş': 'S', 'ü': 'u', 'Ü': 'U',
-        '✅': '[OK]', '❌': '[X]', '⚠️': '[!]', '🔵': '[~]'
-    }
-    for k, v in replacements.items():
-        text = text.replace(k, v)
-    return text
-
-
-def generate_report(results: list, summary: dict, mufredat_adi: str = "") -> bytes:
+    def course_table_header(self):
+        """Ders tablosunun başlık satırını çizer."""
+        self.set_font(self.font_family_name, 'B', 8)
+        self.set_fill_color(0, 102, 204)
+        self.set_text_color(255, 255, 255)
+        for title, width, _ in COURSE_COLUMNS:
+            self.cell(width, 6, self.to_text(title), 1, 0, 'C', fill=True)
+        self.ln()
+        self.set_text_color(0, 0, 0)
+
+    def course_table_row(self, values: list, fill_color: tuple):
+        """Ders tablosuna bir satır ekler."""
+        self.set_fill_color(*fill_color)
+        for value, (_, width, align) in zip(values, COURSE_COLUMNS):
+            self.cell(width, 5, value, 1, 0, align, True)
+        self.ln()
+
+
+def generate_report(results: list, summary: dict, mufredat_adi: str = "", degisiklikler: list = None) -> bytes:
     """
     Eşleştirme sonuçlarından PDF rapor oluşturur.
 
     Parameters:
-        results: match_courses() çıktısı (list of dict)
+        results: match_courses() çıktısı (list of CourseResult)
         summary: generate_summary() çıktısı (dict)
         mufredat_adi: Seçilen müfredatın adı
+        degisiklikler: Öğrencinin önceki yüklemesinden bu yana değişen dersler
+                       (transcript_delta.describe_changes() çıktısı; None ise bölüm eklenmez)
 
     Returns:
         bytes: PDF dosyasının byte içeriği
     """
-    pdf = FPDF()
+    pdf = UnicodePDF()
+    font = pdf.font_family_name
+    t = pdf.to_text
     pdf.alias_nb_pages()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=20)
 
     # ===== BAŞLIK =====
-    pdf.set_font('Helvetica', 'B', 16)
-    pdf.cell(0, 10, 'Trakya Universitesi', 0, 1, 'C')
-    pdf.set_font('Helvetica', 'B', 12)
-    pdf.cell(0, 7, 'Makina Muhendisligi Bolumu', 0, 1, 'C')
+    pdf.set_font(font, 'B', 16)
+    pdf.cell(0, 10, t('Trakya Üniversitesi'), 0, 1, 'C')
+    pdf.set_font(font, 'B', 12)
+    pdf.cell(0, 7, t('Makina Mühendisliği Bölümü'), 0, 1, 'C')
     pdf.cell(0, 7, 'Mezuniyet Kontrol Raporu', 0, 1, 'C')
-    pdf.set_font('Helvetica', '', 9)
+    pdf.set_font(font, '', 9)
     pdf.cell(0, 5, f'Rapor Tarihi: {datetime.now().strftime("%d.%m.%Y %H:%M")}', 0, 1, 'C')
     if mufredat_adi:
-        pdf.cell(0, 5, f'Mufredat: {safe_text(mufredat_adi)}', 0, 1, 'C')
+        pdf.cell(0, 5, t(f'Müfredat: {mufredat_adi}'), 0, 1, 'C')
     pdf.ln(3)
 
     # Ayırıcı çizgi
@@ -101,33 +222,32 @@ def generate_report(results: list, summary: dict, mufredat_adi: str = "") -> byt
     pdf.ln(5)
 
     # ===== ÖZET BİLGİLER =====
-    pdf.set_font('Helvetica', 'B', 12)
-    pdf.cell(0, 8, 'Genel Ozet', 0, 1)
+    pdf.set_font(font, 'B', 12)
+    pdf.cell(0, 8, t('Genel Özet'), 0, 1)
     pdf.ln(2)
 
-    pdf.set_font('Helvetica', '', 10)
+    pdf.set_font(font, '', 10)
     ozet_items = [
-        ('Toplam Mufredat AKTS', str(summary['toplam_mufredat_akts'])),
-        ('Basarili AKTS', str(summary['basarili_akts'])),
+        ('Toplam Müfredat AKTS', str(summary['toplam_mufredat_akts'])),
+        ('Başarılı AKTS', str(summary['basarili_akts'])),
         ('AGNO', str(summary['agno'])),
-        ('Toplam Ders Sayisi', str(summary['toplam_ders'])),
-        ('Basarili Ders', str(summary['basarili_ders_sayisi'])),
-        ('Basarisiz Ders', str(summary['basarisiz_ders_sayisi'])),
+        ('Toplam Ders Sayısı', str(summary['toplam_ders'])),
+        ('Başarılı Ders', str(summary['basarili_ders_sayisi'])),
+        ('Başarısız Ders', str(summary['basarisiz_ders_sayisi'])),
         ('Eksik Ders', str(summary['eksik_ders_sayisi'])),
         ('Devam Eden Ders', str(summary['devam_eden_sayisi'])),
-        ('Supheli Eslesme', str(summary['supheli_sayisi'])),
+        ('Şüpheli Eşleşme', str(summary['supheli_sayisi'])),
     ]
 
     for label, value in ozet_items:
-        pdf.set_font('Helvetica', 'B', 10)
-        pdf.cell(60, 6, f'{label}:', 0, 0)
-        pdf.set_font('Helvetica', '', 10)
+        pdf.set_font(font, 'B', 10)
+        pdf.cell(60, 6, t(f'{label}:'), 0, 0)
+        pdf.set_font(font, '', 10)
         pdf.cell(0, 6, value, 0, 1)
 
     pdf.ln(3)
-    pdf.set_font('Helvetica', 'B', 11)
-    mezuniyet_text = safe_text(summary['mezuniyet_durumu'])
-    pdf.cell(0, 8, f'Mezuniyet Durumu: {mezuniyet_text}', 0, 1)
+    pdf.set_font(font, 'B', 11)
+    pdf.cell(0, 8, t(f"Mezuniyet Durumu: {summary['mezuniyet_durumu']}"), 0, 1)
     pdf.ln(3)
 
     # ===== İNGİLİZCE DERS ORANI =====
@@ -136,14 +256,14 @@ def generate_report(results: list, summary: dict, mufredat_adi: str = "") -> byt
     ing_yeterli = summary.get('ingilizce_yeterli', False)
     basarili_akts = summary.get('basarili_akts', 0)
 
-    pdf.set_font('Helvetica', 'B', 11)
-    pdf.cell(0, 8, 'Ingilizce Ders Orani', 0, 1)
-    pdf.set_font('Helvetica', '', 10)
-    pdf.cell(60, 6, 'Ingilizce AKTS (Bas.+Devam):', 0, 0)
+    pdf.set_font(font, 'B', 11)
+    pdf.cell(0, 8, t('İngilizce Ders Oranı'), 0, 1)
+    pdf.set_font(font, '', 10)
+    pdf.cell(60, 6, t('İngilizce AKTS (Baş.+Devam):'), 0, 0)
     pdf.cell(0, 6, f'{int(ing_akts)}', 0, 1)
-    pdf.cell(60, 6, 'Ingilizce Oran:', 0, 0)
+    pdf.cell(60, 6, t('İngilizce Oran:'), 0, 0)
     pdf.cell(0, 6, f'%{ing_oran}', 0, 1)
-    pdf.set_font('Helvetica', 'B', 10)
+    pdf.set_font(font, 'B', 10)
     if ing_yeterli:
         pdf.set_text_color(0, 128, 0)
         pdf.cell(0, 6, 'Durum: Yeterli (>= %30)', 0, 1)
@@ -155,6 +275,21 @@ def generate_report(results: list, summary: dict, mufredat_adi: str = "") -> byt
     pdf.set_text_color(0, 0, 0)
     pdf.ln(3)
 
+    # ===== SON YÜKLEMEDEN BU YANA =====
+    if degisiklikler is not None:
+        pdf.set_font(font, 'B', 11)
+        pdf.cell(0, 8, t('Son Yüklemeden Bu Yana'), 0, 1)
+        pdf.set_font(font, '', 9)
+        if not degisiklikler:
+            pdf.cell(0, 5, t('  Transkriptte ders değişikliği yok.'), 0, 1)
+        for d in degisiklikler:
+            if d['Onceki'] and d['Yeni']:
+                detay = f" ({d['Onceki']} -> {d['Yeni']})"
+            else:
+                detay = f" ({d['Onceki'] or d['Yeni']})" if d['Onceki'] or d['Yeni'] else ''
+            pdf.cell(0, 5, t(f"  - {d['Ders_Kodu']} {d['Ders_Adi']}: {d['Degisiklik']}{detay}")[:110], 0, 1)
+        pdf.ln(3)
+
     # Ayırıcı çizgi
     pdf.line(10, pdf.get_y(), 200, pdf.get_y())
     pdf.ln(5)
@@ -172,70 +307,40 @@ def generate_report(results: list, summary: dict, mufredat_adi: str = "") -> byt
         dersler = donemler[donem]
 
         # Dönem başlığı
-        pdf.set_font('Helvetica', 'B', 11)
-        donem_text = f'{donem}. Donem' if isinstance(donem, (int, float)) else safe_text(str(donem))
+        pdf.set_font(font, 'B', 11)
+        donem_text = f'{donem}. Dönem' if isinstance(donem, (int, float)) else str(donem)
         pdf.set_fill_color(230, 240, 255)
-        pdf.cell(0, 8, f'  {donem_text}', 0, 1, fill=True)
+        pdf.cell(0, 8, t(f'  {donem_text}'), 0, 1, fill=True)
         pdf.ln(2)
 
-        # Tablo başlığı
-        col_widths = [25, 65, 20, 15, 45, 20]
-        headers = ['Ders Kodu', 'Ders Adi', 'AKTS', 'Not', 'Durum', 'Sonuc']
-
-        pdf.set_font('Helvetica', 'B', 8)
-        pdf.set_fill_color(0, 102, 204)
-        pdf.set_text_color(255, 255, 255)
-        for i, h in enumerate(headers):
-            pdf.cell(col_widths[i], 6, h, 1, 0, 'C', fill=True)
-        pdf.ln()
-        pdf.set_text_color(0, 0, 0)
+        pdf.course_table_header()
 
         # Ders satırları
         for r in dersler:
-            pdf.set_font('Helvetica', '', 7)
-
-            # Arka plan rengi duruma göre
-            if r['Durum'] == 'Basarisiz' or r['Durum'] == 'Başarısız':
-                pdf.set_fill_color(255, 220, 220)
-                fill = True
-            elif r['Durum'] == 'Eksik':
-                pdf.set_fill_color(255, 240, 200)
-                fill = True
-            elif r['Durum'] in ('Şüpheli Eşleşme', 'Supheli Eslesme'):
-                pdf.set_fill_color(255, 255, 200)
-                fill = True
-            elif r['Durum'] == 'Devam Ediyor':
-                pdf.set_fill_color(220, 235, 255)
-                fill = True
-            else:
-                pdf.set_fill_color(220, 255, 220)
-                fill = True
+            pdf.set_font(font, '', 7)
 
-            ders_kodu = safe_text(str(r['Mufredat_Kodu']))[:15]
-            ders_adi = safe_text(str(r['Mufredat_Adi']))
+            ders_adi = t(str(r['Mufredat_Adi']))
             if r.get('Ingilizce', False):
                 ders_adi = ders_adi[:30] + ' (EN)'
             else:
                 ders_adi = ders_adi[:35]
             akts = str(int(r['Mufredat_AKTS'])) if r['Mufredat_AKTS'] == int(r['Mufredat_AKTS']) else str(r['Mufredat_AKTS'])
-            notu = safe_text(str(r.get('Transkript_Notu', '')))
-            durum = safe_text(str(r['Durum']))[:20]
-            sonuc = safe_text(str(r['Ikon']))
-
-            pdf.cell(col_widths[0], 5, ders_kodu, 1, 0, 'L', fill)
-            pdf.cell(col_widths[1], 5, ders_adi, 1, 0, 'L', fill)
-            pdf.cell(col_widths[2], 5, akts, 1, 0, 'C', fill)
-            pdf.cell(col_widths[3], 5, notu, 1, 0, 'C', fill)
-            pdf.cell(col_widths[4], 5, durum, 1, 0, 'C', fill)
-            pdf.cell(col_widths[5], 5, sonuc, 1, 0, 'C', fill)
-            pdf.ln()
+
+            pdf.course_table_row([
+                t(str(r['Mufredat_Kodu']))[:15],
+                ders_adi,
+                akts,
+                t(str(r.get('Transkript_Notu', ''))),
+                t(str(r['Durum']))[:20],
+                t(str(r['Ikon'])),
+            ], DURUM_FILLS.get(r['Durum'], DEFAULT_FILL))
 
             # Eşleşen transkript dersi bilgisi (varsa ve farklıysa)
             if r['Transkript_Adi'] and r['Transkript_Adi'] != r['Mufredat_Adi']:
-                pdf.set_font('Helvetica', 'I', 6)
+                pdf.set_font(font, 'I', 6)
                 pdf.set_text_color(100, 100, 100)
-                tr_text = f"  -> Transkript: {safe_text(r['Transkript_Kodu'])} {safe_text(r['Transkript_Adi'])}"
-                pdf.cell(sum(col_widths), 4, tr_text, 0, 1)
+                tr_text = t(f"  -> Transkript: {r['Transkript_Kodu']} {r['Transkript_Adi']}")
+                pdf.cell(COURSE_TABLE_WIDTH, 4, tr_text, 0, 1)
                 pdf.set_text_color(0, 0, 0)
 
         pdf.ln(3)
@@ -244,27 +349,27 @@ def generate_report(results: list, summary: dict, mufredat_adi: str = "") -> byt
     eksik_dersler = [r for r in results if r['Durum'] == 'Eksik']
     if eksik_dersler:
         pdf.ln(5)
-        pdf.set_font('Helvetica', 'B', 12)
+        pdf.set_font(font, 'B', 12)
         pdf.set_text_color(200, 0, 0)
         pdf.cell(0, 8, 'Eksik Dersler', 0, 1)
         pdf.set_text_color(0, 0, 0)
-        pdf.set_font('Helvetica', '', 9)
+        pdf.set_font(font, '', 9)
         for r in eksik_dersler:
-            pdf.cell(0, 5, f"  - {safe_text(r['Mufredat_Kodu'])} {safe_text(r['Mufredat_Adi'])} ({r['Mufredat_AKTS']} AKTS)", 0, 1)
+            pdf.cell(0, 5, t(f"  - {r['Mufredat_Kodu']} {r['Mufredat_Adi']} ({r['Mufredat_AKTS']} AKTS)"), 0, 1)
 
     # ===== BAŞARISIZ DERSLER =====
     basarisiz_dersler = [r for r in results if r['Durum'] == 'Başarısız']
     if basarisiz_dersler:
         pdf.ln(5)
-        pdf.set_font('Helvetica', 'B', 12)
+        pdf.set_font(font, 'B', 12)
         pdf.set_text_color(200, 0, 0)
-        pdf.cell(0, 8, 'Basarisiz Dersler', 0, 1)
+        pdf.cell(0, 8, t('Başarısız Dersler'), 0, 1)
         pdf.set_text_color(0, 0, 0)
-        pdf.set_font('Helvetica', '', 9)
+        pdf.set_font(font, '', 9)
         for r in basarisiz_dersler:
             pdf.cell(0, 5,
-                f"  - {safe_text(r['Mufredat_Kodu'])} {safe_text(r['Mufredat_Adi'])} "
-                f"(Not: {safe_text(r['Transkript_Notu'])})", 0, 1)
+                t(f"  - {r['Mufredat_Kodu']} {r['Mufredat_Adi']} "
+                  f"(Not: {r['Transkript_Notu']})"), 0, 1)
 
     # PDF çıktısını byte olarak döndür
     return bytes(pdf.output())
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Sonuç Önbelleği Modülü
+======================
+Aynı transkript aynı müfredatla tekrar analiz edildiğinde (yeniden yükleme,
+sayfa yenileme, danışmanın aynı dosyayı tekrar açması) tüm hattı yeniden
+çalıştırmak yerine önceden üretilmiş sonuçları döndürür.
+
+Anahtar: (PDF özeti, müfredat dosyası özeti, kod sürümü[, eşik])
+    - Ayrıştırma ve skor matrisi eşikten bağımsız anahtarla, sınıflandırılmış
+      sonuçlar ve rapor eşikli anahtarla saklanır.
+    - Müfredat xlsx dosyası veya bölümün bolum.json kuralları değişirse özeti
+      değişir, eski kayıtlar kullanılmaz.
+    - pdf_parser / pdf_backends / attempts / matcher / name_index / curricula /
+      report kaynak kodu değişirse kod sürümü değişir.
+
+Kayıtlar bellekte LRU olarak tutulur; MTS_RESULT_CACHE_DIR tanımlıysa ayrıca
+diske yazılır ve süreç yeniden başladığında da kullanılabilir.
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pdf_parser
+import pdf_backends
+import attempts
+import matcher
+import name_index
+import curricula
+import report
+
+
+def compute_code_version(modules=(pdf_parser, pdf_backends, attempts, matcher,
+                                  name_index, curricula, report)) -> str:
+    """Sonuçları etkileyen modüllerin kaynak kodundan kısa bir sürüm özeti üretir."""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = compute_code_version()
+
+_file_digests = {}
+_file_digests_lock = threading.Lock()
+
+
+def file_digest(path: str) -> str:
+    """Dosya içeriğinin SHA-256 özeti; (yol, mtime, boyut) değişmedikçe yeniden okunmaz."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _file_digests_lock:
+        cached = _file_digests.get(memo_key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _file_digests_lock:
+        _file_digests[memo_key] = value
+    return value
+
+
+def pdf_digest(uploaded_file) -> str:
+    """Yüklenen PDF'in SHA-256 özeti (dosya objesi, bayt veya dosya yolu)."""
+    if isinstance(uploaded_file, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(uploaded_file).hexdigest()
+    if hasattr(uploaded_file, 'getbuffer'):
+        # BytesIO türevleri (Streamlit UploadedFile) kopyalanmadan özetlenir
+        with uploaded_file.getbuffer() as buffer:
+            return hashlib.sha256(buffer).hexdigest()
+    if hasattr(uploaded_file, 'read'):
+        uploaded_file.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: uploaded_file.read(1024 * 1024), b''):
+            digest.update(chunk)
+        uploaded_file.seek(0)
+        return digest.hexdigest()
+    return file_digest(uploaded_file)
+
+
+def curriculum_digest(mufredat_path: str) -> str:
+    """Müfredat dosyasının ve (varsa) aynı dizindeki bölüm kurallarının özeti."""
+    rules_path = os.path.join(os.path.dirname(os.path.abspath(mufredat_path)), curricula.RULES_FILENAME)
+    if not os.path.exists(rules_path):
+        return file_digest(mufredat_path)
+    return file_digest(mufredat_path) + file_digest(rules_path)[:16]
+
+
+def cache_key(pdf_hash: str, mufredat_path: str, *extra) -> str:
+    """Önbellek anahtarını üretir.
+
+    pdf_hash pdf_digest() çıktısıdır; extra ile anahtara eşik gibi ek
+    parametreler eklenir (eşikten bağımsız kayıtlar için boş bırakılır).
+    """
+    parts = (pdf_hash, curriculum_digest(mufredat_path), CODE_VERSION) + tuple(str(e) for e in extra)
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """İş parçacığı güvenli, isteğe bağlı disk destekli LRU sonuç önbelleği.
+
+    Her kayıt bir sözlüktür (örn. transkript_df, parsed_agno, results, summary);
+    rapor baytları ayrıca ilk istendiğinde eklenir.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: str = None, max_disk_entries: int = 5000):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def get(self, key: str):
+        """Kaydı döndürür; yoksa None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        if self.directory:
+            try:
+                with open(self._disk_path(key), 'rb') as f:
+                    entry = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                entry = None
+            if entry is not None:
+                self._remember(key, entry)
+                with self._lock:
+                    self.hits += 1
+                return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, entry: dict):
+        """Kaydı önbelleğe ekler (varsa üzerine yazar)."""
+        self._remember(key, entry)
+        if self.directory:
+            self._write_disk(key, entry)
+
+    def update(self, key: str, **fields):
+        """Var olan kayda alan ekler (örn. sonradan üretilen rapor baytları)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.update(fields)
+        if self.directory:
+            self._write_disk(key, entry)
+
+    def _remember(self, key: str, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _write_disk(self, key: str, entry: dict):
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._prune_disk()
+
+    def _prune_disk(self):
+        """Disk kayıt sayısı sınırı aşılırsa en eski dosyaları siler."""
+        try:
+            files = [os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith('.pkl')]
+        except OSError:
+            return
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=lambda p: os.path.getmtime(p))
+        for path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
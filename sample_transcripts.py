@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Örnek Transkript Üretici
+========================
+Yük testleri ve karşılaştırmalı ölçümler için gerçek öğrenci verisi kullanmadan,
+müfredat dosyalarından OBS transkriptine benzeyen sentetik PDF'ler üretir.
+
+İki biçim desteklenir:
+    - 'tablo': Eski OBS formatı (dönem başlığı + çerçeveli ders tablosu)
+    - 'metin': Yeni OBS formatı (her ders tek satır, dönem satır içinde)
+
+Aynı (müfredat, biçim, seed) üçlüsü her zaman aynı PDF'i üretir.
+"""
+
+import os
+import random
+import pandas as pd
+from fpdf import FPDF
+
+from report import safe_text
+from matcher import GRADE_POINTS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Türkçe karakterler için aranacak TTF fontları; bulunamazsa Helvetica kullanılır
+FONT_CANDIDATES = [
+    os.path.join(BASE_DIR, 'fonts', 'DejaVuSans.ttf'),
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+    'C:\\Windows\\Fonts\\arial.ttf',
+]
+
+HARF_NOTLARI = ['AA', 'BA', 'BB', 'CB', 'CC', 'DC', 'DD', 'FD', 'FF']
+
+# Müfredattaki seçmeli slotlar yerine transkripte yazılacak örnek ders kodları
+ELECTIVE_SAMPLES = {
+    '30': ['MMB3001', 'MMB3002', 'MMB3003', 'MMB3004'],
+    '35': ['MMB3501', 'MMB3503'],
+    '36': ['MMB3602', 'MMB3604'],
+    '41': ['MMB4101', 'MMB4103'],
+    '42': ['MMB4201', 'MMB4203'],
+    '43': ['MMB4301', 'MMB4303'],
+    '45': ['MMB4501', 'MMB4503'],
+    '46': ['MMB4601', 'MMB4603'],
+    '47': ['MMB4701', 'MMB4703'],
+    'UNI': ['CEK201', 'İŞL101', 'HUK105', 'PSİ101'],
+}
+
+
+def core_font_text(text: str) -> str:
+    """Helvetica'nın (cp1252) kodlayamadığı karakterleri ASCII karşılıklarına çevirir.
+    'ç', 'ö', 'ü' korunur; böylece 'Seçmeli' gibi ayrıştırıcı anahtar kelimeleri bozulmaz.
+    """
+    return ''.join(ch if ch.encode('cp1252', 'ignore') else safe_text(ch) for ch in text)
+
+
+def find_font():
+    """Kullanılabilir ilk Unicode TTF fontunun yolunu döndürür (yoksa None)."""
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def sample_courses(mufredat_df: pd.DataFrame, seed: int = 0, ongoing_semesters: int = 1) -> list:
+    """Müfredattan bir öğrencinin aldığı dersleri üretir.
+
+    Seçmeli slotlar gerçek seçmeli ders kodlarıyla doldurulur; bazı dersler
+    başarısız, son `ongoing_semesters` dönemdeki dersler 'Devam Ediyor' olur.
+
+    Returns:
+        list of dict: Donem (yarıyıl no), Ders_Kodu, Ders_Adi, AKTS, Harf_Notu, Tur
+    """
+    rnd = random.Random(seed)
+    used = set()
+    son_donem = int(mufredat_df['Donem'].max())
+    courses = []
+    for _, row in mufredat_df.iterrows():
+        donem = int(row['Donem'])
+        code = str(row['Ders_Kodu']).replace(' ', '')
+        name = str(row['Ders_Adi'])
+        upper = code.upper()
+        tur = 'Zorunlu'
+        if 'XX' in upper or 'UNI-SEC' in upper:
+            tur = 'Seçmeli'
+            key = 'UNI' if 'UNI' in upper else upper[3:5]
+            pool = [c for c in ELECTIVE_SAMPLES.get(key, ELECTIVE_SAMPLES['UNI']) if c not in used]
+            if not pool:
+                continue
+            code = pool[0]
+            used.add(code)
+
+        if donem > son_donem - ongoing_semesters:
+            harf = '--'
+        else:
+            harf = rnd.choices(HARF_NOTLARI, weights=[14, 14, 16, 14, 14, 8, 6, 2, 2])[0]
+        courses.append({
+            'Donem': donem,
+            'Ders_Kodu': code,
+            'Ders_Adi': name,
+            'AKTS': int(row['AKTS']),
+            'Harf_Notu': harf,
+            'Tur': tur,
+        })
+
+    # Ara sıra bir dersi atla (eksik ders senaryosu)
+    if courses and rnd.random() < 0.5:
+        courses.pop(rnd.randrange(len(courses)))
+    return courses
+
+
+def courses_agno(courses: list) -> float:
+    """Derslerin AKTS ağırlıklı AGNO'su.
+
+    Tekrar alınan dersin son notlandırılmış denemesi sayılır (attempts.AttemptLog
+    ile aynı kural); böylece PDF'e yazılan AGNO ayrıştırıcının hesapladığıyla tutarlıdır.
+    """
+    counted = {}
+    for c in sorted(courses, key=lambda c: c['Donem']):
+        if GRADE_POINTS.get(c['Harf_Notu']) is not None:
+            counted[c['Ders_Kodu']] = c
+    credits = sum(c['AKTS'] for c in counted.values())
+    if credits <= 0:
+        return 0.0
+    return round(sum(GRADE_POINTS[c['Harf_Notu']] * c['AKTS'] for c in counted.values()) / credits, 2)
+
+
+def semester_label(donem: int, baslangic_yili: int) -> tuple:
+    """Yarıyıl numarasını ('2022-2023', 'Güz') biçimine çevirir."""
+    yil = baslangic_yili + (donem - 1) // 2
+    return f'{yil}-{yil + 1}', 'Güz' if donem % 2 == 1 else 'Bahar'
+
+
+def build_transcript_pdf(courses: list, fmt: str = 'metin', baslangic_yili: int = 2021,
+                         agno: float = None, ogrenci_no: str = '1234567890') -> bytes:
+    """Ders listesinden OBS benzeri bir transkript PDF'i üretir ve baytlarını döndürür.
+
+    agno verilmezse derslerden hesaplanır (courses_agno).
+    """
+    if agno is None:
+        agno = courses_agno(courses)
+    pdf = FPDF()
+    font_path = find_font()
+    if font_path:
+        pdf.add_font('Sample', '', font_path)
+        family, text = 'Sample', (lambda s: s)
+    else:
+        family, text = 'Helvetica', core_font_text
+    pdf.set_font(family, '', 8)
+
+    # Kapak bilgileri ve not skalası tablosu
+    pdf.add_page()
+    pdf.cell(0, 8, text('T.C. TRAKYA ÜNİVERSİTESİ - ÖĞRENCİ NOT DURUM BELGESİ'), new_x='LMARGIN', new_y='NEXT')
+    pdf.cell(0, 6, text(f'Öğrenci No: {ogrenci_no}   Bölüm: Makine Mühendisliği'), new_x='LMARGIN', new_y='NEXT')
+    pdf.ln(3)
+    for row in (['Harf', 'Katsayı', 'Puan'], ['AA', '4.00', '90-100'], ['BA', '3.50', '85-89'], ['BB', '3.00', '80-84']):
+        for cell in row:
+            pdf.cell(30, 6, text(cell), border=1)
+        pdf.ln()
+
+    donemler = {}
+    for c in courses:
+        donemler.setdefault(c['Donem'], []).append(c)
+
+    if fmt == 'tablo':
+        for donem in sorted(donemler):
+            if donem % 2 == 1:
+                pdf.add_page()
+            yil, tip = semester_label(donem, baslangic_yili)
+            pdf.ln(4)
+            pdf.cell(170, 6, text(f'{yil} {tip}'), border=1, new_x='LMARGIN', new_y='NEXT')
+            pdf.cell(170, 6, text('Ders Kodu  Ders Adı  Kredi  AKTS  Puan  Not'), border=1, new_x='LMARGIN', new_y='NEXT')
+            for c in donemler[donem]:
+                puan = '--' if c['Harf_Notu'] == '--' else str(60 + (len(c['Ders_Adi']) * 7) % 40)
+                line = f"{c['Ders_Kodu']} {c['Ders_Adi']} 3 {c['AKTS']} {puan} {c['Harf_Notu']}"
+                pdf.cell(170, 6, text(line), border=1, new_x='LMARGIN', new_y='NEXT')
+            pdf.cell(170, 6, text('ANO 3.00'), border=1, new_x='LMARGIN', new_y='NEXT')
+            pdf.cell(170, 6, text(f'AGNO {agno:.2f}'), border=1, new_x='LMARGIN', new_y='NEXT')
+    else:
+        pdf.add_page()
+        pdf.set_font(family, '', 7)
+        for donem in sorted(donemler):
+            yil, tip = semester_label(donem, baslangic_yili)
+            yil = yil.replace('-', ' - ')
+            for c in donemler[donem]:
+                puan = '--' if c['Harf_Notu'] == '--' else str(60 + (len(c['Ders_Adi']) * 7) % 40)
+                line = f"{c['Ders_Kodu']} {c['Tur']} {c['Ders_Adi']} {yil} {tip} 3 {c['AKTS']} {puan} {c['Harf_Notu']}"
+                pdf.cell(0, 5, text(line), new_x='LMARGIN', new_y='NEXT')
+        pdf.ln(3)
+        pdf.cell(0, 6, text(f'Ağırlıklı Genel Not Ortalaması = {agno:.2f}'.replace('.', ',')), new_x='LMARGIN', new_y='NEXT')
+
+    # İmza sayfası
+    pdf.add_page()
+    pdf.cell(0, 6, text('Bu belge elektronik imzalıdır. Öğrenci İşleri Daire Başkanlığı'), new_x='LMARGIN', new_y='NEXT')
+    return bytes(pdf.output())
+
+
+def generate_sample(mufredat_path: str, fmt: str = 'metin', seed: int = 0) -> bytes:
+    """Verilen müfredat dosyası için deterministik bir örnek transkript PDF'i üretir."""
+    mufredat_df = pd.read_excel(mufredat_path)
+    courses = sample_courses(mufredat_df, seed=seed)
+    rnd = random.Random(seed)
+    baslangic_yili = 2017 + rnd.randint(0, 5)
+    return build_transcript_pdf(courses, fmt=fmt, baslangic_yili=baslangic_yili, ogrenci_no=f'{1000000000 + seed}')
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sentetik transkript PDF'leri üretir.")
+    parser.add_argument('mufredat', help='Müfredat xlsx dosyası')
+    parser.add_argument('--format', choices=['metin', 'tablo'], default='metin')
+    parser.add_argument('--count', type=int, default=1)
+    parser.add_argument('--out', default='.', help='Çıktı dizini')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(args.mufredat))[0]
+    for seed in range(args.count):
+        path = os.path.join(args.out, f'{stem}_{args.format}_{seed}.pdf')
+        with open(path, 'wb') as f:
+            f.write(generate_sample(args.mufredat, args.format, seed))
+        print(path)
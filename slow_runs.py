@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+Yavaş Çalışma Profilleyicisi
+============================
+Her analiz çalışmasını (ayrıştırma + eşleştirme) bir profilleyiciyle sarar.
+Çalışma süresi bütçeyi (MTS_PROFILE_BUDGET_MS) aşarsa profil, anonim girdi
+özeti ve çalışma bilgileriyle birlikte yerel bir dizine (MTS_PROFILE_DIR)
+kaydedilir. Böylece patolojik derecede yavaş bir transkript (örn.
+text_course_pattern'de geri izleme, çok büyük tablolar) şikâyet gelmeden
+fark edilir ve profili indirilip incelenebilir.
+
+Modlar (MTS_PROFILE_MODE):
+    - 'sample':   Varsayılan. Ayrı bir iş parçacığı, çalışan iş parçacığının
+                  yığınını MTS_PROFILE_INTERVAL_MS aralıklarla örnekler; ek
+                  yükü düşüktür. Profil speedscope JSON olarak yazılır
+                  (https://www.speedscope.app ile alev grafiği).
+    - 'cprofile': Deterministik cProfile; her fonksiyon çağrısını sayar, ek
+                  yükü daha yüksektir. Profil pstats (.prof) olarak yazılır
+                  (python -m pstats, snakeviz).
+    - 'off':      Profilleme yapılmaz.
+
+Her yakalama iki dosyadan oluşur: profil ve aynı adlı .json bilgi dosyası
+(etiket, süre, bütçe, girdi özeti, mod). Girdinin kendisi saklanmaz; yalnızca
+özetinin ilk 16 karakteri tutulur. En fazla MTS_PROFILE_KEEP yakalama tutulur.
+
+Kullanım:
+    with get_recorder().profile('analiz', pdf_hash, mufredat='mufredat_2022.xlsx'):
+        ...
+    python slow_runs.py --limit 10
+"""
+
+import os
+import sys
+import json
+import time
+import cProfile
+import threading
+import itertools
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIR = os.environ.get('MTS_PROFILE_DIR', os.path.join(BASE_DIR, 'yavas_calismalar'))
+DEFAULT_BUDGET_MS = float(os.environ.get('MTS_PROFILE_BUDGET_MS', '3000'))
+DEFAULT_MODE = os.environ.get('MTS_PROFILE_MODE', 'sample')
+DEFAULT_INTERVAL_MS = float(os.environ.get('MTS_PROFILE_INTERVAL_MS', '5'))
+DEFAULT_KEEP = int(os.environ.get('MTS_PROFILE_KEEP', '50'))
+
+MODES = ('sample', 'cprofile', 'off')
+PROFILE_SUFFIXES = {'sample': '.speedscope.json', 'cprofile': '.prof'}
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+# Aynı saniyede aynı girdiyle yapılan yakalamaların adları çakışmasın diye
+_capture_counter = itertools.count()
+
+
+# ===== ÖRNEKLEYİCİ =====
+
+class StackSampler:
+    """Bir iş parçacığının yığınını arka planda düzenli aralıklarla örnekler.
+
+    Yığınlar, örnekleyicinin başlatıldığı çerçeveden (kök) en içteki çağrıya
+    doğru tutulur; kökün dışındaki çerçeveler (Streamlit, sunucu) atılır.
+    """
+
+    def __init__(self, interval_ms: float = DEFAULT_INTERVAL_MS):
+        self.interval = max(interval_ms, 0.5) / 1000
+        self.frames = []
+        self.samples = []
+        self.weights = []
+        self._frame_ids = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, root_frame):
+        self._target = threading.get_ident()
+        self._root = root_frame
+        self._last = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='mts-profil-ornekleyici', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._root = None
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        frame_id = self._frame_ids.get(key)
+        if frame_id is None:
+            frame_id = self._frame_ids[key] = len(self.frames)
+            self.frames.append({'name': code.co_name, 'file': code.co_filename, 'line': code.co_firstlineno})
+        return frame_id
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                if frame is self._root:
+                    break
+                frame = frame.f_back
+            else:
+                # Kök çerçeveden çıkılmış (çalışma bitmek üzere)
+                continue
+            stack.reverse()
+            self.samples.append(stack)
+            self.weights.append((now - self._last) * 1000)
+            self._last = now
+
+    def speedscope(self, name: str, elapsed_ms: float) -> dict:
+        """Örnekleri speedscope 'sampled' profil biçimine çevirir."""
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': name,
+            'exporter': 'mts-slow-runs',
+            'shared': {'frames': self.frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(elapsed_ms, 3),
+                'samples': self.samples,
+                'weights': [round(w, 3) for w in self.weights],
+            }],
+        }
+
+
+# ===== KAYDEDİCİ =====
+
+class ProfiledRun:
+    """profile() bağlamının döndürdüğü nesne; çıkışta süre ve yakalama bilgisi dolar."""
+
+    __slots__ = ('label', 'elapsed_ms', 'capture')
+
+    def __init__(self, label: str):
+        self.label = label
+        self.elapsed_ms = None
+        self.capture = None
+
+
+class SlowRunRecorder:
+    """Çalışmaları profilleyip bütçeyi aşanları diske yazar.
+
+    Parameters:
+        directory: Yakalamaların yazılacağı dizin (ilk yakalamada oluşturulur)
+        budget_ms: Bu süreyi aşan çalışmalar kaydedilir
+        mode: 'sample', 'cprofile' veya 'off'
+        keep: Dizinde tutulacak en fazla yakalama sayısı
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIR, budget_ms: float = DEFAULT_BUDGET_MS,
+                 mode: str = DEFAULT_MODE, keep: int = DEFAULT_KEEP,
+                 interval_ms: float = DEFAULT_INTERVAL_MS):
+        if mode not in MODES:
+            raise ValueError(f"Bilinmeyen profil modu: '{mode}'. Seçenekler: {', '.join(MODES)}")
+        self.directory = directory
+        self.budget_ms = budget_ms
+        self.mode = mode
+        self.keep = keep
+        self.interval_ms = interval_ms
+        # cProfile aynı anda tek profilleyiciye izin verir; eşzamanlı çalışmalar
+        # kilidi alamazsa profilsiz (yalnızca süre ölçülerek) çalışır
+        self._cprofile_lock = threading.Lock()
+
+    @contextmanager
+    def profile(self, label: str, input_hash: str, **context):
+        """Bloğu profilleyerek çalıştırır; süre bütçeyi aşarsa yakalamayı kaydeder.
+
+        Parameters:
+            label: Çalışma türü (örn. 'analiz', 'api_analyze')
+            input_hash: Girdinin özeti (örn. PDF SHA-256); yalnızca ilk 16 karakteri saklanır
+            context: Bilgi dosyasına yazılacak ek alanlar (müfredat adı gibi kimlik içermeyen bilgiler)
+        """
+        run = ProfiledRun(label)
+        profiler = sampler = None
+        if self.mode == 'cprofile' and self._cprofile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        elif self.mode == 'sample':
+            sampler = StackSampler(self.interval_ms)
+            sampler.start(sys._getframe(2))
+
+        error = None
+        started = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield run
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._cprofile_lock.release()
+            if sampler is not None:
+                sampler.stop()
+            run.elapsed_ms = (time.perf_counter() - started) * 1000
+            if run.elapsed_ms > self.budget_ms and (profiler or sampler):
+                info = {
+                    'etiket': label,
+                    'girdi_ozeti': str(input_hash)[:16],
+                    'sure_ms': round(run.elapsed_ms, 1),
+                    'butce_ms': self.budget_ms,
+                    'mod': self.mode,
+                    'zaman': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'pid': os.getpid(),
+                    'hata': error,
+                    **context,
+                }
+                try:
+                    run.capture = self._save(info, profiler, sampler)
+                except OSError:
+                    pass
+
+    def _save(self, info: dict, profiler, sampler) -> str:
+        """Profili ve bilgi dosyasını yazar; yakalama kimliğini döndürür."""
+        os.makedirs(self.directory, exist_ok=True)
+        capture_id = (f"{time.strftime('%Y%m%d-%H%M%S')}_{info['etiket']}_{info['girdi_ozeti']}"
+                      f"_{os.getpid()}-{next(_capture_counter)}")
+        info['profil'] = capture_id + PROFILE_SUFFIXES[info['mod']]
+        base = os.path.join(self.directory, capture_id)
+        if profiler is not None:
+            profiler.dump_stats(base + '.prof')
+        else:
+            name = f"{info['etiket']} {info['girdi_ozeti']} ({info['sure_ms']:.0f} ms)"
+            with open(base + '.speedscope.json', 'w', encoding='utf-8') as f:
+                json.dump(sampler.speedscope(name, info['sure_ms']), f)
+        # Bilgi dosyası en son yazılır; listede yalnızca tamamlanmış yakalamalar görünür
+        tmp_path = f'{base}.json.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False)
+        os.replace(tmp_path, base + '.json')
+        self._prune()
+        return capture_id
+
+    def _prune(self):
+        """Yakalama sayısı sınırı aşılırsa en eskileri siler."""
+        captures = self.captures(limit=None)
+        for info in captures[self.keep:]:
+            for filename in (info['kimlik'] + '.json', info.get('profil')):
+                if not filename:
+                    continue
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    pass
+
+    def captures(self, limit: int = 20) -> list:
+        """Kaydedilmiş yakalamaların bilgilerini yeniden eskiye döndürür."""
+        try:
+            names = [f for f in os.listdir(self.directory) if f.endswith('.json') and not f.endswith('.speedscope.json')]
+        except OSError:
+            return []
+        captures = []
+        for filename in names:
+            try:
+                with open(os.path.join(self.directory, filename), encoding='utf-8') as f:
+                    info = json.load(f)
+            except (OSError, ValueError):
+                continue
+            info['kimlik'] = filename[:-len('.json')]
+            captures.append(info)
+        captures.sort(key=lambda info: info['kimlik'], reverse=True)
+        return captures if limit is None else captures[:limit]
+
+    def read_profile(self, info: dict) -> bytes:
+        """Yakalamanın profil dosyasının baytları."""
+        with open(os.path.join(self.directory, os.path.basename(info['profil'])), 'rb') as f:
+            return f.read()
+
+
+_default_recorder = None
+_default_lock = threading.Lock()
+
+
+def get_recorder() -> SlowRunRecorder:
+    """Süreç başına tek SlowRunRecorder (ortam değişkenlerindeki ayarlarla)."""
+    global _default_recorder
+    with _default_lock:
+        if _default_recorder is None:
+            _default_recorder = SlowRunRecorder()
+        return _default_recorder
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kaydedilmiş yavaş çalışma profillerini listeler.")
+    parser.add_argument('--dir', default=DEFAULT_DIR, help='Yakalama dizini (MTS_PROFILE_DIR)')
+    parser.add_argument('--limit', type=int, default=20, help='Listelenecek en fazla yakalama')
+    args = parser.parse_args()
+
+    recorder = SlowRunRecorder(directory=args.dir)
+    for info in recorder.captures(args.limit):
+        print(f"{info['zaman']}  {info['etiket']:<14}{info['sure_ms']:>10.1f} ms  "
+              f"{info['girdi_ozeti']}  {os.path.join(args.dir, info['profil'])}")
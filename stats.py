@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Ölçüm Yardımcıları
+==================
+Gecikme ve bekleme süresi örneklerinden özet değerler hesaplar. Yük testi
+(loadtest), izleme servisi (ingest) ve kabul denetimi (admission) tarafından
+paylaşılır; bu modülün uygulama içinde bağımlılığı yoktur.
+"""
+
+
+def percentile(values: list, p: float) -> float:
+    """Doğrusal enterpolasyonla yüzdelik değer hesaplar."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Öğrenci Yükleme Geçmişi
+=======================
+Öğrenciler transkriptlerini her dönem yeniden yükler. Bu modül her analizin
+ayrıştırılmış transkriptini, eşleştirme durumunu (MatchState) ve özetini
+öğrenci + müfredat bazında saklar. Aynı öğrenci yeni bir PDF yüklediğinde
+önceki kayıt bulunur; transcript_delta ile yalnızca değişen satırlar yeniden
+eşleştirilir ve arayüzde/raporda "son yüklemeden bu yana" değişenler
+gösterilir.
+
+Öğrenci anahtarı PDF başlığındaki öğrenci numarasının gizli anahtarlı
+HMAC-SHA256 özetidir; numara açık olarak yazılmaz. Anahtar MTS_HISTORY_SALT
+ile verilir; verilmezse ilk açılışta rastgele üretilip veritabanının yanına
+(yalnızca sahibinin okuyabileceği '<db>.anahtar' dosyasına) yazılır. Kısa
+öğrenci numaraları anahtarsız bir özetten kolayca geri bulunabileceği için
+anahtarsız çalışılmaz. Öğrenci ve müfredat başına en fazla KEEP_UPLOADS
+yükleme tutulur.
+
+Tablo bir SQLite dosyasında tutulur (MTS_HISTORY_DB); Streamlit oturumları
+ve API işçi süreçleri aynı dosyayı paylaşabilir.
+
+Kullanım:
+    python student_history.py --forget 1234567    # öğrencinin kayıtlarını sil
+"""
+
+import os
+import hmac
+import copy
+import json
+import time
+import pickle
+import hashlib
+import secrets
+import sqlite3
+import tempfile
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.environ.get('MTS_HISTORY_DB', os.path.join(BASE_DIR, 'ogrenci_gecmisi.sqlite3'))
+
+# Öğrenci + müfredat başına saklanan yükleme sayısı
+KEEP_UPLOADS = int(os.environ.get('MTS_HISTORY_KEEP', '5'))
+# Öğrenci numarası özetinin gizli anahtarı (boşsa veritabanının yanındaki anahtar dosyası)
+STUDENT_SALT = os.environ.get('MTS_HISTORY_SALT', '')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS yukleme (
+    ogrenci     TEXT NOT NULL,          -- student_key() özeti
+    mufredat    TEXT NOT NULL,          -- 'bolum/mufredat_YYYY.xlsx'
+    pdf_ozeti   TEXT NOT NULL,
+    surum       TEXT NOT NULL,          -- müfredat + kod + eşdeğerlik revizyonu özeti
+    transkript  BLOB NOT NULL,          -- pickle: transkript DataFrame
+    agno        REAL NOT NULL,
+    durum       BLOB,                   -- pickle: MatchState (kurallar hariç)
+    ozet        TEXT NOT NULL,          -- JSON: generate_summary() sayısal alanları
+    zaman       REAL NOT NULL,
+    PRIMARY KEY (ogrenci, mufredat, pdf_ozeti)
+);
+CREATE INDEX IF NOT EXISTS yukleme_zaman ON yukleme (ogrenci, mufredat, zaman);
+"""
+
+# Karşılaştırma için saklanan özet alanları
+SUMMARY_FIELDS = (
+    'basarili_akts', 'agno', 'basarili_ders_sayisi', 'eksik_ders_sayisi', 'basarisiz_ders_sayisi',
+    'devam_eden_sayisi', 'supheli_sayisi', 'ingilizce_oran', 'mezuniyet_durumu',
+)
+
+
+def load_secret(path: str) -> bytes:
+    """Özet anahtarı: MTS_HISTORY_SALT veya veritabanının yanındaki anahtar dosyası.
+
+    Dosya yoksa rastgele anahtar üretilir ve yalnızca sahibi okuyabilecek
+    şekilde yazılır; aynı anda açılan süreçler aynı anahtarı okur.
+    """
+    if STUDENT_SALT:
+        return STUDENT_SALT.encode('utf-8')
+    if path == ':memory:':
+        return secrets.token_bytes(32)
+    key_path = f'{path}.anahtar'
+    try:
+        with open(key_path, 'rb') as f:
+            secret = f.read().strip()
+        if secret:
+            return secret
+    except FileNotFoundError:
+        pass
+    # mkstemp dosyayı 0600 izniyle açar
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(key_path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(secrets.token_hex(32).encode('ascii'))
+        try:
+            os.link(tmp, key_path)  # varsa başka sürecin anahtarı korunur
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(tmp)
+    with open(key_path, 'rb') as f:
+        return f.read().strip()
+
+
+def student_key(ogrenci_no: str, secret: bytes) -> str:
+    """Öğrenci numarasının saklanan özeti; numara boşsa boş metin."""
+    ogrenci_no = str(ogrenci_no or '').strip()
+    if not ogrenci_no:
+        return ''
+    return hmac.new(secret, ogrenci_no.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+class Upload:
+    """Geçmişteki bir yükleme.
+
+    Attributes:
+        pdf_hash, surum, zaman: Kayıt bilgileri
+        transkript_df, parsed_agno: Ayrıştırma sonucu
+        match_state: Kaydedildiği sürümdeki MatchState (kurallar None) veya None
+        summary: SUMMARY_FIELDS alanlı özet
+    """
+
+    __slots__ = ('pdf_hash', 'surum', 'zaman', 'transkript_df', 'parsed_agno', 'match_state', 'summary')
+
+    def __init__(self, pdf_hash, surum, zaman, transkript_df, parsed_agno, match_state, summary):
+        self.pdf_hash = pdf_hash
+        self.surum = surum
+        self.zaman = zaman
+        self.transkript_df = transkript_df
+        self.parsed_agno = parsed_agno
+        self.match_state = match_state
+        self.summary = summary
+
+
+class StudentHistory:
+    """SQLite destekli yükleme geçmişi; süreç ve iş parçacığı güvenlidir."""
+
+    def __init__(self, path: str = DEFAULT_PATH, keep: int = KEEP_UPLOADS):
+        self.path = path
+        self.keep = keep
+        self._secret = load_secret(path)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def student_key(self, ogrenci_no: str) -> str:
+        """Öğrenci numarasının bu geçmişteki anahtarı (HMAC özeti)."""
+        return student_key(ogrenci_no, self._secret)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def previous(self, ogrenci: str, mufredat: str, pdf_hash: str) -> Upload:
+        """Öğrencinin bu müfredattaki, bu PDF dışındaki en son yüklemesi; yoksa None."""
+        if not ogrenci:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT pdf_ozeti, surum, zaman, transkript, agno, durum, ozet FROM yukleme "
+                "WHERE ogrenci = ? AND mufredat = ? AND pdf_ozeti != ? ORDER BY zaman DESC LIMIT 1",
+                (ogrenci, mufredat, pdf_hash),
+            ).fetchone()
+        if row is None:
+            return None
+        pdf_ozeti, surum, zaman, transkript, agno, durum, ozet = row
+        try:
+            transkript_df = pickle.loads(transkript)
+            match_state = pickle.loads(durum) if durum is not None else None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None  # eski kod sürümünün kaydı; geçmiş yokmuş gibi davranılır
+        return Upload(pdf_ozeti, surum, zaman, transkript_df, agno, match_state, json.loads(ozet))
+
+    def record(self, ogrenci: str, mufredat: str, pdf_hash: str, surum: str,
+               transkript_df, parsed_agno: float, match_state, summary: dict):
+        """Yüklemeyi kaydeder (aynı PDF tekrar yüklenirse günceller) ve eski kayıtları budar."""
+        if not ogrenci:
+            return
+        durum = None
+        if match_state is not None:
+            # Kurallar müfredattan yeniden bağlanır; derlenmiş regex'ler saklanmaz
+            # (durum paylaşımlı önbellekte olduğu için kopyası değiştirilir)
+            match_state = copy.copy(match_state)
+            match_state.rules = None
+            durum = pickle.dumps(match_state, protocol=pickle.HIGHEST_PROTOCOL)
+        ozet = json.dumps({k: summary.get(k) for k in SUMMARY_FIELDS}, ensure_ascii=False, default=float)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO yukleme (ogrenci, mufredat, pdf_ozeti, surum, transkript, agno, durum, ozet, zaman) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (ogrenci, mufredat, pdf_ozeti) DO UPDATE SET "
+                "surum = excluded.surum, transkript = excluded.transkript, agno = excluded.agno, "
+                "durum = excluded.durum, ozet = excluded.ozet, zaman = excluded.zaman",
+                (ogrenci, mufredat, pdf_hash, surum,
+                 pickle.dumps(transkript_df, protocol=pickle.HIGHEST_PROTOCOL),
+                 float(parsed_agno), durum, ozet, time.time()),
+            )
+            conn.execute(
+                "DELETE FROM yukleme WHERE ogrenci = ? AND mufredat = ? AND pdf_ozeti NOT IN ("
+                "SELECT pdf_ozeti FROM yukleme WHERE ogrenci = ? AND mufredat = ? ORDER BY zaman DESC LIMIT ?)",
+                (ogrenci, mufredat, ogrenci, mufredat, self.keep),
+            )
+
+    def forget(self, ogrenci: str) -> int:
+        """Öğrencinin tüm kayıtlarını siler; silinen kayıt sayısını döndürür."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM yukleme WHERE ogrenci = ?", (ogrenci,)).rowcount
+
+
+_default_history = None
+_default_lock = threading.Lock()
+
+
+def get_history() -> StudentHistory:
+    """Süreç başına tek StudentHistory (varsayılan dosya)."""
+    global _default_history
+    with _default_lock:
+        if _default_history is None:
+            _default_history = StudentHistory()
+        return _default_history
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Öğrenci yükleme geçmişini yönetir.")
+    parser.add_argument('--db', default=DEFAULT_PATH, help='SQLite dosyası (MTS_HISTORY_DB)')
+    parser.add_argument('--forget', required=True, metavar='OGRENCI_NO', help='Öğrencinin tüm kayıtlarını sil')
+    args = parser.parse_args()
+
+    history = StudentHistory(args.db)
+    deleted = history.forget(history.student_key(args.forget))
+    print(f'{deleted} kayıt silindi.')
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+Transkript Farkı ve Artımlı Yeniden Eşleştirme
+==============================================
+Öğrenciler her dönem transkriptlerini yeniden yükler; derslerin çoğu
+değişmez. Bu modül yeni ayrıştırmayı aynı öğrencinin önceki ayrıştırmasıyla
+ders kodu üzerinden karşılaştırır (eklenen, çıkarılan, notu/bilgisi değişen
+satırlar) ve önceki MatchState'i yalnızca bu satırlar için günceller:
+
+    - Yalnızca not değişiklikleri: eşleşmeler ve skor matrisi aynen kalır,
+      değişen satırların not alanları yerinde düzeltilir (O(değişen satır)).
+    - Eklenen/çıkarılan/adı veya AKTS'si değişen satırlar: değişmeyen
+      satırlara bağlı eşleşmeler korunur; yalnızca serbest kalan müfredat
+      satırları ile yeni ve kullanılmayan transkript satırları yeniden
+      eşleştirilir (PASS 1-3 bu alt küme üzerinde).
+
+Eşleştirme açgözlüdür (müfredat sırasıyla ilk uygun transkript satırı); bir
+değişikliğin korunan bir eşleşmeyi etkileyebileceği durumlarda (seçmeli
+havuzundan ders çıkması, 8. yarıyıl seçmeli slotlarının "Devam Ediyor"
+önceliğini değiştiren not, korunan bir dersin kodunu talep eden yeni satır)
+rematch() None döndürür ve çağıran tam eşleştirme yapar. Böylece artımlı
+sonuç her zaman tam eşleştirmeyle birebir aynıdır.
+"""
+
+import numpy as np
+import pandas as pd
+
+from name_index import NameIndex, normalize_name
+from matcher import (
+    MatchState, compute_match_state, normalize_code, is_elective_slot,
+    get_elective_category, classify_transcript_elective,
+)
+
+# Eşleştirmeyi belirleyen alanlar; bunlar değişirse satır yeniden eşleştirilir
+IDENTITY_FIELDS = ('Ders_Adi', 'AKTS')
+# Yalnızca sonucun durumunu etkileyen alanlar
+GRADE_FIELDS = ('Harf_Notu', 'Basarisiz', 'Donem')
+
+
+class TranscriptDelta:
+    """İki ayrıştırma arasındaki satır farkı (ders kodu anahtarlı).
+
+    Attributes:
+        added: Yeni transkriptte eklenen satır indeksleri
+        removed: Eski transkriptte olup yenisinde olmayan satır indeksleri
+        changed: (eski indeks, yeni indeks) - notu veya dönemi değişen satırlar
+        reidentified: (eski indeks, yeni indeks) - adı veya AKTS'si değişen satırlar
+        index_map: Eski indeks -> yeni indeks (aynı kodlu tüm satırlar)
+    """
+
+    __slots__ = ('added', 'removed', 'changed', 'reidentified', 'index_map')
+
+    def __init__(self, added, removed, changed, reidentified, index_map):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.reidentified = reidentified
+        self.index_map = index_map
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed or self.reidentified or self.reordered)
+
+    @property
+    def reordered(self) -> bool:
+        """Ortak satırlardan herhangi birinin indeksi değişmiş mi."""
+        return any(old != new for old, new in self.index_map.items())
+
+    @property
+    def grade_only(self) -> bool:
+        """Satırlar aynı sırada ve yalnızca not/dönem alanları değişmiş mi."""
+        return not self.added and not self.removed and not self.reidentified and not self.reordered
+
+
+def _records(df: pd.DataFrame) -> dict:
+    """Normalize ders kodu -> (indeks, {alan: değer})."""
+    fields = IDENTITY_FIELDS + GRADE_FIELDS
+    columns = [df[f].tolist() for f in fields]
+    return {
+        normalize_code(str(code)): (i, dict(zip(fields, values)))
+        for i, (code, *values) in enumerate(zip(df['Ders_Kodu'].tolist(), *columns))
+    }
+
+
+def _same(a, b) -> bool:
+    return a == b or (pd.isna(a) and pd.isna(b))
+
+
+def diff_transcripts(old_df: pd.DataFrame, new_df: pd.DataFrame) -> TranscriptDelta:
+    """Eski ve yeni transkripti ders koduna göre karşılaştırır."""
+    old_rows = _records(old_df.reset_index(drop=True))
+    new_rows = _records(new_df.reset_index(drop=True))
+
+    added, removed, changed, reidentified, index_map = [], [], [], [], {}
+    for code, (old_idx, old_row) in old_rows.items():
+        if code not in new_rows:
+            removed.append(old_idx)
+            continue
+        new_idx, new_row = new_rows[code]
+        index_map[old_idx] = new_idx
+        if not all(_same(old_row[f], new_row[f]) for f in IDENTITY_FIELDS):
+            reidentified.append((old_idx, new_idx))
+        elif not all(_same(old_row[f], new_row[f]) for f in GRADE_FIELDS):
+            changed.append((old_idx, new_idx))
+    added = sorted(new_idx for code, (new_idx, _) in new_rows.items() if code not in old_rows)
+    return TranscriptDelta(added, sorted(removed), changed, reidentified, index_map)
+
+
+def describe_changes(old_df: pd.DataFrame, new_df: pd.DataFrame, delta: TranscriptDelta) -> list:
+    """Kullanıcıya gösterilecek değişiklik listesi (Ders_Kodu, Ders_Adi, Degisiklik, Onceki, Yeni)."""
+    old_df = old_df.reset_index(drop=True)
+    new_df = new_df.reset_index(drop=True)
+    changes = []
+    for new_idx in delta.added:
+        row = new_df.iloc[new_idx]
+        changes.append({'Ders_Kodu': row['Ders_Kodu'], 'Ders_Adi': row['Ders_Adi'],
+                        'Degisiklik': 'Eklendi', 'Onceki': '', 'Yeni': str(row['Harf_Notu'])})
+    for old_idx, new_idx in sorted(delta.changed + delta.reidentified, key=lambda pair: pair[1]):
+        old, new = old_df.iloc[old_idx], new_df.iloc[new_idx]
+        if old['Harf_Notu'] != new['Harf_Notu']:
+            degisiklik, onceki, yeni = 'Not değişti', str(old['Harf_Notu']), str(new['Harf_Notu'])
+        elif old['AKTS'] != new['AKTS']:
+            degisiklik, onceki, yeni = 'AKTS değişti', f"{old['AKTS']:g}", f"{new['AKTS']:g}"
+        elif old['Ders_Adi'] != new['Ders_Adi']:
+            degisiklik, onceki, yeni = 'Ad değişti', old['Ders_Adi'], new['Ders_Adi']
+        else:
+            degisiklik, onceki, yeni = 'Dönem değişti', str(old['Donem']), str(new['Donem'])
+        changes.append({'Ders_Kodu': new['Ders_Kodu'], 'Ders_Adi': new['Ders_Adi'],
+                        'Degisiklik': degisiklik, 'Onceki': onceki, 'Yeni': yeni})
+    for old_idx in delta.removed:
+        row = old_df.iloc[old_idx]
+        changes.append({'Ders_Kodu': row['Ders_Kodu'], 'Ders_Adi': row['Ders_Adi'],
+                        'Degisiklik': 'Çıkarıldı', 'Onceki': str(row['Harf_Notu']), 'Yeni': ''})
+    return changes
+
+
+# ===== ARTIMLI YENİDEN EŞLEŞTİRME =====
+
+def _apply_grade(result, transkript_df: pd.DataFrame, tr_idx: int):
+    """Eşleşmiş sonucun not alanlarını transkript satırından yeniler (classify_matches kuralları)."""
+    harf_notu = transkript_df.at[tr_idx, 'Harf_Notu']
+    basarisiz = transkript_df.at[tr_idx, 'Basarisiz']
+    result['Transkript_Notu'] = harf_notu
+    result['Basarisiz'] = basarisiz
+    if harf_notu == 'Devam Ediyor':
+        result['Durum'], result['Ikon'] = 'Devam Ediyor', '🔵'
+    elif basarisiz:
+        result['Durum'], result['Ikon'] = 'Başarısız', '❌'
+    else:
+        result['Durum'], result['Ikon'] = 'Başarılı', '✅'
+
+
+def _senior_slot_categories(state: MatchState) -> set:
+    """8. yarıyıl seçmeli slotlarının baktığı transkript kategorileri ("Devam Ediyor" önceliği)."""
+    categories = set()
+    for r in state.base_results:
+        if is_elective_slot(r['Mufredat_Kodu']) and str(r['Donem']) == '8':
+            categories.update(state.rules.search_categories(
+                get_elective_category(r['Mufredat_Kodu'], r['Mufredat_Adi'], state.rules)))
+    return categories
+
+
+def _code_variants(code: str, rules) -> set:
+    """PASS 2'de bu transkript koduna eşlenebilecek müfredat kodları (E eki ve eşdeğer önekler)."""
+    code = normalize_code(code)
+    variants = {code, code[:-1] if code.endswith('E') else code + 'E'}
+    for cand in list(variants):
+        variants.update(rules.prefix_variants(cand))
+    return variants
+
+
+def _patch_grades(state: MatchState, new_df: pd.DataFrame, delta: TranscriptDelta) -> MatchState:
+    """Yalnızca not değişikliği: eşleşmeler ve skorlar aynen, değişen satırların notları yenilenir."""
+    changed = {new_idx for _, new_idx in delta.changed}
+    base_results = list(state.base_results)
+    for i, r in enumerate(base_results):
+        if r.get('_tr_idx') in changed:
+            base_results[i] = r = r.copy()
+            _apply_grade(r, new_df, r['_tr_idx'])
+    candidate_rows = [
+        new_df.iloc[idx] if idx in changed else row
+        for idx, row in zip(state.candidate_indices, state.candidate_rows)
+    ]
+    return MatchState(base_results, state.fuzzy_rows, state.candidate_indices, candidate_rows,
+                      state.scores, state.rules)
+
+
+def rematch(state: MatchState, old_df: pd.DataFrame, new_df: pd.DataFrame, delta: TranscriptDelta,
+            mufredat_df: pd.DataFrame, equivalences=None) -> MatchState:
+    """Önceki eşleştirme durumunu yeni transkripte göre artımlı olarak günceller.
+
+    Parameters:
+        state: Eski transkriptin compute_match_state() sonucu (değiştirilmez)
+        old_df, new_df: Eski ve yeni transkript
+        delta: diff_transcripts(old_df, new_df)
+        mufredat_df: state'in hesaplandığı müfredat
+        equivalences: state'in hesaplandığı eşdeğerlik anlık görüntüsü
+
+    Returns:
+        MatchState veya None: Artımlı güncelleme tam eşleştirmeyle aynı sonucu
+        garanti edemiyorsa None (çağıran compute_match_state() çalıştırır)
+    """
+    rules = state.rules
+    old_df = old_df.reset_index(drop=True)
+    new_df = new_df.reset_index(drop=True)
+    if not delta:  # aynı satırlar aynı sırada
+        return state
+    codes = new_df['Ders_Kodu'].tolist()
+    names = new_df['Ders_Adi'].tolist()
+
+    # 8. yarıyıl seçmeli slotları "Devam Ediyor" satırlarını öncelikle alır;
+    # bu önceliği değiştiren bir not değişikliği seçmeli atamalarını kaydırabilir
+    senior = _senior_slot_categories(state)
+    for old_idx, new_idx in delta.changed:
+        was_ongoing = old_df.at[old_idx, 'Harf_Notu'] == 'Devam Ediyor'
+        if was_ongoing != (new_df.at[new_idx, 'Harf_Notu'] == 'Devam Ediyor'):
+            if classify_transcript_elective(codes[new_idx], rules) in senior:
+                return None
+
+    if delta.grade_only:
+        return _patch_grades(state, new_df, delta)
+
+    # Değişmeyen kimlikli satırlara bağlı PASS 1-2.5 eşleşmeleri korunur
+    reidentified = {old_idx for old_idx, _ in delta.reidentified}
+    changed = {old_idx for old_idx, _ in delta.changed}
+    kept, freed = {}, []
+    for i, r in enumerate(state.base_results):
+        tr_idx = r.get('_tr_idx')
+        if tr_idx is not None and tr_idx in delta.index_map and tr_idx not in reidentified:
+            kept[i] = tr_idx
+        else:
+            freed.append(i)
+
+    # Seçmeli havuzu: çıkan/kimliği değişen satır havuzdaysa açgözlü slot ataması kayar;
+    # eklenen havuz satırları korunanlardan sonra gelmeli ve "Devam Ediyor" önceliğine girmemeli
+    pool_positions = []
+    for old_idx, code in enumerate(old_df['Ders_Kodu']):
+        if classify_transcript_elective(code, rules) == 'bilinmiyor':
+            continue
+        if old_idx not in delta.index_map or old_idx in reidentified:
+            return None
+        pool_positions.append(delta.index_map[old_idx])
+    if pool_positions != sorted(pool_positions):
+        return None  # örn. tekrar alınan seçmeli sona taşındı; havuz sırası değişti
+    # PASS 2.5 aynı normalize adlı satırlardan ilkini alır; bunların sırası da korunmalı
+    if equivalences and equivalences.names and delta.reordered:
+        by_name = {}
+        for old_idx, new_idx in sorted(delta.index_map.items()):
+            by_name.setdefault(normalize_name(old_df.at[old_idx, 'Ders_Adi']), []).append(new_idx)
+        if any(positions != sorted(positions) for positions in by_name.values()):
+            return None
+    last_pool = max(pool_positions, default=-1)
+    for new_idx in delta.added + [new_idx for _, new_idx in delta.reidentified]:
+        category = classify_transcript_elective(codes[new_idx], rules)
+        if category != 'bilinmiyor' and (new_idx < last_pool or category in senior):
+            return None
+
+    # Yeni satırın kodu (veya eşdeğerlik tablosundaki kodu/adı) korunan bir müfredat
+    # satırını talep ediyorsa tam eşleştirme farklı atayabilir
+    kept_codes = {normalize_code(state.base_results[i]['Mufredat_Kodu']) for i in kept}
+    for new_idx in delta.added + [new_idx for _, new_idx in delta.reidentified]:
+        if _code_variants(codes[new_idx], rules) & kept_codes:
+            return None
+    if equivalences and equivalences.codes:
+        claimed_codes, claimed_names = set(), set()
+        for i in kept:
+            claimed_codes |= equivalences.accepted_codes(state.base_results[i]['Mufredat_Kodu'])
+            claimed_names |= equivalences.accepted_names(state.base_results[i]['Mufredat_Kodu'])
+        for new_idx in delta.added + [new_idx for _, new_idx in delta.reidentified]:
+            if normalize_code(codes[new_idx]) in claimed_codes or normalize_name(names[new_idx]) in claimed_names:
+                return None
+
+    # Serbest kalan müfredat satırı, korunan bir transkript satırını da talep edebilir
+    kept_tr_codes = {normalize_code(codes[delta.index_map[tr_idx]]) for tr_idx in kept.values()}
+    kept_tr_names = {normalize_name(names[delta.index_map[tr_idx]]) for tr_idx in kept.values()}
+    for i in freed:
+        r = state.base_results[i]
+        if r.get('_tr_idx') is None:
+            continue
+        if _code_variants(r['Mufredat_Kodu'], rules) & kept_tr_codes:
+            return None
+        if equivalences and (equivalences.accepted_codes(r['Mufredat_Kodu']) & kept_tr_codes
+                             or equivalences.accepted_names(r['Mufredat_Kodu']) & kept_tr_names):
+            return None
+
+    # PASS 1-2.5 yalnızca yeni satırları talep edebilecek müfredat satırları için yeniden çalışır:
+    # eşleşmesi düşenler, yeni satırın koduna/kategorisine/eşdeğerliğine uyan eşleşmemiş satırlar
+    new_rows = delta.added + [new_idx for _, new_idx in delta.reidentified]
+    new_codes = set().union(*(_code_variants(codes[i], rules) for i in new_rows)) if new_rows else set()
+    new_names = {normalize_name(names[i]) for i in new_rows}
+    new_categories = {classify_transcript_elective(codes[i], rules) for i in new_rows} - {'bilinmiyor'}
+    claimants = []
+    for i in freed:
+        r = state.base_results[i]
+        if r.get('_tr_idx') is not None:
+            claimants.append(i)
+        elif is_elective_slot(r['Mufredat_Kodu']):
+            category = get_elective_category(r['Mufredat_Kodu'], r['Mufredat_Adi'], rules)
+            if new_categories & set(rules.search_categories(category)):
+                claimants.append(i)
+        elif normalize_code(r['Mufredat_Kodu']) in new_codes or (equivalences and (
+                equivalences.accepted_codes(r['Mufredat_Kodu']) & new_codes
+                or equivalences.accepted_names(r['Mufredat_Kodu']) & new_names)):
+            claimants.append(i)
+
+    used = {delta.index_map[tr_idx] for tr_idx in kept.values()}
+    free_rows = [i for i in range(len(new_df)) if i not in used]
+    base_results = list(state.base_results)
+    changed_new = {delta.index_map[old_idx] for old_idx in changed}
+    for i, tr_idx in kept.items():
+        base_results[i] = r = base_results[i].copy()
+        r['_tr_idx'] = new_idx = delta.index_map[tr_idx]
+        if new_idx in changed_new:
+            _apply_grade(r, new_df, new_idx)
+    if claimants:
+        sub = compute_match_state(mufredat_df.iloc[claimants], new_df.iloc[free_rows],
+                                  equivalences=equivalences, rules=rules)
+        for pos, r in zip(claimants, sub.base_results):
+            if r.get('_tr_idx') is not None:
+                r['_tr_idx'] = free_rows[r['_tr_idx']]
+                used.add(r['_tr_idx'])
+            base_results[pos] = r
+
+    # PASS 3: eski skor matrisinin hâlâ geçerli blokları aynen alınır; yalnızca
+    # yeni satır/sütun çiftleri skorlanır (çift skoru diğer adaylardan bağımsızdır)
+    fuzzy_rows = [i for i in freed if base_results[i].get('_tr_idx') is None
+                  and not is_elective_slot(base_results[i]['Mufredat_Kodu'])]
+    candidate_indices = [i for i in range(len(new_df)) if i not in used]
+    old_row_pos = {result_idx: pos for pos, result_idx in enumerate(state.fuzzy_rows)}
+    old_col_pos = {delta.index_map[old_idx]: pos for pos, old_idx in enumerate(state.candidate_indices)
+                   if old_idx in delta.index_map and old_idx not in reidentified}
+    candidate_rows = [
+        state.candidate_rows[old_col_pos[idx]] if idx in old_col_pos and idx not in changed_new else new_df.iloc[idx]
+        for idx in candidate_indices
+    ]
+
+    scores = None
+    if fuzzy_rows and candidate_indices:
+        scores = np.zeros((len(fuzzy_rows), len(candidate_indices)), dtype=np.float64)
+        reuse_rows = [pos for pos, i in enumerate(fuzzy_rows) if i in old_row_pos and state.scores is not None]
+        reuse_cols = [pos for pos, idx in enumerate(candidate_indices) if idx in old_col_pos]
+        fresh_rows = [pos for pos in range(len(fuzzy_rows)) if pos not in set(reuse_rows)]
+        fresh_cols = [pos for pos in range(len(candidate_indices)) if pos not in set(reuse_cols)]
+        if reuse_rows and reuse_cols:
+            scores[np.ix_(reuse_rows, reuse_cols)] = state.scores[np.ix_(
+                [old_row_pos[fuzzy_rows[pos]] for pos in reuse_rows],
+                [old_col_pos[candidate_indices[pos]] for pos in reuse_cols],
+            )]
+        for rows, cols in ((reuse_rows, fresh_cols), (fresh_rows, list(range(len(candidate_indices))))):
+            if not rows or not cols:
+                continue
+            index = NameIndex([candidate_rows[c]['Ders_Adi'] for c in cols], [candidate_rows[c]['AKTS'] for c in cols])
+            block = index.score_matrix(
+                [base_results[fuzzy_rows[r]]['Mufredat_Adi'] for r in rows],
+                [base_results[fuzzy_rows[r]]['Mufredat_AKTS'] for r in rows],
+            )
+            if equivalences and equivalences.rejected:
+                for a, r in enumerate(rows):
+                    for b, c in enumerate(cols):
+                        if equivalences.is_rejected(base_results[fuzzy_rows[r]]['Mufredat_Kodu'],
+                                                    candidate_rows[c]['Ders_Kodu']):
+                            block[a, b] = 0.0
+            scores[np.ix_(rows, cols)] = block
+
+    return MatchState(base_results, fuzzy_rows, candidate_indices, candidate_rows, scores, rules)